@@ -0,0 +1,12 @@
+"""
+Django settings profiles for app project.
+
+app.settings       - development (default)
+app.settings.prod  - production, performance settings on
+app.settings.bench - production settings for benchmarks
+
+Every performance knob can be overridden with environment variables,
+see base.py. Run `python manage.py check_performance` to see which
+performance settings are off.
+"""
+from .dev import *  # noqa
@@ -0,0 +1,347 @@
+"""
+Base Django settings for app project, shared by all profiles.
+
+Generated by 'django-admin startproject' using Django 4.0.6.
+
+For more information on this file, see
+https://docs.djangoproject.com/en/4.0/topics/settings/
+
+For the full list of settings and their values, see
+https://docs.djangoproject.com/en/4.0/ref/settings/
+"""
+import os
+from datetime import timedelta
+from pathlib import Path
+
+from .env import env_bool, env_float, env_int, env_list
+
+# Build paths inside the project like this: BASE_DIR / 'subdir'.
+BASE_DIR = Path(__file__).resolve().parent.parent.parent
+
+
+# Quick-start development settings - unsuitable for production
+# See https://docs.djangoproject.com/en/4.0/howto/deployment/checklist/
+
+# SECURITY WARNING: keep the secret key used in production secret!
+SECRET_KEY = os.environ.get(
+    'SECRET_KEY',
+    'django-insecure-ft3g30=-=8#b)35p$y1dh^o&8hs38j0$*!zt3!mn-hgagg5o*t')
+
+# SECURITY WARNING: don't run with debug turned on in production!
+DEBUG = env_bool('DEBUG', False)
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', [])
+
+
+# Application definition
+
+INSTALLED_APPS = [
+    'django.contrib.admin',
+    'django.contrib.auth',
+    'django.contrib.contenttypes',
+    'django.contrib.sessions',
+    'django.contrib.messages',
+    'django.contrib.staticfiles',
+    'core',
+    'user',
+
+]
+
+MIDDLEWARE = [
+    'core.middleware.HealthCheckMiddleware',
+    'core.middleware.MetricsMiddleware',
+    'core.middleware.SlowQueryLogMiddleware',
+    'core.middleware.ProfilingMiddleware',
+    'django.middleware.security.SecurityMiddleware',
+    'django.contrib.sessions.middleware.SessionMiddleware',
+    'django.middleware.common.CommonMiddleware',
+    'django.middleware.csrf.CsrfViewMiddleware',
+    'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'core.middleware.RateLimitMiddleware',
+    'django.contrib.messages.middleware.MessageMiddleware',
+    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+]
+
+ROOT_URLCONF = 'app.urls'
+
+TEMPLATES = [
+    {
+        'BACKEND': 'django.template.backends.django.DjangoTemplates',
+        'DIRS': [BASE_DIR / 'templates'],
+        'APP_DIRS': True,
+        'OPTIONS': {
+            'context_processors': [
+                'django.template.context_processors.debug',
+                'django.template.context_processors.request',
+                'django.contrib.auth.context_processors.auth',
+                'django.contrib.messages.context_processors.messages',
+            ],
+        },
+    },
+]
+
+# Load all templates on server startup, see core/template_warmup.py
+PREWARM_TEMPLATES = env_bool('PREWARM_TEMPLATES', False)
+
+WSGI_APPLICATION = 'app.wsgi.application'
+
+ASGI_APPLICATION = 'app.asgi.application'
+
+# Serve user views with async implementations (for ASGI servers)
+ASYNC_VIEWS = env_bool('ASYNC_VIEWS', False)
+
+
+# Database
+# https://docs.djangoproject.com/en/4.0/ref/settings/#databases
+
+# Use 'core.db.backends.postgresql_pool' as DB_ENGINE for pooled
+# connections, see core/db/backends/postgresql_pool/base.py
+DATABASES = {
+    'default': {
+        'ENGINE': os.environ.get(
+            'DB_ENGINE', 'django.db.backends.postgresql'),
+        'HOST': os.environ.get('DB_HOST'),
+        'NAME': os.environ.get('DB_NAME'),
+        'USER': os.environ.get('DB_USER'),
+        'PASSWORD': os.environ.get('DB_PASSWORD'),
+        'CONN_MAX_AGE': env_int('DB_CONN_MAX_AGE', 0),
+        'POOL': {
+            'MIN_SIZE': env_int('DB_POOL_MIN_SIZE', 1),
+            'MAX_SIZE': env_int('DB_POOL_MAX_SIZE', 10),
+            'TIMEOUT': env_int('DB_POOL_TIMEOUT', 30),
+            'HEALTH_CHECK_INTERVAL': env_int(
+                'DB_POOL_HEALTH_CHECK_INTERVAL', 30),
+        },
+    }
+}
+
+
+# Seconds /readyz answers from cached database probe result
+READINESS_CHECK_INTERVAL = env_int('READINESS_CHECK_INTERVAL', 5)
+
+
+# Cache
+# https://docs.djangoproject.com/en/4.0/topics/cache/
+
+CACHES = {
+    'default': {
+        'BACKEND': os.environ.get(
+            'CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('CACHE_LOCATION', ''),
+    },
+    # Sessions and authenticated users. Local memory by default,
+    # set SESSION_CACHE_BACKEND to
+    # django.core.cache.backends.redis.RedisCache to share it
+    # between processes. Production uses cached sessions and users
+    # only with a shared cache, see prod.py.
+    'sessions': {
+        'BACKEND': os.environ.get(
+            'SESSION_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('SESSION_CACHE_LOCATION', 'sessions'),
+    },
+    # Rate limiter counters, see core/ratelimit.py
+    'ratelimit': {
+        'BACKEND': os.environ.get(
+            'RATELIMIT_CACHE_BACKEND',
+            'django.core.cache.backends.locmem.LocMemCache'),
+        'LOCATION': os.environ.get('RATELIMIT_CACHE_LOCATION', 'ratelimit'),
+    },
+}
+
+
+# Sessions
+# https://docs.djangoproject.com/en/4.0/topics/http/sessions/
+
+SESSION_ENGINE = os.environ.get(
+    'SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+# Users loaded by AuthenticationMiddleware are cached, see
+# user/user_cache.py. 0 disables the cache.
+USER_CACHE_ALIAS = 'sessions'
+USER_CACHE_TIMEOUT = env_int('USER_CACHE_TIMEOUT', 300)
+
+
+# Password validation
+# https://docs.djangoproject.com/en/4.0/ref/settings/#auth-password-validators
+
+AUTH_PASSWORD_VALIDATORS = [
+    {
+        'NAME': 'django.contrib.auth.password_validation.UserAttributeSimilarityValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.MinimumLengthValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.CommonPasswordValidator',
+    },
+    {
+        'NAME': 'django.contrib.auth.password_validation.NumericPasswordValidator',
+    },
+]
+
+
+# Internationalization
+# https://docs.djangoproject.com/en/4.0/topics/i18n/
+
+LANGUAGE_CODE = 'en-us'
+
+TIME_ZONE = 'UTC'
+
+USE_I18N = True
+
+USE_TZ = True
+
+
+# Static files (CSS, JavaScript, Images)
+# https://docs.djangoproject.com/en/4.0/howto/static-files/
+STATICFILES_DIRS = [
+    BASE_DIR / "vol/web/static/",
+    '/var/www/static/',
+]
+
+STATIC_URL = 'static/static/'
+MEDIA_URL = 'static/media/'
+
+MEDIA_ROOT = 'vol/web/media'
+
+
+# Default primary key field type
+# https://docs.djangoproject.com/en/4.0/ref/settings/#default-auto-field
+
+DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
+
+AUTH_USER_MODEL = 'user.User'
+
+AUTHENTICATION_BACKENDS = ['user.backends.HashingPoolBackend']
+
+LOGIN_URL= 'user:login'
+
+
+# User activation tokens lifetime
+ACTIVATION_TOKEN_LIFETIME = timedelta(days=3)
+
+
+
+# Password hashing in a process pool, see user/hashing.py
+PASSWORD_HASHING_POOL = {
+    'ENABLED': env_bool('PASSWORD_HASHING_POOL', False),
+    'WORKERS': env_int('PASSWORD_HASHING_WORKERS', None),
+    'MAX_QUEUE': env_int('PASSWORD_HASHING_MAX_QUEUE', 64),
+    'RETRY_AFTER': 1,
+}
+
+
+# Email
+# https://docs.djangoproject.com/en/4.0/topics/email/
+SITE_URL = os.environ.get('SITE_URL', 'http://localhost:8000')
+
+EMAIL_BACKEND = os.environ.get(
+    'EMAIL_BACKEND', 'django.core.mail.backends.smtp.EmailBackend')
+EMAIL_HOST = os.environ.get('EMAIL_HOST', 'localhost')
+EMAIL_PORT = env_int('EMAIL_PORT', 25)
+DEFAULT_FROM_EMAIL = os.environ.get(
+    'DEFAULT_FROM_EMAIL', 'noreply@localhost')
+
+# send_outbox command retries
+OUTBOX_MAX_ATTEMPTS = 5
+OUTBOX_RETRY_DELAY = 30
+
+
+# Rendered pages cache for anonymous users, see core/page_cache.py
+# 0 disables the cache. Change PAGE_CACHE_VERSION on deploy.
+PAGE_CACHE_ALIAS = 'default'
+PAGE_CACHE_TIMEOUT = env_int('PAGE_CACHE_TIMEOUT', 0)
+PAGE_CACHE_VERSION = os.environ.get('APP_VERSION', '1')
+
+
+# POST rate limits per URL name: {key: (requests, seconds)}
+# Keys are 'ip' and 'email', see core/middleware.py
+RATELIMIT_CACHE_ALIAS = 'ratelimit'
+RATELIMIT_IP_META_KEY = os.environ.get('RATELIMIT_IP_META_KEY', 'REMOTE_ADDR')
+RATELIMIT_RULES = {
+    'user:login': {
+        'ip': (env_int('RATELIMIT_LOGIN_IP', 30), 60),
+        'email': (env_int('RATELIMIT_LOGIN_EMAIL', 10), 300),
+    },
+    'user:registration': {
+        'ip': (env_int('RATELIMIT_REGISTRATION_IP', 10), 3600),
+    },
+}
+
+
+# Sampled request profiling, see core/profiling.py
+# MODE is 'cprofile' or 'sampler' (wall clock, flamegraph output)
+PROFILING = {
+    'ENABLED': env_bool('PROFILING', False),
+    'SAMPLE_RATE': env_float('PROFILING_SAMPLE_RATE', 0.01),
+    'MODE': os.environ.get('PROFILING_MODE', 'cprofile'),
+    'SAMPLER_INTERVAL': env_float('PROFILING_SAMPLER_INTERVAL', 0.005),
+    'DIR': os.environ.get('PROFILING_DIR', BASE_DIR / 'vol/profiles'),
+}
+
+
+# Prometheus metrics on /metrics, see core/metrics.py
+# Set MULTIPROCESS_DIR with several worker processes.
+# Only ALLOWED_IPS (addresses or networks) and clients sending
+# "Authorization: Bearer TOKEN" can read /metrics
+METRICS = {
+    'ENABLED': env_bool('METRICS', False),
+    'ALLOWED_IPS': env_list('METRICS_ALLOWED_IPS', ['127.0.0.1', '::1']),
+    'TOKEN': os.environ.get('METRICS_TOKEN', ''),
+    'MULTIPROCESS_DIR': os.environ.get('METRICS_MULTIPROCESS_DIR'),
+    'FLUSH_INTERVAL': env_float('METRICS_FLUSH_INTERVAL', 1),
+}
+
+
+# Log of slow database queries, see core/slow_queries.py
+SLOW_QUERY_LOG = {
+    'ENABLED': env_bool('SLOW_QUERY_LOG', False),
+    'THRESHOLD_MS': env_int('SLOW_QUERY_THRESHOLD_MS', 200),
+    'EXPLAIN_SAMPLE_RATE': env_float('SLOW_QUERY_EXPLAIN_SAMPLE_RATE', 0.1),
+    'PATH': os.environ.get(
+        'SLOW_QUERY_LOG_PATH', BASE_DIR / 'vol/slow_queries.jsonl'),
+}
+
+
+# Articles per page of the news feed
+FEED_PAGE_SIZE = env_int('FEED_PAGE_SIZE', 20)
+
+
+# Article search, see core/search.py
+SEARCH_RESULTS_LIMIT = 20
+SEARCH_CACHE_ALIAS = 'default'
+SEARCH_CACHE_TIMEOUT = env_int('SEARCH_CACHE_TIMEOUT', 60)
+
+
+# Trending articles, see core/trending.py and update_trending command
+TRENDING = {
+    'DECAY_HOURS': env_float('TRENDING_DECAY_HOURS', 12),
+    'TOP_N': env_int('TRENDING_TOP_N', 10),
+    'BATCH_SIZE': env_int('TRENDING_BATCH_SIZE', 1000),
+}
+
+
+# Buffered article view counters, see core/pageviews.py.
+# Stored visitor sketches are downsampled when merged with sketches of
+# lower HLL_PRECISION, a higher one applies only to new days.
+PAGEVIEWS = {
+    'FLUSH_INTERVAL': env_float('PAGEVIEWS_FLUSH_INTERVAL', 10),
+    'MAX_PENDING': env_int('PAGEVIEWS_MAX_PENDING', 10000),
+    'BATCH_SIZE': env_int('PAGEVIEWS_BATCH_SIZE', 500),
+    'HLL_PRECISION': 11,
+}
+
+
+# RSS, Atom and sitemaps, see core/syndication.py
+SYNDICATION = {
+    'FEED_ITEMS': env_int('SYNDICATION_FEED_ITEMS', 100),
+    'CHUNK_SIZE': 2000,
+    # Sitemaps are limited to 50,000 URLs
+    'SITEMAP_SHARD_SIZE': 50000,
+    'SITEMAP_DIR': os.path.join(MEDIA_ROOT, 'sitemaps'),
+    'SITEMAP_MAX_AGE': env_int('SITEMAP_MAX_AGE', 3600),
+}
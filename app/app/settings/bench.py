@@ -0,0 +1,8 @@
+"""
+Benchmark settings for app project.
+Production settings which accept requests to any host.
+"""
+from .prod import *  # noqa
+from .env import env_list
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', ['*'])
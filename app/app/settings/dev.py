@@ -0,0 +1,11 @@
+"""
+Development settings for app project.
+"""
+from .base import *  # noqa
+from .env import env_bool
+
+DEBUG = env_bool('DEBUG', True)
+
+# Rate limits get in the way of local testing, tests enable them
+# with override_settings
+RATELIMIT_RULES = {}
@@ -0,0 +1,38 @@
+"""
+Helpers for reading settings from environment variables
+"""
+import os
+
+TRUE_VALUES = {'1', 'true', 'yes', 'on'}
+
+
+def env_bool(name, default):
+    """Return boolean environment variable"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in TRUE_VALUES
+
+
+def env_int(name, default):
+    """Return integer environment variable"""
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return int(value)
+
+
+def env_float(name, default):
+    """Return float environment variable"""
+    value = os.environ.get(name)
+    if value is None or value == '':
+        return default
+    return float(value)
+
+
+def env_list(name, default):
+    """Return comma separated environment variable as list"""
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return [item.strip() for item in value.split(',') if item.strip()]
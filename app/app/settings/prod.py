@@ -0,0 +1,59 @@
+"""
+Production settings for app project.
+"""
+import os
+from copy import deepcopy
+
+from django.core.exceptions import ImproperlyConfigured
+
+from .base import *  # noqa
+from .base import CACHES, DATABASES, TEMPLATES
+from .env import env_bool, env_int, env_list
+
+DATABASES = deepcopy(DATABASES)
+CACHES = deepcopy(CACHES)
+TEMPLATES = deepcopy(TEMPLATES)
+
+DEBUG = env_bool('DEBUG', False)
+
+ALLOWED_HOSTS = env_list('ALLOWED_HOSTS', ['localhost'])
+
+# Connections are returned to the pool at the end of every request
+DATABASES['default']['ENGINE'] = os.environ.get(
+    'DB_ENGINE', 'core.db.backends.postgresql_pool')
+
+CACHES['default']['LOCATION'] = os.environ.get(
+    'CACHE_LOCATION', 'app-default')
+
+# Cached sessions and users need a cache shared by all processes.
+# With a per process cache a logout, deactivation or password change
+# in one worker would not reach the others, so without
+# SESSION_CACHE_BACKEND sessions stay in the database and users are
+# not cached.
+CACHED_SESSION_ENGINES = ('django.contrib.sessions.backends.cache',
+                          'django.contrib.sessions.backends.cached_db')
+PROCESS_LOCAL_CACHES = ('django.core.cache.backends.locmem.LocMemCache',
+                        'django.core.cache.backends.dummy.DummyCache')
+if CACHES['sessions']['BACKEND'] not in PROCESS_LOCAL_CACHES:
+    SESSION_ENGINE = os.environ.get(
+        'SESSION_ENGINE', 'django.contrib.sessions.backends.cache')
+else:
+    SESSION_ENGINE = os.environ.get(
+        'SESSION_ENGINE', 'django.contrib.sessions.backends.db')
+    if SESSION_ENGINE in CACHED_SESSION_ENGINES:
+        raise ImproperlyConfigured(
+            f'{SESSION_ENGINE} needs SESSION_CACHE_BACKEND set to a cache '
+            f'shared by all processes')
+    USER_CACHE_TIMEOUT = 0
+
+TEMPLATES[0]['APP_DIRS'] = False
+TEMPLATES[0]['OPTIONS']['loaders'] = [
+    ('django.template.loaders.cached.Loader', [
+        'django.template.loaders.filesystem.Loader',
+        'django.template.loaders.app_directories.Loader',
+    ]),
+]
+
+PREWARM_TEMPLATES = env_bool('PREWARM_TEMPLATES', True)
+
+PAGE_CACHE_TIMEOUT = env_int('PAGE_CACHE_TIMEOUT', 300)
@@ -20,7 +20,9 @@ from django.conf.urls.static import static
 
 urlpatterns = [
     path('admin/', admin.site.urls),
-    path('user/', include('user.urls')),
+    path('user/', include(
+        'user.async_urls' if settings.ASYNC_VIEWS else 'user.urls')),
+    path('', include('core.urls')),
 
 ]
 
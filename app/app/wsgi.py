@@ -14,3 +14,7 @@ from django.core.wsgi import get_wsgi_application
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
 
 application = get_wsgi_application()
+
+from core.template_warmup import warm_templates_on_startup  # noqa: E402
+
+warm_templates_on_startup()
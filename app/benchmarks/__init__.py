@@ -0,0 +1,4 @@
+"""
+Performance benchmarks. Run from the app directory, e.g.
+python -m benchmarks.tokens
+"""
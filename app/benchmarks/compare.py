@@ -0,0 +1,58 @@
+"""
+Compare two result files of benchmarks.suite
+
+    python -m benchmarks.compare bench-old.json bench-new.json
+
+Prints p50 time and queries of both runs. Benchmarks which got slower
+than --threshold are marked and make the command exit with status 1.
+"""
+import argparse
+import json
+import sys
+
+
+def compare(old, new, threshold):
+    """Return lines of comparison table and list of regressed names"""
+    lines = []
+    regressions = []
+    for name, result in new['results'].items():
+        before = old['results'].get(name)
+        if before is None:
+            lines.append(f'{name:<36} {"new":>12}')
+            continue
+        ratio = result['p50_us'] / before['p50_us']
+        mark = ''
+        if ratio > 1 + threshold or result['queries'] > before['queries']:
+            mark = '  REGRESSION'
+            regressions.append(name)
+        lines.append(
+            f'{name:<36} p50 {before["p50_us"]:10.1f} -> '
+            f'{result["p50_us"]:10.1f} us ({ratio:5.2f}x)  '
+            f'queries {before["queries"]:.1f} -> {result["queries"]:.1f}'
+            f'{mark}')
+    return lines, regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('old')
+    parser.add_argument('new')
+    parser.add_argument(
+        '--threshold', type=float, default=0.1,
+        help='Allowed slowdown of p50, 0.1 is 10%%')
+    args = parser.parse_args()
+
+    with open(args.old, encoding='utf-8') as file:
+        old = json.load(file)
+    with open(args.new, encoding='utf-8') as file:
+        new = json.load(file)
+
+    print(f'{old["revision"]} -> {new["revision"]}')
+    lines, regressions = compare(old, new, args.threshold)
+    print('\n'.join(lines))
+    if regressions:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
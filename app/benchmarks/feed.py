@@ -0,0 +1,88 @@
+"""
+Benchmark of news feed pagination.
+
+Fills a test database with articles and compares time of the first
+and a deep page with keyset pagination (feed_page) and with OFFSET.
+Keyset pages should cost the same at any depth.
+
+    python -m benchmarks.feed --articles 200000 --page 10000
+"""
+import argparse
+import os
+import timeit
+from datetime import timedelta
+
+import django
+
+NUMBER = 50
+
+
+def create_articles(count, batch_size=5000):
+    """Insert `count` published articles, one per minute back in time"""
+    from django.contrib.auth import get_user_model
+    from django.utils import timezone
+
+    from core.models import Article
+
+    author = get_user_model().objects.create_user(
+        email='bench-author@example.com', password='benchpassword123')
+    now = timezone.now()
+    for start in range(0, count, batch_size):
+        Article.objects.bulk_create([
+            Article(title=f'Article {i}', slug=f'article-{i}',
+                    summary='Summary', body='Body', author=author,
+                    status=Article.PUBLISHED,
+                    published_at=now - timedelta(minutes=i))
+            for i in range(start, min(start + batch_size, count))
+        ])
+
+
+def main():
+    """Print time per page for keyset and OFFSET pagination"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--articles', type=int, default=200000)
+    parser.add_argument('--page', type=int, default=10000)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    django.setup()
+
+    from django.conf import settings
+    from django.test.utils import (setup_databases, setup_test_environment,
+                                   teardown_databases,
+                                   teardown_test_environment)
+
+    from core.models import Article
+    from core.views import encode_cursor, feed_page
+
+    size = settings.FEED_PAGE_SIZE
+    if args.page * size > args.articles:
+        parser.error(f'--page {args.page} needs at least '
+                     f'{args.page * size} articles')
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        create_articles(args.articles)
+        for page in (1, args.page):
+            offset = (page - 1) * size
+            cursor = None
+            if offset:
+                cursor = encode_cursor(
+                    Article.objects.feed()[offset - 1:offset].get())
+            results = []
+            for func in (
+                    lambda: feed_page(cursor),
+                    lambda: list(Article.objects.feed()
+                                 [offset:offset + size])):
+                seconds = min(timeit.repeat(func, number=NUMBER, repeat=3))
+                results.append(seconds / NUMBER * 1000)
+            print(f'page {page:<8} keyset {results[0]:8.2f} ms  '
+                  f'offset {results[1]:8.2f} ms')
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
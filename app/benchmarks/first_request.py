@@ -0,0 +1,46 @@
+"""
+Benchmark of first request latency with and without templates pre-warming.
+Every case runs in a fresh process.
+"""
+import os
+import subprocess
+import sys
+
+CASES = [
+    ('app.settings', False),
+    ('app.settings.prod', False),
+    ('app.settings.prod', True),
+]
+
+CHILD = '''
+import os, sys, time
+import django
+django.setup()
+from django.test import Client
+from core.template_warmup import warm_templates
+if sys.argv[1] == '1':
+    warm_templates()
+client = Client(SERVER_NAME='localhost')
+start = time.perf_counter()
+assert client.get('/user/login/').status_code == 200
+first = time.perf_counter() - start
+start = time.perf_counter()
+client.get('/user/login/')
+print(first * 1000, (time.perf_counter() - start) * 1000)
+'''
+
+
+def main():
+    """Print first and second request latency for every case"""
+    for settings_module, prewarm in CASES:
+        env = dict(os.environ, DJANGO_SETTINGS_MODULE=settings_module)
+        output = subprocess.run(
+            [sys.executable, '-c', CHILD, str(int(prewarm))],
+            env=env, capture_output=True, text=True, check=True).stdout
+        first, second = map(float, output.split())
+        label = f'{settings_module} prewarm={prewarm}'
+        print(f'{label:<36} first {first:8.2f} ms  second {second:8.2f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+"""
+HTTP load test harness for comparing WSGI and ASGI deployments.
+
+Start the same code under both servers, for example
+
+    gunicorn app.wsgi -w 4 -b :8001
+    ASYNC_VIEWS=1 uvicorn app.asgi:application --workers 4 --port 8002
+
+and run
+
+    python -m benchmarks.loadtest http://localhost:8001/user/login/ \\
+        http://localhost:8002/user/login/ --concurrency 100
+
+Requests/sec, p50 and p99 latency are printed for every URL.
+"""
+import argparse
+import asyncio
+import time
+from urllib.parse import urlsplit
+
+
+async def fetch(host, port, path):
+    """Send GET request and return response status code"""
+    reader, writer = await asyncio.open_connection(host, port)
+    try:
+        writer.write(
+            f'GET {path} HTTP/1.1\r\nHost: {host}\r\n'
+            f'Connection: close\r\n\r\n'.encode())
+        await writer.drain()
+        status_line = await reader.readline()
+        await reader.read()
+        return int(status_line.split()[1])
+    finally:
+        writer.close()
+
+
+async def run(url, requests, concurrency):
+    """Send `requests` requests with `concurrency` parallel clients.
+     Returns (elapsed seconds, latencies, errors)"""
+    parts = urlsplit(url)
+    path = parts.path or '/'
+    if parts.query:
+        path += '?' + parts.query
+    latencies = []
+    errors = 0
+    remaining = requests
+
+    async def client():
+        nonlocal remaining, errors
+        while remaining > 0:
+            remaining -= 1
+            start = time.perf_counter()
+            try:
+                status = await fetch(parts.hostname, parts.port or 80, path)
+            except OSError:
+                status = None
+            if status is None or status >= 500:
+                errors += 1
+            else:
+                latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    await asyncio.gather(*(client() for _ in range(concurrency)))
+    return time.perf_counter() - start, sorted(latencies), errors
+
+
+def percentile(values, percent):
+    """Return percentile of sorted values"""
+    if not values:
+        return 0.0
+    index = min(int(len(values) * percent / 100), len(values) - 1)
+    return values[index]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n')[1])
+    parser.add_argument('urls', nargs='+')
+    parser.add_argument('--requests', type=int, default=2000)
+    parser.add_argument('--concurrency', type=int, default=50)
+    args = parser.parse_args()
+
+    print(f'{"url":<45} {"req/s":>9} {"p50 ms":>8} '
+          f'{"p99 ms":>8} {"errors":>7}')
+    for url in args.urls:
+        elapsed, latencies, errors = asyncio.run(
+            run(url, args.requests, args.concurrency))
+        print(f'{url:<45} {len(latencies) / elapsed:9.1f} '
+              f'{percentile(latencies, 50) * 1000:8.2f} '
+              f'{percentile(latencies, 99) * 1000:8.2f} {errors:7d}')
+
+
+if __name__ == '__main__':
+    main()
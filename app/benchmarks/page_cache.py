@@ -0,0 +1,56 @@
+"""
+Benchmark of user pages rendering with and without page cache
+"""
+import os
+import timeit
+
+import django
+
+NUMBER = 500
+PAGES = [
+    ('user/login.html', 'CustomAuthenticationForm'),
+    ('user/registration.html', 'CustomUserCreationForm'),
+    ('user/thanks.html', None),
+]
+
+
+def main():
+    """Print render time per request for every page"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    django.setup()
+
+    from django.contrib.auth.models import AnonymousUser
+    from django.core.cache import cache
+    from django.shortcuts import render
+    from django.test import RequestFactory, override_settings
+
+    from core.page_cache import render_cached
+    from user import forms
+
+    factory = RequestFactory()
+
+    def make_request():
+        request = factory.get('/')
+        request.user = AnonymousUser()
+        return request
+
+    with override_settings(PAGE_CACHE_TIMEOUT=300):
+        cache.clear()
+        for template_name, form_name in PAGES:
+            def context():
+                if form_name is None:
+                    return {}
+                return {'form': getattr(forms, form_name)()}
+
+            results = []
+            for func in (render, render_cached):
+                seconds = min(timeit.repeat(
+                    lambda: func(make_request(), template_name, context()),
+                    number=NUMBER, repeat=3))
+                results.append(seconds / NUMBER * 1e6)
+            print(f'{template_name:<24} render {results[0]:8.1f} us  '
+                  f'cached {results[1]:8.1f} us')
+
+
+if __name__ == '__main__':
+    main()
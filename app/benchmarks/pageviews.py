@@ -0,0 +1,67 @@
+"""
+Benchmark of article view counting.
+
+Counts views of a few articles with one UPDATE per view and with the
+buffered counters of core/pageviews.py, including their flush.
+
+    python -m benchmarks.pageviews --views 20000 --articles 10
+"""
+import argparse
+import os
+import time
+
+import django
+
+
+def main():
+    """Print views per second of direct and buffered counting"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--views', type=int, default=20000)
+    parser.add_argument('--articles', type=int, default=10)
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    django.setup()
+
+    from django.db.models import F
+    from django.test.utils import (setup_databases, setup_test_environment,
+                                   teardown_databases,
+                                   teardown_test_environment)
+    from django.utils import timezone
+
+    from benchmarks.feed import create_articles
+    from core import pageviews
+    from core.models import Article, VisitorSketch
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        create_articles(args.articles)
+        ids = list(Article.objects.values_list('pk', flat=True))
+        today = timezone.localdate()
+
+        def direct():
+            for i in range(args.views):
+                Article.objects.filter(pk=ids[i % len(ids)]).update(
+                    views_anonymous=F('views_anonymous') + 1)
+
+        def buffered():
+            for i in range(args.views):
+                pageviews.BUFFER.add(ids[i % len(ids)],
+                                     VisitorSketch.ANONYMOUS,
+                                     f'visitor-{i}', today)
+            pageviews.BUFFER.flush()
+
+        for name, func in (('direct', direct), ('buffered', buffered)):
+            start = time.perf_counter()
+            func()
+            seconds = time.perf_counter() - start
+            print(f'{name:<9} {args.views / seconds:12.0f} views/s')
+    finally:
+        pageviews.BUFFER.reset()
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,63 @@
+"""
+Benchmark of article search.
+
+Fills a test database with articles and times search_articles with the
+icontains fallback and, on PostgreSQL, with the GIN indexed full-text
+search. The fallback reads every article, full-text search should stay
+fast as the table grows.
+
+    python -m benchmarks.search --articles 100000 --query "budget vote"
+"""
+import argparse
+import os
+import timeit
+
+import django
+
+from benchmarks.feed import create_articles
+
+NUMBER = 20
+
+
+def main():
+    """Print time per search for fallback and full-text search"""
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--articles', type=int, default=100000)
+    parser.add_argument('--query', default='article 4242')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    django.setup()
+
+    from django.db import connection
+    from django.test.utils import (setup_databases, setup_test_environment,
+                                   teardown_databases,
+                                   teardown_test_environment)
+
+    from core.search import search_articles
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    try:
+        create_articles(args.articles)
+        modes = [('icontains', False)]
+        if connection.vendor == 'postgresql':
+            modes.append(('full-text', True))
+        else:
+            print('full-text search needs PostgreSQL, skipped')
+        for name, use_postgres in modes:
+            seconds = min(timeit.repeat(
+                lambda: search_articles(args.query,
+                                        use_postgres=use_postgres),
+                number=NUMBER, repeat=3))
+            found = len(search_articles(args.query,
+                                        use_postgres=use_postgres))
+            print(f'{name:<10} {seconds / NUMBER * 1000:8.2f} ms  '
+                  f'{found} found')
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""
+Benchmark suite for user app hot paths.
+
+Micro-benchmarks time single functions, macro-benchmarks time full
+request cycles through the Django test client and count database
+queries. Macro-benchmarks run against a test database created for
+the run, so the suite needs the same database access as the tests.
+
+    python -m benchmarks.suite --output bench-new.json
+    python -m benchmarks.compare bench-old.json bench-new.json
+
+Every call is timed separately, min, p50, p99 and mean are reported
+in microseconds.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from itertools import count
+
+import django
+
+BENCHMARKS = []
+
+
+def benchmark(name, number):
+    """Register a benchmark. Decorated function gets number of calls and
+     returns list of zero argument callables, each of them is timed"""
+    def decorator(func):
+        BENCHMARKS.append((name, number, func))
+        return func
+    return decorator
+
+
+def percentile(values, fraction):
+    """Return value at given fraction of sorted values"""
+    values = sorted(values)
+    return values[min(int(len(values) * fraction), len(values) - 1)]
+
+
+def measure(calls):
+    """Run calls and return timings and mean number of queries"""
+    from django.db import connection
+    from django.test.utils import CaptureQueriesContext
+
+    timings = []
+    queries = 0
+    for call in calls:
+        with CaptureQueriesContext(connection) as context:
+            start = time.perf_counter()
+            call()
+            timings.append((time.perf_counter() - start) * 1e6)
+        queries += len(context.captured_queries)
+    return {
+        'calls': len(timings),
+        'min_us': min(timings),
+        'p50_us': percentile(timings, 0.5),
+        'p99_us': percentile(timings, 0.99),
+        'mean_us': statistics.fmean(timings),
+        'queries': queries / len(timings),
+    }
+
+
+def git_revision():
+    """Return current commit hash or None outside of a git checkout"""
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', 'HEAD'], capture_output=True,
+            text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+_emails = count()
+
+
+def unique_email():
+    return f'bench{next(_emails)}@example.com'
+
+
+def register_benchmarks():
+    """Define benchmarks. Imports need configured Django"""
+    from django.contrib.auth import get_user_model
+    from django.contrib.auth.hashers import make_password
+    from django.test import Client
+    from django.urls import reverse
+
+    from user.forms import CustomAuthenticationForm, CustomUserCreationForm
+    from user.models import ActivationToken, crete_activation_link
+    from user.tokens import generate_token
+
+    password = 'benchpassword123'
+
+    @benchmark('micro.crete_activation_link', 10000)
+    def bench_crete_activation_link(number):
+        return [crete_activation_link] * number
+
+    @benchmark('micro.generate_token', 10000)
+    def bench_generate_token(number):
+        return [generate_token] * number
+
+    @benchmark('micro.make_password', 5)
+    def bench_make_password(number):
+        return [lambda: make_password(password)] * number
+
+    @benchmark('micro.user_creation_form', 50)
+    def bench_user_creation_form(number):
+        def call():
+            form = CustomUserCreationForm({
+                'email': unique_email(), 'name': 'Bench',
+                'password1': password, 'password2': password})
+            assert form.is_valid(), form.errors
+        return [call] * number
+
+    @benchmark('micro.authentication_form_invalid', 200)
+    def bench_authentication_form(number):
+        def call():
+            form = CustomAuthenticationForm(data={'username': ''})
+            assert not form.is_valid()
+        return [call] * number
+
+    @benchmark('macro.create_user', 5)
+    def bench_create_user(number):
+        return [lambda: get_user_model().objects.create_user(
+            email=unique_email(), password=password)] * number
+
+    @benchmark('macro.login_get', 200)
+    def bench_login_get(number):
+        client = Client()
+        url = reverse('user:login')
+        return [lambda: client.get(url)] * number
+
+    @benchmark('macro.login_post', 5)
+    def bench_login_post(number):
+        email = unique_email()
+        get_user_model().objects.create_user(
+            email=email, password=password, is_active=True)
+        url = reverse('user:login')
+
+        def call():
+            client = Client()
+            response = client.post(
+                url, {'username': email, 'password': password})
+            assert response.status_code == 302, response.status_code
+        return [call] * number
+
+    @benchmark('macro.registration_post', 5)
+    def bench_registration_post(number):
+        client = Client()
+        url = reverse('user:registration')
+
+        def call():
+            response = client.post(url, {
+                'email': unique_email(), 'name': 'Bench',
+                'password1': password, 'password2': password})
+            assert response.status_code == 302, response.status_code
+        return [call] * number
+
+    @benchmark('macro.activation_get', 100)
+    def bench_activation_get(number):
+        client = Client()
+        users = [get_user_model().objects.create_user(
+            email=unique_email(), password=password)
+            for _ in range(number)]
+        urls = [reverse('user:activation_link', args=[token.token])
+                for token in ActivationToken.objects.filter(user__in=users)]
+        return [lambda url=url: client.get(url) for url in urls]
+
+
+def run(names=None, scale=1.0):
+    """Run benchmarks which names start with one of `names`.
+     Returns dict of results"""
+    from django.test import override_settings
+    from django.test.utils import (setup_databases, setup_test_environment,
+                                   teardown_databases,
+                                   teardown_test_environment)
+
+    setup_test_environment()
+    old_config = setup_databases(verbosity=0, interactive=False)
+    results = {}
+    try:
+        with override_settings(RATELIMIT_RULES={}):
+            for name, number, func in BENCHMARKS:
+                if names and not name.startswith(tuple(names)):
+                    continue
+                calls = func(max(int(number * scale), 1))
+                results[name] = measure(calls)
+                print(f'{name:<36} p50 {results[name]["p50_us"]:12.1f} us  '
+                      f'queries {results[name]["queries"]:5.1f}',
+                      file=sys.stderr)
+    finally:
+        teardown_databases(old_config, verbosity=0)
+        teardown_test_environment()
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument(
+        'names', nargs='*',
+        help='Run only benchmarks with these name prefixes')
+    parser.add_argument(
+        '--scale', type=float, default=1.0,
+        help='Multiplier for number of calls of every benchmark')
+    parser.add_argument(
+        '--output', help='JSON file for results, stdout by default')
+    args = parser.parse_args()
+
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    django.setup()
+    from django.conf import settings
+
+    register_benchmarks()
+    report = {
+        'revision': git_revision(),
+        'created_at': datetime.now(timezone.utc).isoformat(),
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'settings': os.environ['DJANGO_SETTINGS_MODULE'],
+        'password_hasher': settings.PASSWORD_HASHERS[0],
+        'results': run(args.names, args.scale),
+    }
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as file:
+            json.dump(report, file, indent=2)
+    else:
+        json.dump(report, sys.stdout, indent=2)
+
+
+if __name__ == '__main__':
+    main()
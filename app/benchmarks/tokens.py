@@ -0,0 +1,34 @@
+"""
+Micro-benchmark for activation token generation.
+Compares legacy crete_activation_link with tokens module
+"""
+import os
+import timeit
+
+import django
+
+NUMBER = 100000
+
+
+def main():
+    """Print cost per token for every generator"""
+    os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'app.settings')
+    django.setup()
+
+    from user.models import crete_activation_link
+    from user.tokens import generate_token, generate_tokens
+
+    cases = [
+        ('crete_activation_link', crete_activation_link, 1),
+        ('generate_token', generate_token, 1),
+        ('generate_tokens(1000)', lambda: generate_tokens(1000), 1000),
+    ]
+    for name, func, per_call in cases:
+        calls = max(NUMBER // per_call, 1)
+        seconds = min(timeit.repeat(func, number=calls, repeat=3))
+        per_token = seconds / (calls * per_call) * 1e6
+        print(f'{name:<24} {per_token:8.3f} us/token')
+
+
+if __name__ == '__main__':
+    main()
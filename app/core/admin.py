@@ -1,3 +1,35 @@
-from django.contrib import admin  # noqa
+"""
+Django admin customization
+"""
+from datetime import timedelta
 
-# Register your models here.
+from django.contrib import admin
+from django.utils import timezone
+
+from . import pageviews
+from .models import Article
+
+
+class ArticleAdmin(admin.ModelAdmin):
+    """Define the admin pages for articles"""
+    list_display = ['title', 'author', 'status', 'published_at']
+    list_filter = ['status']
+    list_select_related = ['author']
+    raw_id_fields = ['author']
+    # Changed concurrently by readers, a form save would overwrite it
+    readonly_fields = ['engagement', 'views_authenticated',
+                       'views_anonymous', 'unique_visitors']
+
+    @admin.display(description='Unique visitors, last 30 days')
+    def unique_visitors(self, article):
+        if article.pk is None:
+            return 0
+        today = timezone.localdate()
+        return pageviews.unique_visitors(
+            article.pk, today - timedelta(days=29), today)
+    prepopulated_fields = {'slug': ('title',)}
+    search_fields = ['title']
+    ordering = ['-published_at', '-id']
+
+
+admin.site.register(Article, ArticleAdmin)
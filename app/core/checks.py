@@ -0,0 +1,76 @@
+"""
+Deployment checks for performance settings.
+Reported by `manage.py check --deploy` and `manage.py check_performance`.
+"""
+from django.conf import settings
+from django.core.checks import Warning, register
+
+CACHED_LOADER = 'django.template.loaders.cached.Loader'
+POOL_ENGINE = 'core.db.backends.postgresql_pool'
+
+
+def _template_loaders():
+    loaders = []
+    for template in settings.TEMPLATES:
+        for loader in template.get('OPTIONS', {}).get('loaders', []):
+            loaders.append(loader[0] if isinstance(loader, tuple) else loader)
+    return loaders
+
+
+def _cached_loader_enabled():
+    if not any('loaders' in template.get('OPTIONS', {})
+               for template in settings.TEMPLATES):
+        # Django enables cached loader itself when DEBUG is off
+        return not settings.DEBUG
+    return CACHED_LOADER in _template_loaders()
+
+
+# (check id, setting description, is enabled, hint)
+PERFORMANCE_SETTINGS = [
+    ('core.W001', 'DEBUG is off',
+     lambda: not settings.DEBUG,
+     'DEBUG keeps all SQL queries in memory and disables '
+     'cached template loader.'),
+    ('core.W002', 'persistent or pooled database connections',
+     lambda: all(db.get('CONN_MAX_AGE', 0) != 0 or db['ENGINE'] == POOL_ENGINE
+                 for db in settings.DATABASES.values()),
+     'Set DB_ENGINE to core.db.backends.postgresql_pool or '
+     'DB_CONN_MAX_AGE to reuse connections between requests.'),
+    ('core.W003', 'cached template loader',
+     _cached_loader_enabled,
+     'Templates are parsed on every render.'),
+    ('core.W004', 'cache backend',
+     lambda: settings.CACHES['default']['BACKEND'] !=
+     'django.core.cache.backends.dummy.DummyCache',
+     'Set CACHE_BACKEND to a real cache.'),
+    ('core.W005', 'cached sessions',
+     lambda: settings.SESSION_ENGINE in (
+         'django.contrib.sessions.backends.cache',
+         'django.contrib.sessions.backends.cached_db',
+         'django.contrib.sessions.backends.signed_cookies'),
+     'Database sessions cost a query on every request, '
+     'set SESSION_CACHE_BACKEND to a shared cache such as Redis.'),
+    ('core.W006', 'page cache (PAGE_CACHE_TIMEOUT)',
+     lambda: settings.PAGE_CACHE_TIMEOUT > 0,
+     'Set PAGE_CACHE_TIMEOUT to cache pages for anonymous users.'),
+    ('core.W007', 'templates pre-warming (PREWARM_TEMPLATES)',
+     lambda: settings.PREWARM_TEMPLATES,
+     'First request of every worker parses templates.'),
+]
+
+
+def performance_status():
+    """Return list of (check id, description, is enabled, hint)"""
+    return [(check_id, description, bool(enabled()), hint)
+            for check_id, description, enabled, hint in PERFORMANCE_SETTINGS]
+
+
+@register('performance', deploy=True)
+def check_performance_settings(app_configs, **kwargs):
+    """Warn about every disabled performance setting"""
+    return [
+        Warning(f'Performance setting is off: {description}.',
+                hint=hint, id=check_id)
+        for check_id, description, enabled, hint in performance_status()
+        if not enabled
+    ]
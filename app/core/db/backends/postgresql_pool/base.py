@@ -0,0 +1,103 @@
+"""
+PostgreSQL backend with connection pool.
+
+Use 'core.db.backends.postgresql_pool' as ENGINE. Pool is configured
+with POOL key of the database settings:
+
+    'POOL': {
+        'MIN_SIZE': 1,
+        'MAX_SIZE': 10,
+        'TIMEOUT': 30,
+        'HEALTH_CHECK_INTERVAL': 30,
+    }
+
+Closing connection returns it to the pool, so keep CONN_MAX_AGE at 0.
+"""
+import threading
+
+from django.db.backends.postgresql import base, creation
+from django.db.utils import OperationalError
+from psycopg2 import extensions
+
+from core.db.pool import ConnectionPool, PoolTimeout
+
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def check_connection(conn):
+    """Run trivial query, raises for broken connections"""
+    with conn.cursor() as cursor:
+        cursor.execute('SELECT 1')
+    conn.rollback()
+
+
+def reset_connection(conn):
+    """Rollback unfinished transaction before connection is reused"""
+    status = conn.info.transaction_status
+    if status == extensions.TRANSACTION_STATUS_UNKNOWN:
+        raise OperationalError('Connection is broken')
+    if status != extensions.TRANSACTION_STATUS_IDLE:
+        conn.rollback()
+
+
+def get_pool(conn_params, options):
+    """Return pool for connection parameters"""
+    key = tuple(sorted((name, str(value))
+                       for name, value in conn_params.items()))
+    with _pools_lock:
+        if key not in _pools:
+            _pools[key] = ConnectionPool(
+                min_size=options.get('MIN_SIZE', 1),
+                max_size=options.get('MAX_SIZE', 10),
+                timeout=options.get('TIMEOUT', 30),
+                health_check_interval=options.get(
+                    'HEALTH_CHECK_INTERVAL', 30),
+                check=check_connection,
+                reset=reset_connection,
+            )
+        return _pools[key]
+
+
+def pool_stats():
+    """Return metrics of all pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+def close_pools():
+    """Close idle connections of all pools"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    for pool in pools:
+        pool.closeall()
+
+
+class DatabaseCreation(creation.DatabaseCreation):
+
+    def _destroy_test_db(self, test_database_name, verbosity):
+        # Idle pooled connections would block DROP DATABASE
+        close_pools()
+        super()._destroy_test_db(test_database_name, verbosity)
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    """PostgreSQL database wrapper which takes connections from pool"""
+    creation_class = DatabaseCreation
+
+    def get_new_connection(self, conn_params):
+        self._pool = get_pool(conn_params, self.settings_dict.get('POOL', {}))
+        try:
+            connection = self._pool.getconn(
+                lambda: super(DatabaseWrapper, self).get_new_connection(
+                    conn_params))
+        except PoolTimeout as exc:
+            raise OperationalError(str(exc)) from exc
+        self.isolation_level = self.settings_dict['OPTIONS'].get(
+            'isolation_level', connection.isolation_level)
+        return connection
+
+    def _close(self):
+        if self.connection is not None:
+            self._pool.putconn(self.connection)
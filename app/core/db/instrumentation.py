@@ -0,0 +1,35 @@
+"""
+Execute wrappers installed on every database connection.
+
+Wrappers registered here are added to connections of all threads,
+including ones created later, e.g. by sync_to_async.
+"""
+import threading
+
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+_wrappers = []
+_lock = threading.Lock()
+
+
+def register(wrapper):
+    """Add execute wrapper to all database connections"""
+    with _lock:
+        if wrapper not in _wrappers:
+            _wrappers.append(wrapper)
+        connection_created.connect(
+            _install, dispatch_uid='core.db.instrumentation')
+    instrument_connections()
+
+
+def _install(connection, **kwargs):
+    for wrapper in _wrappers:
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+
+def instrument_connections():
+    """Add registered wrappers to connections of the current thread"""
+    for connection in connections.all():
+        _install(connection)
@@ -0,0 +1,150 @@
+"""
+Thread-safe database connection pool.
+
+The pool does not know how to open connections, a factory is passed
+to getconn(), so it is used by the postgresql_pool backend and can be
+tested with stand-in connections.
+"""
+import threading
+import time
+
+
+class PoolTimeout(Exception):
+    """Raised when no connection becomes free in time"""
+
+
+class ConnectionPool:
+    """Pool of at most max_size connections.
+
+     check(conn) is called for connections idle longer than
+     health_check_interval and must raise for broken connections.
+     reset(conn) is called when connection is returned and must
+     raise if connection can not be reused."""
+
+    def __init__(self, min_size=1, max_size=10, timeout=30,
+                 health_check_interval=30, check=None, reset=None):
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self._check = check
+        self._reset = reset
+        self._idle = []
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(max_size)
+        self.checked_out = 0
+        self.waiting = 0
+        self.created = 0
+        self.discarded = 0
+        self.timeouts = 0
+
+    def getconn(self, factory):
+        """Return free connection, create it with factory if needed.
+         Blocks up to timeout seconds when all connections are in use"""
+        with self._lock:
+            self.waiting += 1
+        try:
+            acquired = self._slots.acquire(timeout=self.timeout)
+        finally:
+            with self._lock:
+                self.waiting -= 1
+        if not acquired:
+            with self._lock:
+                self.timeouts += 1
+            raise PoolTimeout(
+                f'No free database connection in {self.timeout} seconds')
+
+        try:
+            conn = self._take_idle()
+            if conn is None:
+                conn = factory()
+                with self._lock:
+                    self.created += 1
+                self._prefill(factory)
+        except BaseException:
+            self._slots.release()
+            raise
+        with self._lock:
+            self.checked_out += 1
+        return conn
+
+    def putconn(self, conn, discard=False):
+        """Return connection to pool"""
+        with self._lock:
+            self.checked_out -= 1
+        try:
+            if not discard and self._reset is not None:
+                try:
+                    self._reset(conn)
+                except Exception:
+                    discard = True
+            if discard:
+                self._discard(conn)
+            else:
+                with self._lock:
+                    self._idle.append((conn, time.monotonic()))
+        finally:
+            self._slots.release()
+
+    def closeall(self):
+        """Close all idle connections"""
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for conn, _ in idle:
+            self._discard(conn)
+
+    def stats(self):
+        """Return pool metrics"""
+        with self._lock:
+            return {
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'idle': len(self._idle),
+                'checked_out': self.checked_out,
+                'waiting': self.waiting,
+                'created': self.created,
+                'discarded': self.discarded,
+                'timeouts': self.timeouts,
+            }
+
+    def _take_idle(self):
+        """Return healthy idle connection or None"""
+        while True:
+            with self._lock:
+                if not self._idle:
+                    return None
+                conn, returned_at = self._idle.pop()
+            if self._is_healthy(conn, returned_at):
+                return conn
+            self._discard(conn)
+
+    def _is_healthy(self, conn, returned_at):
+        if getattr(conn, 'closed', False):
+            return False
+        idle_for = time.monotonic() - returned_at
+        if self._check is None or idle_for < self.health_check_interval:
+            return True
+        try:
+            self._check(conn)
+        except Exception:
+            return False
+        return True
+
+    def _prefill(self, factory):
+        """Open connections until min_size connections are open.
+         Discarded connections are replaced too"""
+        with self._lock:
+            missing = self.min_size - (self.created - self.discarded)
+        for _ in range(max(missing, 0)):
+            conn = factory()
+            with self._lock:
+                self.created += 1
+                self._idle.append((conn, time.monotonic()))
+
+    def _discard(self, conn):
+        with self._lock:
+            self.discarded += 1
+        try:
+            conn.close()
+        except Exception:
+            pass
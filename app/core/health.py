@@ -0,0 +1,52 @@
+"""
+Database probe and cached readiness state for health endpoints
+"""
+import threading
+import time
+
+from django.db import connections
+from django.db.utils import OperationalError
+from psycopg2 import OperationalError as Psycopg2Error
+
+DATABASE_ERRORS = (Psycopg2Error, OperationalError)
+
+
+def probe_database(alias='default'):
+    """Run trivial query on database. Raises DATABASE_ERRORS
+     when database is unavailable"""
+    with connections[alias].cursor() as cursor:
+        cursor.execute('SELECT 1')
+
+
+class ReadinessState:
+    """Result of the last database probe.
+     Database is probed at most once per interval, other requests
+     get the cached result without touching the database"""
+
+    def __init__(self, interval, probe=None):
+        self.interval = interval
+        self.probe = probe if probe is not None else probe_database
+        self.ready = False
+        self.checked_at = None
+        self._lock = threading.Lock()
+
+    def is_ready(self):
+        """Return cached readiness, refresh it when it is outdated"""
+        now = time.monotonic()
+        if (self.checked_at is not None
+                and now - self.checked_at < self.interval):
+            return self.ready
+        if not self._lock.acquire(blocking=False):
+            # Other thread is probing right now
+            return self.ready
+        try:
+            try:
+                self.probe()
+            except DATABASE_ERRORS:
+                self.ready = False
+            else:
+                self.ready = True
+            self.checked_at = time.monotonic()
+        finally:
+            self._lock.release()
+        return self.ready
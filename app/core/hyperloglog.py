@@ -0,0 +1,99 @@
+"""
+HyperLogLog sketch for counting distinct values.
+
+A sketch of precision p keeps 2**p one byte registers and estimates
+the number of distinct values added with a standard error of about
+1.04 / sqrt(2**p), 2.3% for p=11. Sketches merge by taking the maximum
+of every register, so daily sketches add up to sketches of longer
+periods without double counting. A sketch can be folded exactly to a
+lower precision, so sketches of different precision merge at the lower
+one.
+"""
+import hashlib
+import math
+import zlib
+
+
+class HyperLogLog:
+    """Distinct value counter with 2**precision registers"""
+
+    def __init__(self, precision=11, registers=None):
+        if not 4 <= precision <= 16:
+            raise ValueError('precision must be between 4 and 16')
+        self.precision = precision
+        self.size = 1 << precision
+        self.registers = bytearray(registers or self.size)
+        if len(self.registers) != self.size:
+            raise ValueError(f'expected {self.size} registers, '
+                             f'got {len(self.registers)}')
+
+    def add(self, value):
+        """Add str or bytes value"""
+        if isinstance(value, str):
+            value = value.encode()
+        hashed = int.from_bytes(
+            hashlib.blake2b(value, digest_size=8).digest(), 'big')
+        bits = 64 - self.precision
+        index = hashed >> bits
+        rank = bits - (hashed & ((1 << bits) - 1)).bit_length() + 1
+        if rank > self.registers[index]:
+            self.registers[index] = rank
+
+    def merge(self, other):
+        """Add all values of other sketch to this one. This sketch is
+         downsampled first when other has lower precision"""
+        if other.precision > self.precision:
+            other = other.downsample(self.precision)
+        elif other.precision < self.precision:
+            downsampled = self.downsample(other.precision)
+            self.precision = downsampled.precision
+            self.size = downsampled.size
+            self.registers = downsampled.registers
+        self.registers = bytearray(map(max, self.registers, other.registers))
+
+    def downsample(self, precision):
+        """Return sketch of lower precision with the same values, equal
+         to one the values would have been added to directly"""
+        if precision > self.precision:
+            raise ValueError('Cannot increase precision of a sketch')
+        shift = self.precision - precision
+        low_mask = (1 << shift) - 1
+        sketch = HyperLogLog(precision)
+        registers = sketch.registers
+        for index, rank in enumerate(self.registers):
+            if not rank:
+                continue
+            # Dropped index bits become the first bits of the rank
+            low = index & low_mask
+            if low:
+                rank = shift - low.bit_length() + 1
+            else:
+                rank += shift
+            if rank > registers[index >> shift]:
+                registers[index >> shift] = rank
+        return sketch
+
+    def count(self):
+        """Return estimated number of distinct values"""
+        size = self.size
+        alpha = 0.7213 / (1 + 1.079 / size)
+        estimate = alpha * size * size / sum(
+            2.0 ** -register for register in self.registers)
+        zeros = self.registers.count(0)
+        if estimate <= 2.5 * size and zeros:
+            # Linear counting is more accurate for small cardinalities
+            estimate = size * math.log(size / zeros)
+        return round(estimate)
+
+    def to_bytes(self):
+        """Return compressed registers. Sketches of rarely read articles
+         are mostly zeros and take a few dozen bytes"""
+        return zlib.compress(bytes(self.registers))
+
+    @classmethod
+    def from_bytes(cls, data, precision=11):
+        """Return sketch of to_bytes() data, empty one for no data"""
+        if not data:
+            return cls(precision)
+        registers = zlib.decompress(bytes(data))
+        return cls(len(registers).bit_length() - 1, registers)
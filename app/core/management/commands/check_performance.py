@@ -0,0 +1,29 @@
+"""
+Django command to report performance settings
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.checks import performance_status
+
+
+class Command(BaseCommand):
+    """Django command to show which performance settings are off."""
+    help = 'Report which performance settings are off'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail', action='store_true',
+            help='Exit with error if any performance setting is off')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        disabled = 0
+        for check_id, description, enabled, hint in performance_status():
+            if enabled:
+                self.stdout.write(self.style.SUCCESS(f'[on]  {description}'))
+            else:
+                disabled += 1
+                self.stdout.write(self.style.WARNING(
+                    f'[off] {description} ({check_id}): {hint}'))
+        if disabled and options['fail']:
+            raise CommandError(f'{disabled} performance settings are off')
@@ -0,0 +1,133 @@
+"""
+Django command to delete users who never activated their accounts.
+
+Users are selected in batches with keyset pagination on id and every
+batch is deleted in its own short transaction. The command sleeps
+between batches and waits while replicas lag behind, so a large
+cleanup does not stall the primary or the replicas.
+
+Users who wrote articles are kept, articles protect their authors
+from deletion.
+
+Users created before date_joined existed got it from their first login
+or activation token (migration user/0009). Users with neither kept the
+time of migration user/0008 and are deleted only DAYS days after it.
+"""
+import json
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.core.management.base import BaseCommand
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import connection, transaction
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+from core.models import Article
+from user.models import ActivationToken
+
+ARCHIVE_FIELDS = ['id', 'email', 'name', 'date_joined']
+
+
+def replication_lag():
+    """Return the largest replay lag of replicas in seconds.
+     Always 0 for databases other than PostgreSQL"""
+    if connection.vendor != 'postgresql':
+        return 0
+    with connection.cursor() as cursor:
+        cursor.execute(
+            'SELECT COALESCE(MAX(EXTRACT(EPOCH FROM replay_lag)), 0) '
+            'FROM pg_stat_replication')
+        return float(cursor.fetchone()[0])
+
+
+class Command(BaseCommand):
+    """Django command to clean up never activated users."""
+    help = 'Delete users who did not activate their accounts in time'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=30,
+            help='Delete users who joined more than DAYS days ago. '
+                 'Old users without activation tokens count as joined '
+                 'when date_joined was added')
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Users deleted per transaction')
+        parser.add_argument(
+            '--sleep', type=float, default=0.1,
+            help='Seconds to pause between batches')
+        parser.add_argument(
+            '--max-lag', type=float, default=5,
+            help='Wait while replicas lag more than this many seconds')
+        parser.add_argument(
+            '--archive',
+            help='Append deleted users to this JSONL file')
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Only count users which would be deleted')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        joined_before = timezone.now() - timedelta(days=options['days'])
+        never_activated = get_user_model().objects.never_activated(
+            joined_before)
+        has_articles = Exists(Article.objects.filter(author=OuterRef('pk')))
+        users = never_activated.filter(~has_articles)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.SUCCESS(
+                f'{users.count()} users would be deleted'))
+            return
+
+        archive = None
+        if options['archive']:
+            archive = open(options['archive'], 'a', encoding='utf-8')
+
+        last_id = 0
+        done = 0
+        start = time.monotonic()
+        try:
+            while True:
+                with transaction.atomic():
+                    batch = list(
+                        users.select_for_update()
+                        .filter(id__gt=last_id)
+                        .order_by('id')
+                        .values(*ARCHIVE_FIELDS)[:options['batch_size']])
+                    if not batch:
+                        break
+                    last_id = batch[-1]['id']
+                    _, deleted = users.filter(
+                        id__in=[row['id'] for row in batch]).delete()
+                    if archive is not None:
+                        self._archive(archive, batch)
+                done += deleted.get(users.model._meta.label, 0)
+                rate = done / max(time.monotonic() - start, 1e-9)
+                self.stdout.write(
+                    f'Deleted {done} users, {rate:.0f} rows/sec')
+                self._throttle(options['sleep'], options['max_lag'])
+        finally:
+            if archive is not None:
+                archive.close()
+
+        tokens = ActivationToken.objects.purge()
+        kept = never_activated.filter(has_articles).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {done} never activated users '
+            f'and {tokens} expired activation tokens, '
+            f'kept {kept} users with articles'))
+
+    @staticmethod
+    def _archive(file, batch):
+        for row in batch:
+            file.write(json.dumps(row, cls=DjangoJSONEncoder) + '\n')
+        file.flush()
+
+    @staticmethod
+    def _throttle(sleep, max_lag):
+        """Pause after a batch and until replicas catch up"""
+        time.sleep(sleep)
+        while replication_lag() > max_lag:
+            time.sleep(max(sleep, 1))
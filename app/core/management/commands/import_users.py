@@ -0,0 +1,199 @@
+"""
+Django command to import users from CSV or JSONL file.
+
+Rows are streamed from the file, passwords are hashed in a process pool
+and users are written in batches with PostgreSQL COPY (bulk_create
+is used for other databases).
+"""
+import csv
+import io
+import json
+import time
+from concurrent.futures import ProcessPoolExecutor
+from itertools import islice
+from pathlib import Path
+
+import django
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+
+from user.emails import queue_activation_emails
+from user.models import ActivationToken
+
+COLUMNS = ['email', 'name', 'password', 'date_joined',
+           'is_active', 'is_staff', 'is_superuser']
+
+
+def read_rows(path):
+    """Yield user dicts from CSV (with header) or JSONL file"""
+    with open(path, newline='', encoding='utf-8') as file:
+        if Path(path).suffix == '.jsonl':
+            for line in file:
+                if line.strip():
+                    yield json.loads(line)
+        else:
+            yield from csv.DictReader(file)
+
+
+def batched(rows, size):
+    """Yield lists of at most `size` rows"""
+    while True:
+        batch = list(islice(rows, size))
+        if not batch:
+            return
+        yield batch
+
+
+def _init_worker():
+    """Configure Django in spawned worker processes"""
+    django.setup()
+
+
+def copy_users(users):
+    """Insert users with COPY into a staging table. Users with already
+     existing emails are skipped. The staging table has only COLUMNS,
+     so id and defaults come from the users table on INSERT"""
+    model = get_user_model()
+    qn = connection.ops.quote_name
+    table = qn(model._meta.db_table)
+    columns = ', '.join(qn(model._meta.get_field(name).column)
+                        for name in COLUMNS)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    for user in users:
+        writer.writerow([getattr(user, name) for name in COLUMNS])
+    buffer.seek(0)
+    # Unquoted empty CSV values are read as NULL, name may be empty
+    name = qn(model._meta.get_field('name').column)
+    with connection.cursor() as cursor:
+        cursor.execute(
+            f'CREATE TEMP TABLE import_users ON COMMIT DROP AS '
+            f'SELECT {columns} FROM {table} WITH NO DATA')
+        cursor.copy_expert(
+            f'COPY import_users ({columns}) FROM STDIN '
+            f'WITH (FORMAT csv, FORCE_NOT_NULL ({name}))',
+            buffer)
+        cursor.execute(
+            f'INSERT INTO {table} ({columns}) '
+            f'SELECT {columns} FROM import_users '
+            f'ON CONFLICT ({qn("email")}) DO NOTHING')
+
+
+def bulk_create_users(users):
+    """Insert users with bulk_create. Existing emails are skipped"""
+    get_user_model().objects.bulk_create(users, ignore_conflicts=True)
+
+
+class Command(BaseCommand):
+    """Django command to bulk import users."""
+    help = 'Import users from CSV or JSONL file'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='CSV or JSONL file with users')
+        parser.add_argument(
+            '--batch-size', type=int, default=5000,
+            help='Users per transaction')
+        parser.add_argument(
+            '--workers', type=int, default=None,
+            help='Hashing processes, 0 hashes in the current process')
+        parser.add_argument(
+            '--offset', type=int, default=None,
+            help='Number of rows to skip')
+        parser.add_argument(
+            '--checkpoint',
+            help='File to store offset of last imported row. '
+                 'Import resumes from it if --offset is not given')
+        parser.add_argument(
+            '--active', action='store_true',
+            help='Import users as activated, no activation tokens issued')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        path = options['path']
+        if not Path(path).exists():
+            raise CommandError(f'File {path} does not exist')
+        checkpoint = options['checkpoint']
+        offset = options['offset']
+        if offset is None:
+            offset = self._read_checkpoint(checkpoint)
+
+        if connection.vendor == 'postgresql':
+            write = copy_users
+        else:
+            write = bulk_create_users
+
+        rows = islice(read_rows(path), offset, None)
+        if options['workers'] == 0:
+            executor = None
+            hash_passwords = self._map_in_process
+        else:
+            executor = ProcessPoolExecutor(
+                max_workers=options['workers'],
+                initializer=_init_worker)
+            hash_passwords = executor.map
+
+        done = 0
+        start = time.monotonic()
+        try:
+            for batch in batched(rows, options['batch_size']):
+                passwords = hash_passwords(
+                    make_password, [row['password'] for row in batch])
+                users = self._build_users(batch, passwords, options['active'])
+                with transaction.atomic():
+                    write(users)
+                    if not options['active']:
+                        self._issue_tokens(users)
+                done += len(batch)
+                self._write_checkpoint(checkpoint, offset + done)
+                rate = done / max(time.monotonic() - start, 1e-9)
+                self.stdout.write(
+                    f'Imported {done} rows, {rate:.0f} rows/sec')
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Import finished, next offset {offset + done}'))
+
+    @staticmethod
+    def _map_in_process(func, values):
+        return map(func, values)
+
+    @staticmethod
+    def _build_users(batch, passwords, active):
+        """Return unsaved users for rows of a batch"""
+        model = get_user_model()
+        return [
+            model(
+                email=model.objects.normalize_email(row['email']),
+                name=row.get('name') or '',
+                password=password,
+                is_active=active,
+            )
+            for row, password in zip(batch, passwords)
+        ]
+
+    @staticmethod
+    def _issue_tokens(users):
+        """Issue activation tokens for newly imported users
+         and queue activation emails"""
+        new_users = list(
+            get_user_model().objects
+            .filter(email__in=[user.email for user in users],
+                    activation_tokens__isnull=True,
+                    is_active=False)
+            .only('id', 'email'))
+        queue_activation_emails(ActivationToken.objects.issue_many(new_users))
+
+    @staticmethod
+    def _read_checkpoint(checkpoint):
+        if checkpoint and Path(checkpoint).exists():
+            return int(Path(checkpoint).read_text().strip() or 0)
+        return 0
+
+    @staticmethod
+    def _write_checkpoint(checkpoint, offset):
+        if checkpoint:
+            Path(checkpoint).write_text(str(offset))
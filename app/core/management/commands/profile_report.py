@@ -0,0 +1,148 @@
+"""
+Django command to aggregate request profiles written by
+ProfilingMiddleware.
+
+Prints average SQL, template and hashing time per view from request
+summaries and the hottest functions of all cProfile dumps and
+sampled stacks.
+"""
+import json
+import pstats
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = {'cumulative': 3, 'tottime': 2, 'calls': 1}
+
+
+def read_summaries(directory, view=None):
+    """Return request summaries, optionally only of one view"""
+    summaries = []
+    for path in sorted(directory.glob('*.json')):
+        summary = json.loads(path.read_text())
+        if view is None or summary.get('view') == view:
+            summaries.append((path.stem, summary))
+    return summaries
+
+
+def hot_functions(paths, sort, limit):
+    """Return top functions of cProfile dumps as
+     (calls, tottime, cumtime, name) tuples"""
+    stats = pstats.Stats(*map(str, paths))
+    rows = [
+        (nc, tt, ct, pstats.func_std_string(func))
+        for func, (cc, nc, tt, ct, callers) in stats.stats.items()
+    ]
+    index = SORT_KEYS[sort] - 1
+    rows.sort(key=lambda row: row[index], reverse=True)
+    return rows[:limit]
+
+
+def read_folded(paths):
+    """Return Counter of merged collapsed stacks"""
+    stacks = Counter()
+    for path in paths:
+        for line in path.read_text().splitlines():
+            stack, _, samples = line.rpartition(' ')
+            if stack:
+                stacks[stack] += int(samples)
+    return stacks
+
+
+def hot_frames(stacks, limit):
+    """Return (self samples, total samples, frame) of top frames"""
+    own = Counter()
+    total = Counter()
+    for stack, samples in stacks.items():
+        frames = stack.split(';')
+        own[frames[-1]] += samples
+        for frame in set(frames):
+            total[frame] += samples
+    return [(samples, total[frame], frame)
+            for frame, samples in own.most_common(limit)]
+
+
+class Command(BaseCommand):
+    """Django command to report hot spots of profiled requests."""
+    help = 'Aggregate request profiles written by ProfilingMiddleware'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--dir', default=None,
+            help="Profiles directory, PROFILING['DIR'] by default")
+        parser.add_argument(
+            '--view', help='Only requests of this URL name, e.g. user:login')
+        parser.add_argument(
+            '--limit', type=int, default=20,
+            help='Number of functions to show')
+        parser.add_argument(
+            '--sort', choices=sorted(SORT_KEYS), default='cumulative',
+            help='Order of cProfile functions')
+        parser.add_argument(
+            '--folded-output',
+            help='Write merged sampled stacks to this file')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        directory = Path(options['dir'] or settings.PROFILING['DIR'])
+        if not directory.is_dir():
+            raise CommandError(f'Directory {directory} does not exist')
+
+        summaries = read_summaries(directory, options['view'])
+        if not summaries:
+            raise CommandError('No profiled requests found')
+        self._write_views([summary for _, summary in summaries])
+
+        names = {name for name, _ in summaries}
+        profiles = [directory / f'{name}.prof' for name in sorted(names)
+                    if (directory / f'{name}.prof').exists()]
+        folded = [directory / f'{name}.folded' for name in sorted(names)
+                  if (directory / f'{name}.folded').exists()]
+
+        if profiles:
+            self.stdout.write(
+                f'\nTop functions of {len(profiles)} cProfile dumps '
+                f'by {options["sort"]}:')
+            self.stdout.write(
+                f'{"calls":>10} {"tottime":>10} {"cumtime":>10}  function')
+            for calls, tottime, cumtime, name in hot_functions(
+                    profiles, options['sort'], options['limit']):
+                self.stdout.write(
+                    f'{calls:>10} {tottime:>10.4f} {cumtime:>10.4f}  {name}')
+
+        if folded:
+            stacks = read_folded(folded)
+            self.stdout.write(
+                f'\nTop frames of {len(folded)} sampled requests:')
+            self.stdout.write(f'{"self":>8} {"total":>8}  frame')
+            for own, total, frame in hot_frames(stacks, options['limit']):
+                self.stdout.write(f'{own:>8} {total:>8}  {frame}')
+            if options['folded_output']:
+                Path(options['folded_output']).write_text(''.join(
+                    f'{stack} {samples}\n'
+                    for stack, samples in stacks.most_common()))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'\nAggregated {len(summaries)} profiled requests'))
+
+    def _write_views(self, summaries):
+        """Write average request times per view"""
+        by_view = defaultdict(list)
+        for summary in summaries:
+            by_view[summary.get('view') or summary['path']].append(summary)
+
+        self.stdout.write(
+            f'{"view":<32} {"requests":>8} {"total ms":>9} {"sql":>5} '
+            f'{"sql ms":>8} {"tmpl ms":>8} {"hash ms":>8}')
+        for view, items in sorted(by_view.items()):
+            def mean(key):
+                return sum(item[key] for item in items) / len(items)
+            self.stdout.write(
+                f'{view:<32} {len(items):>8} '
+                f'{mean("duration") * 1000:>9.1f} '
+                f'{mean("sql_count"):>5.1f} '
+                f'{mean("sql_time") * 1000:>8.1f} '
+                f'{mean("template_time") * 1000:>8.1f} '
+                f'{mean("hash_time") * 1000:>8.1f}')
@@ -0,0 +1,16 @@
+"""
+Django command to delete expired user activation tokens
+"""
+from django.core.management.base import BaseCommand
+
+from user.models import ActivationToken
+
+
+class Command(BaseCommand):
+    """Django command to purge expired activation tokens."""
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        deleted = ActivationToken.objects.purge()
+        self.stdout.write(self.style.SUCCESS(
+            f'Deleted {deleted} expired activation tokens'))
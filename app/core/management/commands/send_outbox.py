@@ -0,0 +1,117 @@
+"""
+Django command to send emails from outbox.
+
+Due emails are sent in batches over one SMTP connection per batch.
+Failed emails are retried with exponential backoff. When the connection
+can not be opened, the whole batch counts as failed.
+"""
+import smtplib
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+
+from core.models import OutboxEmail
+
+
+def retry_delay(attempts):
+    """Return delay before next attempt"""
+    return timedelta(seconds=settings.OUTBOX_RETRY_DELAY * 2 ** (attempts - 1))
+
+
+def record_failure(email, exc):
+    """Count failed attempt of email and schedule the next one"""
+    email.attempts += 1
+    email.last_error = repr(exc)
+    if email.attempts >= settings.OUTBOX_MAX_ATTEMPTS:
+        email.status = OutboxEmail.FAILED
+    else:
+        email.next_attempt_at = timezone.now() + retry_delay(email.attempts)
+
+
+def send_batch(batch_size):
+    """Send one batch of due emails. Returns (sent, failed) counts"""
+    sent = failed = 0
+    with transaction.atomic():
+        emails = list(
+            OutboxEmail.objects
+            .select_for_update(skip_locked=True)
+            .filter(status=OutboxEmail.PENDING,
+                    next_attempt_at__lte=timezone.now())
+            .order_by('next_attempt_at')[:batch_size])
+        if not emails:
+            return sent, failed
+
+        connection = get_connection()
+        try:
+            connection.open()
+        except (smtplib.SMTPException, OSError) as exc:
+            for email in emails:
+                record_failure(email, exc)
+            failed = len(emails)
+        else:
+            try:
+                for email in emails:
+                    message = EmailMessage(
+                        email.subject, email.body,
+                        settings.DEFAULT_FROM_EMAIL, [email.to_email],
+                        connection=connection)
+                    try:
+                        message.send()
+                    except (smtplib.SMTPException, OSError) as exc:
+                        failed += 1
+                        record_failure(email, exc)
+                    else:
+                        sent += 1
+                        email.attempts += 1
+                        email.status = OutboxEmail.SENT
+                        email.sent_at = timezone.now()
+            finally:
+                connection.close()
+
+        OutboxEmail.objects.bulk_update(
+            emails,
+            ['status', 'attempts', 'next_attempt_at',
+             'last_error', 'sent_at'])
+    return sent, failed
+
+
+class Command(BaseCommand):
+    """Django command to drain email outbox."""
+    help = 'Send emails from outbox'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=100,
+            help='Emails sent over one connection')
+        parser.add_argument(
+            '--once', action='store_true',
+            help='Exit when there are no due emails')
+        parser.add_argument(
+            '--interval', type=float, default=5,
+            help='Seconds to wait when outbox is empty')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        total_sent = total_failed = 0
+        start = time.monotonic()
+        while True:
+            sent, failed = send_batch(options['batch_size'])
+            total_sent += sent
+            total_failed += failed
+            if sent or failed:
+                rate = total_sent / max(time.monotonic() - start, 1e-9)
+                self.stdout.write(
+                    f'Sent {total_sent}, failed {total_failed}, '
+                    f'{rate:.1f} emails/sec')
+                continue
+            if options['once']:
+                break
+            time.sleep(options['interval'])
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Outbox drained: sent {total_sent}, failed {total_failed}'))
@@ -0,0 +1,107 @@
+"""
+Django command to summarize the slow query log.
+
+Entries are grouped by query fingerprint and the worst fingerprints
+are printed with their views and the latest captured EXPLAIN plan.
+"""
+import json
+from collections import Counter, defaultdict
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+SORT_KEYS = {
+    'total': lambda group: group['total_ms'],
+    'max': lambda group: group['max_ms'],
+    'count': lambda group: group['count'],
+}
+
+
+def read_entries(path, since=None):
+    """Yield slow query log entries, newer than `since` if given"""
+    with open(path, encoding='utf-8') as file:
+        for line in file:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if since and datetime.fromisoformat(entry['time']) < since:
+                continue
+            yield entry
+
+
+def group_entries(entries):
+    """Return list of per fingerprint summaries"""
+    groups = defaultdict(lambda: {
+        'count': 0, 'total_ms': 0.0, 'max_ms': 0.0,
+        'durations': [], 'views': Counter(), 'plan': None})
+    for entry in entries:
+        group = groups[entry['fingerprint']]
+        group['fingerprint'] = entry['fingerprint']
+        group['sql'] = entry['sql']
+        group['count'] += 1
+        group['total_ms'] += entry['duration_ms']
+        group['max_ms'] = max(group['max_ms'], entry['duration_ms'])
+        group['durations'].append(entry['duration_ms'])
+        group['views'][entry.get('view') or '-'] += 1
+        if entry.get('plan'):
+            group['plan'] = entry['plan']
+    for group in groups.values():
+        durations = sorted(group.pop('durations'))
+        group['p50_ms'] = durations[len(durations) // 2]
+    return list(groups.values())
+
+
+class Command(BaseCommand):
+    """Django command to report worst slow query fingerprints."""
+    help = 'Summarize slow query log by query fingerprint'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--path', default=None,
+            help="Slow query log, SLOW_QUERY_LOG['PATH'] by default")
+        parser.add_argument(
+            '--limit', type=int, default=10,
+            help='Number of fingerprints to show')
+        parser.add_argument(
+            '--sort', choices=sorted(SORT_KEYS), default='total',
+            help='Order of fingerprints')
+        parser.add_argument(
+            '--hours', type=float, default=None,
+            help='Only queries logged in the last HOURS hours')
+        parser.add_argument(
+            '--plans', action='store_true',
+            help='Print latest captured EXPLAIN plan of every fingerprint')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        path = Path(options['path'] or settings.SLOW_QUERY_LOG['PATH'])
+        if not path.exists():
+            raise CommandError(f'Slow query log {path} does not exist')
+        since = None
+        if options['hours'] is not None:
+            since = (datetime.now(timezone.utc)
+                     - timedelta(hours=options['hours']))
+
+        groups = group_entries(read_entries(path, since))
+        groups.sort(key=SORT_KEYS[options['sort']], reverse=True)
+
+        for group in groups[:options['limit']]:
+            views = ', '.join(f'{view} ({count})' for view, count
+                              in group['views'].most_common(3))
+            self.stdout.write(
+                f'{group["fingerprint"]}  count {group["count"]}  '
+                f'total {group["total_ms"]:.1f} ms  '
+                f'p50 {group["p50_ms"]:.1f} ms  '
+                f'max {group["max_ms"]:.1f} ms')
+            self.stdout.write(f'  views: {views}')
+            self.stdout.write(f'  {group["sql"]}')
+            if options['plans'] and group['plan']:
+                self.stdout.write(
+                    '  ' + json.dumps(group['plan'], indent=2)
+                    .replace('\n', '\n  '))
+
+        self.stdout.write(self.style.SUCCESS(
+            f'{sum(group["count"] for group in groups)} slow queries, '
+            f'{len(groups)} fingerprints'))
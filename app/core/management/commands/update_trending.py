@@ -0,0 +1,50 @@
+"""
+Django command to update trending articles.
+
+Hot scores are recomputed only for articles changed since they were
+scored, then the top articles are stored in the TrendingArticle
+table for the homepage. With --interval the command keeps running as a worker.
+"""
+import time
+
+from django.core.management.base import BaseCommand
+
+from core import trending
+
+
+class Command(BaseCommand):
+    """Django command to rescore changed articles and store the top."""
+    help = 'Recompute hot scores of changed articles and store the top'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=None,
+            help="Articles rescored per query, TRENDING['BATCH_SIZE'] "
+                 "by default")
+        parser.add_argument(
+            '--decay-hours', type=float, default=None,
+            help="Hours after which ten times more engagement is needed, "
+                 "TRENDING['DECAY_HOURS'] by default")
+        parser.add_argument(
+            '--full', action='store_true',
+            help='Rescore all articles, needed after changing decay')
+        parser.add_argument(
+            '--interval', type=float, default=None,
+            help='Repeat every INTERVAL seconds until interrupted')
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        full = options['full']
+        while True:
+            start = time.monotonic()
+            done = trending.rescore(options['batch_size'],
+                                    options['decay_hours'], full)
+            top = trending.update_top()
+            self.stdout.write(self.style.SUCCESS(
+                f'{done} articles rescored in '
+                f'{time.monotonic() - start:.2f}s, '
+                f'{len(top)} trending'))
+            if options['interval'] is None:
+                return
+            full = False
+            time.sleep(options['interval'])
@@ -3,24 +3,63 @@ Django command to wait for the database to be available
 """
 
 
+import random
 import time
-from psycopg2 import OperationalError as Psycopg2Error
-from django.db.utils import OperationalError
-from django.core.management.base import BaseCommand
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+from core.health import DATABASE_ERRORS, probe_database
 
 
 class Command(BaseCommand):
     """Django command to wait database."""
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--database', default='default',
+            help='Database alias to wait for')
+        parser.add_argument(
+            '--timeout', type=float, default=None,
+            help='Give up after this many seconds')
+        parser.add_argument(
+            '--max-wait', type=float, default=5,
+            help='Maximum delay between attempts in seconds')
+        parser.add_argument(
+            '--initial-wait', type=float, default=0.1,
+            help='Delay before the second attempt in seconds')
+
+    def probe(self, alias):
+        """Open raw connection and run trivial query"""
+        try:
+            probe_database(alias)
+        finally:
+            connections[alias].close()
+
     def handle(self, *args, **options):
         """Entrypoint for command."""
         self.stdout.write('Waiting for database')
-        db_up = False
-        while db_up is False:
+        alias = options['database']
+        timeout = options['timeout']
+        start = time.monotonic()
+        attempt = 0
+        while True:
             try:
-                self.check(databases=['default'])
-                db_up = True
-            except (Psycopg2Error, OperationalError):
-                self.stdout.write('Database unavailable, waiting 1 second ...')
-                time.sleep(1)
+                self.probe(alias)
+                break
+            except DATABASE_ERRORS:
+                elapsed = time.monotonic() - start
+                if timeout is not None and elapsed >= timeout:
+                    raise CommandError(
+                        f'Database unavailable after {elapsed:.1f} seconds')
+                delay = min(options['max_wait'],
+                            options['initial_wait'] * 2 ** attempt)
+                # Jitter spreads reconnects of many containers
+                delay = random.uniform(delay / 2, delay)
+                if timeout is not None:
+                    delay = min(delay, max(timeout - elapsed, 0))
+                attempt += 1
+                self.stdout.write(
+                    f'Database unavailable, waiting {delay:.2f} seconds ...')
+                time.sleep(delay)
         self.stdout.write(self.style.SUCCESS('Database available!'))
@@ -0,0 +1,20 @@
+"""
+Django command to load and check all templates
+"""
+from django.core.management.base import BaseCommand, CommandError
+
+from core.template_warmup import warm_templates
+
+
+class Command(BaseCommand):
+    """Django command to pre-warm templates.
+     Fails on template syntax errors."""
+    help = 'Load all templates and fail on template errors'
+
+    def handle(self, *args, **options):
+        """Entrypoint for command."""
+        loaded, errors = warm_templates()
+        if errors:
+            raise CommandError('Template errors:\n' + '\n'.join(
+                f'{name}: {message}' for name, message in errors))
+        self.stdout.write(self.style.SUCCESS(f'Loaded {loaded} templates'))
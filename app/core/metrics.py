@@ -0,0 +1,358 @@
+"""
+Metrics in Prometheus text format.
+
+Counters and histograms are kept in process memory. With several
+worker processes (gunicorn) set METRICS['MULTIPROCESS_DIR']: every
+process periodically writes its values to a file in that directory
+and /metrics sums files of all processes, so any worker can answer
+the scrape. Files of exited workers are kept, so counters never go
+back. Clear the directory when the server is restarted.
+
+/metrics is served only to METRICS['ALLOWED_IPS'] addresses and
+networks, or to clients sending METRICS['TOKEN'] as a bearer token.
+"""
+import atexit
+import hmac
+import ipaddress
+import json
+import os
+import threading
+import time
+import uuid
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from pathlib import Path
+
+from django.conf import settings
+from django.contrib.auth.signals import user_logged_in, user_login_failed
+from django.core.exceptions import ImproperlyConfigured
+
+from core.db import instrumentation
+
+DEFAULT_ALLOWED_IPS = ['127.0.0.1', '::1']
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5,
+                   1, 2.5, 5, 10)
+
+
+class Metric:
+    """Base class of metrics with labels"""
+    type = None
+
+    def __init__(self, registry, name, documentation, labels=()):
+        self.registry = registry
+        self.name = name
+        self.documentation = documentation
+        self.labels = tuple(labels)
+        self.values = {}
+
+    def _key(self, labels):
+        if set(labels) != set(self.labels):
+            raise ValueError(
+                f'{self.name} expects labels {self.labels}, '
+                f'got {tuple(labels)}')
+        return tuple(str(labels[name]) for name in self.labels)
+
+    def snapshot(self):
+        return [[list(key), value] for key, value in self.values.items()]
+
+
+class Counter(Metric):
+    type = 'counter'
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self.registry.lock:
+            self.values[key] = self.values.get(key, 0) + amount
+
+
+class Histogram(Metric):
+    """Histogram with cumulative buckets. Values are stored as
+     [bucket counts..., sum, count]"""
+    type = 'histogram'
+
+    def __init__(self, registry, name, documentation, labels=(),
+                 buckets=DEFAULT_BUCKETS):
+        super().__init__(registry, name, documentation, labels)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        index = bisect_left(self.buckets, value)
+        with self.registry.lock:
+            values = self.values.get(key)
+            if values is None:
+                values = self.values[key] = [0] * (len(self.buckets) + 2)
+            if index < len(self.buckets):
+                values[index] += 1
+            values[-2] += value
+            values[-1] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        """Observe duration of the code inside in seconds"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start, **labels)
+
+
+class Registry:
+    """Collection of metrics of this process"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.metrics = {}
+        self._flushed_at = 0
+        self._reset_process_id()
+
+    def _register(self, metric):
+        if metric.name in self.metrics:
+            raise ValueError(f'Metric {metric.name} already registered')
+        self.metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name, documentation, labels=()):
+        return self._register(Counter(self, name, documentation, labels))
+
+    def histogram(self, name, documentation, labels=(),
+                  buckets=DEFAULT_BUCKETS):
+        return self._register(
+            Histogram(self, name, documentation, labels, buckets))
+
+    def reset(self):
+        """Drop all values, e.g. in forked worker processes which
+         inherited values of the parent"""
+        with self.lock:
+            for metric in self.metrics.values():
+                metric.values.clear()
+        self._reset_process_id()
+
+    def _reset_process_id(self):
+        self.process_id = f'{os.getpid()}-{uuid.uuid4().hex[:8]}'
+
+    def snapshot(self):
+        """Return values of all metrics as JSON serializable dict"""
+        with self.lock:
+            return {name: metric.snapshot()
+                    for name, metric in self.metrics.items()}
+
+    def flush(self, directory):
+        """Write values of this process to directory"""
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f'{self.process_id}.json'
+        tmp_path = path.with_name(f'.{path.name}.tmp')
+        tmp_path.write_text(json.dumps(self.snapshot()))
+        os.replace(tmp_path, path)
+        self._flushed_at = time.monotonic()
+
+    def maybe_flush(self):
+        """Flush if multiprocess mode is on and FLUSH_INTERVAL passed"""
+        config = settings.METRICS
+        directory = config.get('MULTIPROCESS_DIR')
+        if directory and (time.monotonic() - self._flushed_at
+                          >= config.get('FLUSH_INTERVAL', 1)):
+            self.flush(directory)
+
+    def collect(self):
+        """Return values of all processes in multiprocess mode,
+         of this process otherwise"""
+        directory = settings.METRICS.get('MULTIPROCESS_DIR')
+        if not directory:
+            return self.snapshot()
+        self.flush(directory)
+        merged = {}
+        for path in Path(directory).glob('*.json'):
+            try:
+                snapshot = json.loads(path.read_text())
+            except (OSError, ValueError):
+                continue
+            for name, samples in snapshot.items():
+                values = merged.setdefault(name, {})
+                for key, value in samples:
+                    key = tuple(key)
+                    if key not in values:
+                        values[key] = value
+                    elif isinstance(value, list):
+                        values[key] = [a + b for a, b
+                                       in zip(values[key], value)]
+                    else:
+                        values[key] += value
+        return {name: [[list(key), value] for key, value in values.items()]
+                for name, values in merged.items()}
+
+    def render(self):
+        """Return metrics in Prometheus text exposition format"""
+        collected = self.collect()
+        lines = []
+        for name, metric in sorted(self.metrics.items()):
+            lines.append(f'# HELP {name} {metric.documentation}')
+            lines.append(f'# TYPE {name} {metric.type}')
+            for key, value in sorted(collected.get(name, [])):
+                labels = list(zip(metric.labels, key))
+                if metric.type == 'histogram':
+                    lines += _histogram_lines(name, metric, labels, value)
+                else:
+                    lines.append(f'{name}{_labels(labels)} {value}')
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(pairs):
+    if not pairs:
+        return ''
+    escaped = (
+        (name, value.replace('\\', r'\\').replace('"', r'\"')
+         .replace('\n', r'\n'))
+        for name, value in pairs)
+    return '{' + ','.join(f'{name}="{value}"'
+                          for name, value in escaped) + '}'
+
+
+def _histogram_lines(name, metric, labels, value):
+    lines = []
+    cumulative = 0
+    for bound, bucket_count in zip(metric.buckets, value):
+        cumulative += bucket_count
+        le = [('le', repr(float(bound)))]
+        lines.append(f'{name}_bucket{_labels(labels + le)} {cumulative}')
+    total, count = value[-2], value[-1]
+    lines.append(f'{name}_bucket{_labels(labels + [("le", "+Inf")])} '
+                 f'{count}')
+    lines.append(f'{name}_sum{_labels(labels)} {total}')
+    lines.append(f'{name}_count{_labels(labels)} {count}')
+    return lines
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY.reset)
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        directory = settings.METRICS.get('MULTIPROCESS_DIR')
+    except ImproperlyConfigured:
+        return
+    if directory:
+        REGISTRY.flush(directory)
+
+
+REQUEST_DURATION = REGISTRY.histogram(
+    'http_request_duration_seconds',
+    'Request latency by URL name',
+    ['view', 'method'])
+REQUESTS = REGISTRY.counter(
+    'http_requests_total',
+    'Requests by URL name and status code',
+    ['view', 'method', 'status'])
+REQUEST_QUERIES = REGISTRY.counter(
+    'http_request_db_queries_total',
+    'Database queries run by requests by URL name',
+    ['view'])
+DB_QUERY_DURATION = REGISTRY.histogram(
+    'db_query_duration_seconds',
+    'Database query duration',
+    ['alias'],
+    buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1,
+             0.25, 0.5, 1))
+LOGINS = REGISTRY.counter(
+    'auth_logins_total',
+    'Log in attempts by result',
+    ['result'])
+PASSWORD_HASH_DURATION = REGISTRY.histogram(
+    'password_hash_duration_seconds',
+    'Password hashing and checking duration',
+    ['operation'])
+ACTIVATIONS = REGISTRY.counter(
+    'user_activations_total',
+    'Activated user accounts')
+
+
+_request_queries = ContextVar('metrics_request_queries', default=None)
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        DB_QUERY_DURATION.observe(time.perf_counter() - start,
+                                  alias=context['connection'].alias)
+        queries = _request_queries.get()
+        if queries is not None:
+            queries[0] += 1
+
+
+def _logged_in(sender, **kwargs):
+    LOGINS.inc(result='success')
+
+
+def _login_failed(sender, **kwargs):
+    LOGINS.inc(result='failure')
+
+
+def instrument():
+    """Time database queries and count logins"""
+    instrumentation.register(_sql_wrapper)
+    user_logged_in.connect(_logged_in, dispatch_uid='core.metrics')
+    user_login_failed.connect(_login_failed, dispatch_uid='core.metrics')
+
+
+def scrape_allowed(request):
+    """Return True if request may read metrics"""
+    config = settings.METRICS
+    token = config.get('TOKEN')
+    if token and hmac.compare_digest(
+            request.headers.get('Authorization', '').encode(),
+            f'Bearer {token}'.encode()):
+        return True
+    try:
+        address = ipaddress.ip_address(request.META.get('REMOTE_ADDR', ''))
+    except ValueError:
+        return False
+    return any(
+        address in ipaddress.ip_network(network, strict=False)
+        for network in config.get('ALLOWED_IPS', DEFAULT_ALLOWED_IPS))
+
+
+def track_request(get_response, request):
+    """Run get_response(request) and record its latency
+     and database queries under URL name of request"""
+    instrumentation.instrument_connections()
+    queries = [0]
+    token = _request_queries.set(queries)
+    start = time.perf_counter()
+    try:
+        response = get_response(request)
+    finally:
+        _request_queries.reset(token)
+    _record_request(request, response, time.perf_counter() - start,
+                    queries[0])
+    return response
+
+
+async def atrack_request(get_response, request):
+    """Async version of track_request(). Queries run by sync_to_async
+     see the counter, as the context is copied to their thread"""
+    queries = [0]
+    token = _request_queries.set(queries)
+    start = time.perf_counter()
+    try:
+        response = await get_response(request)
+    finally:
+        _request_queries.reset(token)
+    _record_request(request, response, time.perf_counter() - start,
+                    queries[0])
+    return response
+
+
+def _record_request(request, response, duration, queries):
+    view = getattr(request.resolver_match, 'view_name', None)
+    view = view or '<unresolved>'
+    REQUEST_DURATION.observe(duration, view=view, method=request.method)
+    REQUESTS.inc(view=view, method=request.method,
+                 status=response.status_code)
+    REQUEST_QUERIES.inc(queries, view=view)
+    REGISTRY.maybe_flush()
@@ -0,0 +1,197 @@
+"""
+Core middleware
+"""
+import asyncio
+import random
+from pathlib import Path
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured, MiddlewareNotUsed
+from django.http import HttpResponse
+from django.utils.deprecation import MiddlewareMixin
+
+from core import metrics, profiling, ratelimit, slow_queries
+from core.health import ReadinessState
+
+
+class AsyncCapableMiddleware:
+    """Base of middleware working in sync and async chains.
+
+     Subclasses implement handle(request) and ahandle(request). Under
+     ASGI Django awaits ahandle(), so requests are not passed to a
+     thread and back for every such middleware."""
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        if asyncio.iscoroutinefunction(get_response):
+            # Makes Django treat the instance as a coroutine function
+            self._is_coroutine = asyncio.coroutines._is_coroutine
+
+    def __call__(self, request):
+        if asyncio.iscoroutinefunction(self.get_response):
+            return self.ahandle(request)
+        return self.handle(request)
+
+
+class HealthCheckMiddleware(AsyncCapableMiddleware):
+    """Answer /healthz and /readyz probes before any other middleware.
+
+     /healthz returns 200 while the process is alive.
+     /readyz returns 200 when the database is available, the result
+     is cached for READINESS_CHECK_INTERVAL seconds."""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        self.readiness = ReadinessState(settings.READINESS_CHECK_INTERVAL)
+
+    def healthz(self):
+        return HttpResponse('ok', content_type='text/plain')
+
+    def readyz(self):
+        if self.readiness.is_ready():
+            return HttpResponse('ready', content_type='text/plain')
+        return HttpResponse(
+            'not ready', status=503, content_type='text/plain')
+
+    def handle(self, request):
+        if request.path == '/healthz':
+            return self.healthz()
+        if request.path == '/readyz':
+            return self.readyz()
+        return self.get_response(request)
+
+    async def ahandle(self, request):
+        if request.path == '/healthz':
+            return self.healthz()
+        if request.path == '/readyz':
+            return await sync_to_async(self.readyz)()
+        return await self.get_response(request)
+
+
+class RateLimitMiddleware(MiddlewareMixin):
+    """Limit POST requests to views listed in RATELIMIT_RULES.
+
+     Rules are keyed by URL name and limit requests per client IP
+     and per submitted email. Requests over the limit get 429 before
+     the view runs, so no password is hashed for them."""
+
+    def process_view(self, request, view_func, view_args, view_kwargs):
+        if request.method != 'POST' or request.resolver_match is None:
+            return None
+        view_name = request.resolver_match.view_name
+        rule = settings.RATELIMIT_RULES.get(view_name)
+        if not rule:
+            return None
+
+        keys = []
+        if 'ip' in rule:
+            ip = request.META.get(settings.RATELIMIT_IP_META_KEY, '')
+            keys.append(('ip', ip, rule['ip']))
+        if 'email' in rule:
+            email = (request.POST.get('username')
+                     or request.POST.get('email') or '')
+            if email:
+                keys.append(('email', email.strip().lower(), rule['email']))
+
+        for kind, value, (limit, period) in keys:
+            retry_after = ratelimit.hit(
+                f'{view_name}:{kind}:{value}', limit, period)
+            if retry_after is not None:
+                ratelimit.record_blocked(f'{view_name}:{kind}')
+                response = HttpResponse(
+                    'Too many requests', status=429,
+                    content_type='text/plain')
+                response['Retry-After'] = str(retry_after)
+                return response
+        return None
+
+
+class ProfilingMiddleware(AsyncCapableMiddleware):
+    """Profile a sample of requests with cProfile or a stack sampler,
+     see core/profiling.py. Not used unless PROFILING['ENABLED']"""
+
+    def __init__(self, get_response):
+        config = settings.PROFILING
+        if not config.get('ENABLED'):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.sample_rate = config.get('SAMPLE_RATE', 0.01)
+        self.mode = config.get('MODE', 'cprofile')
+        self.interval = config.get('SAMPLER_INTERVAL', 0.005)
+        if self.mode not in profiling.MODES:
+            raise ImproperlyConfigured(
+                f"PROFILING['MODE'] must be one of {profiling.MODES}")
+        self.directory = Path(config['DIR'])
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiling.install()
+
+    def handle(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        return profiling.profile_request(
+            self.get_response, request, self.mode, self.directory,
+            self.interval)
+
+    async def ahandle(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        return await profiling.aprofile_request(
+            self.get_response, request, self.directory, self.interval)
+
+
+class MetricsMiddleware(AsyncCapableMiddleware):
+    """Serve /metrics and record request latency per URL name,
+     see core/metrics.py. Not used unless METRICS['ENABLED']"""
+
+    def __init__(self, get_response):
+        if not settings.METRICS.get('ENABLED'):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        metrics.instrument()
+
+    def render(self):
+        return HttpResponse(
+            metrics.REGISTRY.render(),
+            content_type='text/plain; version=0.0.4; charset=utf-8')
+
+    def forbidden(self, request):
+        """Return 403 response for clients not allowed to read metrics.
+         Raises DisallowedHost for hosts not in ALLOWED_HOSTS, which
+         CommonMiddleware would check for other paths"""
+        request.get_host()
+        if not metrics.scrape_allowed(request):
+            return HttpResponse(
+                'Forbidden', status=403, content_type='text/plain')
+        return None
+
+    def handle(self, request):
+        if request.path == '/metrics':
+            return self.forbidden(request) or self.render()
+        return metrics.track_request(self.get_response, request)
+
+    async def ahandle(self, request):
+        if request.path == '/metrics':
+            # Reads files of other processes in multiprocess mode
+            return (self.forbidden(request)
+                    or await sync_to_async(self.render)())
+        return await metrics.atrack_request(self.get_response, request)
+
+
+class SlowQueryLogMiddleware(AsyncCapableMiddleware):
+    """Log slow queries with URL name of the request,
+     see core/slow_queries.py. Not used unless SLOW_QUERY_LOG['ENABLED']"""
+
+    def __init__(self, get_response):
+        if not settings.SLOW_QUERY_LOG.get('ENABLED'):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        slow_queries.install()
+
+    def handle(self, request):
+        return slow_queries.track_request(self.get_response, request)
+
+    async def ahandle(self, request):
+        return await slow_queries.atrack_request(self.get_response, request)
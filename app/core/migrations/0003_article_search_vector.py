@@ -0,0 +1,58 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:54
+
+import django.contrib.postgres.search
+from django.db import migrations
+
+# Keep the text search configuration in sync with core.search.SEARCH_CONFIG
+CREATE_TRIGGER = """
+CREATE FUNCTION core_article_search_vector_update() RETURNS trigger AS $$
+BEGIN
+    NEW.search_vector :=
+        setweight(to_tsvector('english', coalesce(NEW.title, '')), 'A') ||
+        setweight(to_tsvector('english', coalesce(NEW.summary, '')), 'B') ||
+        setweight(to_tsvector('english', coalesce(NEW.body, '')), 'C');
+    RETURN NEW;
+END
+$$ LANGUAGE plpgsql;
+
+CREATE TRIGGER core_article_search_vector_trigger
+    BEFORE INSERT OR UPDATE OF title, summary, body ON core_article
+    FOR EACH ROW EXECUTE FUNCTION core_article_search_vector_update();
+
+UPDATE core_article SET title = title;
+
+CREATE INDEX core_article_search_idx
+    ON core_article USING gin (search_vector);
+"""
+
+DROP_TRIGGER = """
+DROP INDEX IF EXISTS core_article_search_idx;
+DROP TRIGGER IF EXISTS core_article_search_vector_trigger ON core_article;
+DROP FUNCTION IF EXISTS core_article_search_vector_update();
+"""
+
+
+def create_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(CREATE_TRIGGER)
+
+
+def drop_trigger(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        schema_editor.execute(DROP_TRIGGER)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_article'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='search_vector',
+            field=django.contrib.postgres.search.SearchVectorField(editable=False, null=True),
+        ),
+        migrations.RunPython(create_trigger, drop_trigger),
+    ]
@@ -0,0 +1,42 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:57
+
+from django.db import migrations, models
+import django.db.models.expressions
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0003_article_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='engagement',
+            field=models.PositiveIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='hot_score',
+            field=models.FloatField(editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='score_changed_at',
+            field=models.DateTimeField(auto_now=True),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='scored_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('status', 'published')), fields=['-hot_score'], name='core_article_hot_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(condition=models.Q(('scored_at__isnull', True), ('score_changed_at__gt', django.db.models.expressions.F('scored_at')), _connector='OR'), fields=['id'], name='core_article_rescore_idx'),
+        ),
+    ]
@@ -0,0 +1,38 @@
+# Generated by Django 4.0.10 on 2026-10-18 14:00
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0004_article_trending'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='article',
+            name='views_anonymous',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.AddField(
+            model_name='article',
+            name='views_authenticated',
+            field=models.PositiveBigIntegerField(default=0),
+        ),
+        migrations.CreateModel(
+            name='VisitorSketch',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('day', models.DateField()),
+                ('kind', models.CharField(choices=[('authenticated', 'Logged in'), ('anonymous', 'Anonymous')], max_length=13)),
+                ('sketch', models.BinaryField()),
+                ('article', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='visitor_sketches', to='core.article')),
+            ],
+        ),
+        migrations.AddConstraint(
+            model_name='visitorsketch',
+            constraint=models.UniqueConstraint(fields=('article', 'day', 'kind'), name='core_visitor_sketch_unique'),
+        ),
+    ]
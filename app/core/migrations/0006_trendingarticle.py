@@ -0,0 +1,22 @@
+# Generated by Django 4.0.10 on 2026-10-18 14:18
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0005_article_views'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='TrendingArticle',
+            fields=[
+                ('position', models.PositiveSmallIntegerField(primary_key=True, serialize=False)),
+                ('score', models.FloatField()),
+                ('article', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='+', to='core.article')),
+            ],
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 4.0.10 on 2026-10-18 14:19
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0006_trendingarticle'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='article',
+            index=models.Index(fields=['published_at'], include=('updated_at',), name='core_article_published_idx'),
+        ),
+    ]
@@ -1,3 +1,203 @@
-from django.db import models  # noqa
+from django.conf import settings
+from django.contrib.postgres.search import SearchVectorField
+from django.db import models
+from django.urls import reverse
+from django.utils import timezone
 
-# Create your models here.
+
+class OutboxEmail(models.Model):
+    """Email waiting to be sent by send_outbox command"""
+    PENDING = 'pending'
+    SENT = 'sent'
+    FAILED = 'failed'
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    to_email = models.EmailField(max_length=255)
+    subject = models.CharField(max_length=255)
+    body = models.TextField()
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING)
+    attempts = models.PositiveSmallIntegerField(default=0)
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['status', 'next_attempt_at']),
+        ]
+
+    def __str__(self):
+        return f'{self.subject} to {self.to_email}'
+
+
+# Articles changed since their hot score was computed
+NEEDS_RESCORE = (models.Q(scored_at__isnull=True)
+                 | models.Q(score_changed_at__gt=models.F('scored_at')))
+
+
+class ArticleQuerySet(models.QuerySet):
+    """Queries of articles"""
+
+    def published(self):
+        """Return articles visible to readers"""
+        return self.filter(status=Article.PUBLISHED,
+                           published_at__lte=timezone.now())
+
+    def feed(self, after=None):
+        """Return published articles newest first with only columns
+         needed by the feed and their authors, in one query.
+         `after` is (published_at, id) of the last article of previous
+         page. The single published_at upper bound lets the database
+         seek in the feed index, the second filter only drops rows
+         with the same timestamp"""
+        now = timezone.now()
+        articles = self.filter(status=Article.PUBLISHED)
+        if after is not None and after[0] <= now:
+            published_at, pk = after
+            articles = (articles
+                        .filter(published_at__lte=published_at)
+                        .filter(models.Q(published_at__lt=published_at)
+                                | models.Q(pk__lt=pk)))
+        else:
+            articles = articles.filter(published_at__lte=now)
+        return (articles
+                .select_related('author')
+                .only(*Article.FEED_FIELDS)
+                .order_by('-published_at', '-id'))
+
+    def needs_rescore(self):
+        """Return articles changed since their hot score was computed"""
+        return self.filter(NEEDS_RESCORE)
+
+
+class Article(models.Model):
+    """News article"""
+    DRAFT = 'draft'
+    PUBLISHED = 'published'
+    ARCHIVED = 'archived'
+    STATUS_CHOICES = [
+        (DRAFT, 'Draft'),
+        (PUBLISHED, 'Published'),
+        (ARCHIVED, 'Archived'),
+    ]
+    FEED_FIELDS = ['id', 'title', 'slug', 'summary', 'published_at',
+                   'author__id', 'author__name', 'author__email']
+
+    title = models.CharField(max_length=255)
+    slug = models.SlugField(max_length=255)
+    summary = models.TextField(blank=True)
+    body = models.TextField()
+    author = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.PROTECT,
+        related_name='articles',
+        # core_article_author_idx starts with author
+        db_index=False)
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=DRAFT)
+    published_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+    updated_at = models.DateTimeField(auto_now=True)
+    # Weighted title, summary and body. Maintained by a trigger and
+    # GIN indexed on PostgreSQL, see migration 0003, unused elsewhere
+    search_vector = SearchVectorField(null=True, editable=False)
+    # Trending, see core/trending.py. Saving the article or adding
+    # engagement moves score_changed_at past scored_at
+    engagement = models.PositiveIntegerField(default=0)
+    hot_score = models.FloatField(null=True, editable=False)
+    score_changed_at = models.DateTimeField(auto_now=True)
+    scored_at = models.DateTimeField(null=True, editable=False)
+    # Buffered, see core/pageviews.py
+    views_authenticated = models.PositiveBigIntegerField(default=0)
+    views_anonymous = models.PositiveBigIntegerField(default=0)
+
+    objects = ArticleQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            # Feed seeks on (published_at, id) of published articles.
+            # On PostgreSQL the index also covers feed columns
+            # except summary, which can be too large for an index row.
+            models.Index(
+                fields=['-published_at', '-id'],
+                include=['title', 'slug', 'author'],
+                condition=models.Q(status='published'),
+                name='core_article_feed_idx'),
+            models.Index(
+                fields=['author', '-published_at'],
+                name='core_article_author_idx'),
+            # Articles of any status in the feed window, see
+            # syndication.feed_changed_at
+            models.Index(
+                fields=['published_at'],
+                include=['updated_at'],
+                name='core_article_published_idx'),
+            models.Index(
+                fields=['-hot_score'],
+                condition=models.Q(status='published'),
+                name='core_article_hot_idx'),
+            # Small, holds only articles waiting for update_trending
+            models.Index(
+                fields=['id'],
+                condition=NEEDS_RESCORE,
+                name='core_article_rescore_idx'),
+        ]
+
+    def __str__(self):
+        return self.title
+
+    def get_absolute_url(self):
+        return reverse('core:article', args=[self.pk, self.slug])
+
+
+class VisitorSketch(models.Model):
+    """HyperLogLog sketch of unique visitors of article in one day"""
+    AUTHENTICATED = 'authenticated'
+    ANONYMOUS = 'anonymous'
+    KIND_CHOICES = [
+        (AUTHENTICATED, 'Logged in'),
+        (ANONYMOUS, 'Anonymous'),
+    ]
+
+    article = models.ForeignKey(
+        Article,
+        on_delete=models.CASCADE,
+        related_name='visitor_sketches',
+        # core_visitor_sketch_unique starts with article
+        db_index=False)
+    day = models.DateField()
+    kind = models.CharField(max_length=13, choices=KIND_CHOICES)
+    sketch = models.BinaryField()
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=['article', 'day', 'kind'],
+                name='core_visitor_sketch_unique'),
+        ]
+
+    def __str__(self):
+        return f'{self.article_id} {self.day} {self.kind}'
+
+
+class TrendingArticle(models.Model):
+    """Top article by hot score, written by update_trending command"""
+    position = models.PositiveSmallIntegerField(primary_key=True)
+    article = models.OneToOneField(
+        Article,
+        on_delete=models.CASCADE,
+        related_name='+')
+    score = models.FloatField()
+
+    def __str__(self):
+        return f'{self.position}. {self.article_id}'
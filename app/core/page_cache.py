@@ -0,0 +1,44 @@
+"""
+Cache for rendered pages of anonymous users.
+
+Pages are rendered once with a placeholder instead of CSRF token and
+stored in cache. The per-request CSRF token is put into cached markup
+on every response. PAGE_CACHE_VERSION is a part of cache keys, so
+changing it on deploy invalidates all cached pages.
+"""
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.middleware.csrf import get_token
+from django.shortcuts import render
+from django.template.loader import render_to_string
+from django.utils.translation import get_language
+
+CSRF_PLACEHOLDER = '__csrf_token_placeholder__'
+
+
+def page_cache_key(template_name, key=''):
+    return f'page:{template_name}:{key}:{get_language()}'
+
+
+def render_cached(request, template_name, context=None, key=''):
+    """Render template for anonymous user from cache.
+     Context must be the same for all requests with the same key.
+     Falls back to regular render() when cache is disabled
+     or user is authenticated"""
+    timeout = settings.PAGE_CACHE_TIMEOUT
+    if not timeout or request.user.is_authenticated:
+        return render(request, template_name, context)
+
+    cache = caches[settings.PAGE_CACHE_ALIAS]
+    cache_key = page_cache_key(template_name, key)
+    content = cache.get(cache_key, version=settings.PAGE_CACHE_VERSION)
+    if content is None:
+        content = render_to_string(
+            template_name,
+            {**(context or {}), 'csrf_token': CSRF_PLACEHOLDER})
+        cache.set(cache_key, content, timeout,
+                  version=settings.PAGE_CACHE_VERSION)
+    if CSRF_PLACEHOLDER in content:
+        content = content.replace(CSRF_PLACEHOLDER, get_token(request))
+    return HttpResponse(content)
@@ -0,0 +1,217 @@
+"""
+Article view counters.
+
+Views are counted in a per process buffer instead of one UPDATE per
+page view. The buffer is flushed every PAGEVIEWS['FLUSH_INTERVAL']
+seconds or after PAGEVIEWS['MAX_PENDING'] views with one UPDATE per
+PAGEVIEWS['BATCH_SIZE'] articles, which adds the buffered views to
+view counters and trending engagement. Buffered deltas only add up,
+so any number of processes can flush independently.
+
+Flushes run in requests and at normal process exit, so an idle process
+keeps its views until its next request after FLUSH_INTERVAL, and a
+killed one (SIGKILL, out of memory) loses them. Lower MAX_PENDING and
+FLUSH_INTERVAL bound how many views can be lost.
+
+Unique visitors are estimated with HyperLogLog sketches per article,
+day and kind of reader (logged in or anonymous), merged into
+VisitorSketch rows on flush. Stored sketches are downsampled when
+HLL_PRECISION is lowered, see HyperLogLog.merge().
+"""
+import atexit
+import logging
+import os
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.db import DatabaseError, models, transaction
+from django.utils import timezone
+
+from .hyperloglog import HyperLogLog
+from .models import Article, VisitorSketch
+
+logger = logging.getLogger(__name__)
+
+
+def visitor(request):
+    """Return (kind, visitor id) of request. Anonymous readers are
+     told apart by session or by address and user agent"""
+    if request.user.is_authenticated:
+        return VisitorSketch.AUTHENTICATED, f'user:{request.user.pk}'
+    session = getattr(request, 'session', None)
+    session_key = session.session_key if session is not None else None
+    if session_key:
+        return VisitorSketch.ANONYMOUS, f'session:{session_key}'
+    return VisitorSketch.ANONYMOUS, '{}|{}'.format(
+        request.META.get('REMOTE_ADDR', ''),
+        request.META.get('HTTP_USER_AGENT', ''))
+
+
+def _deltas(values):
+    """Return expression adding per article values to a column"""
+    return models.Case(
+        *[models.When(pk=pk, then=models.Value(value))
+          for pk, value in values.items()],
+        default=models.Value(0),
+        output_field=models.PositiveBigIntegerField())
+
+
+def write_counts(counts, batch_size):
+    """Add {(article id, kind): views} to article counters. All batches
+     commit together, so a failed flush can be retried as a whole"""
+    views = {VisitorSketch.AUTHENTICATED: Counter(),
+             VisitorSketch.ANONYMOUS: Counter()}
+    for (pk, kind), count in counts.items():
+        views[kind][pk] += count
+    ids = sorted({pk for pk, _ in counts})
+    with transaction.atomic():
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start:start + batch_size]
+            authenticated = {pk: views[VisitorSketch.AUTHENTICATED][pk]
+                             for pk in batch}
+            anonymous = {pk: views[VisitorSketch.ANONYMOUS][pk]
+                         for pk in batch}
+            total = {pk: authenticated[pk] + anonymous[pk] for pk in batch}
+            Article.objects.filter(pk__in=batch).update(
+                views_authenticated=(models.F('views_authenticated')
+                                     + _deltas(authenticated)),
+                views_anonymous=(models.F('views_anonymous')
+                                 + _deltas(anonymous)),
+                engagement=models.F('engagement') + _deltas(total),
+                score_changed_at=timezone.now())
+
+
+def write_sketches(sketches):
+    """Merge {(article id, day, kind): HyperLogLog} into stored
+     sketches. Rows are inserted in key order and locked in id order,
+     so concurrent flushes wait for each other instead of deadlocking"""
+    existing = set(Article.objects.filter(
+        pk__in={pk for pk, _, _ in sketches}).values_list('pk', flat=True))
+    sketches = {key: sketch for key, sketch in sketches.items()
+                if key[0] in existing}
+    if not sketches:
+        return
+    with transaction.atomic():
+        VisitorSketch.objects.bulk_create([
+            VisitorSketch(article_id=pk, day=day, kind=kind, sketch=b'')
+            for pk, day, kind in sorted(sketches)
+        ], ignore_conflicts=True)
+        rows = (VisitorSketch.objects.select_for_update()
+                .filter(article_id__in={pk for pk, _, _ in sketches},
+                        day__in={day for _, day, _ in sketches})
+                .order_by('pk'))
+        changed = []
+        for row in rows:
+            sketch = sketches.get((row.article_id, row.day, row.kind))
+            if sketch is None:
+                continue
+            stored = HyperLogLog.from_bytes(row.sketch, sketch.precision)
+            stored.merge(sketch)
+            row.sketch = stored.to_bytes()
+            changed.append(row)
+        VisitorSketch.objects.bulk_update(changed, ['sketch'])
+
+
+class ViewBuffer:
+    """Views and visitor sketches waiting to be written"""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        """Drop buffered views, e.g. in forked worker processes which
+         inherited views of the parent"""
+        self.counts = Counter()
+        self.sketches = {}
+        self.pending = 0
+        self.flushed_at = time.monotonic()
+
+    def add(self, article_id, kind, visitor_id, day):
+        precision = settings.PAGEVIEWS['HLL_PRECISION']
+        with self.lock:
+            self.counts[article_id, kind] += 1
+            key = (article_id, day, kind)
+            if key not in self.sketches:
+                self.sketches[key] = HyperLogLog(precision)
+            self.sketches[key].add(visitor_id)
+            self.pending += 1
+
+    def _take(self):
+        with self.lock:
+            counts, sketches = self.counts, self.sketches
+            self.reset()
+        return counts, sketches
+
+    def _restore(self, counts, sketches):
+        with self.lock:
+            self.counts.update(counts)
+            self.pending += sum(counts.values())
+            for key, sketch in sketches.items():
+                if key in self.sketches:
+                    sketch.merge(self.sketches[key])
+                self.sketches[key] = sketch
+
+    def flush(self):
+        """Write buffered views. They are kept for the next flush when
+         the database fails"""
+        counts, sketches = self._take()
+        if not counts:
+            return
+        try:
+            write_counts(counts, settings.PAGEVIEWS['BATCH_SIZE'])
+        except DatabaseError:
+            self._restore(counts, sketches)
+            raise
+        try:
+            write_sketches(sketches)
+        except DatabaseError:
+            self._restore(Counter(), sketches)
+            raise
+
+    def maybe_flush(self):
+        """Flush if MAX_PENDING views wait or FLUSH_INTERVAL passed"""
+        config = settings.PAGEVIEWS
+        if (self.pending >= config['MAX_PENDING']
+                or (self.pending and time.monotonic() - self.flushed_at
+                    >= config['FLUSH_INTERVAL'])):
+            try:
+                self.flush()
+            except DatabaseError:
+                logger.exception('Failed to flush article views')
+
+
+BUFFER = ViewBuffer()
+
+os.register_at_fork(after_in_child=BUFFER.reset)
+
+
+@atexit.register
+def _flush_at_exit():
+    try:
+        BUFFER.flush()
+    except (DatabaseError, ImproperlyConfigured):
+        logger.exception('Failed to flush article views at exit')
+
+
+def record_view(request, article_id):
+    """Count view of article by the reader of request"""
+    kind, visitor_id = visitor(request)
+    BUFFER.add(article_id, kind, visitor_id, timezone.localdate())
+    BUFFER.maybe_flush()
+
+
+def unique_visitors(article_id, start, end=None, kind=None):
+    """Return estimated unique visitors of article between start and
+     end days inclusive, of one kind of readers or of all"""
+    sketches = VisitorSketch.objects.filter(
+        article_id=article_id, day__gte=start, day__lte=end or start)
+    if kind is not None:
+        sketches = sketches.filter(kind=kind)
+    total = HyperLogLog(settings.PAGEVIEWS['HLL_PRECISION'])
+    for data in sketches.values_list('sketch', flat=True):
+        total.merge(HyperLogLog.from_bytes(data, total.precision))
+    return total.count()
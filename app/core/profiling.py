@@ -0,0 +1,244 @@
+"""
+Sampled request profiling.
+
+ProfilingMiddleware runs a fraction of requests under cProfile or a
+wall clock stack sampler and writes results to PROFILING['DIR']:
+
+- <name>.prof    pstats dump (cProfile mode)
+- <name>.folded  collapsed stacks for flamegraph.pl or speedscope
+                 (sampler mode)
+- <name>.json    request summary with SQL, template and hashing time
+
+Under ASGI requests are always profiled with the sampler, see
+aprofile_request().
+
+Use profile_report command to aggregate the hottest functions.
+"""
+import cProfile
+import json
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+from itertools import count
+from pathlib import Path
+
+from django.template import base as template_base
+
+from core.db import instrumentation
+
+_current = ContextVar('profiling_stats', default=None)
+_install_lock = threading.Lock()
+_installed = False
+_file_counter = count()
+
+MODES = ('cprofile', 'sampler')
+
+
+class RequestStats:
+    """Time spent in SQL, template rendering and password hashing
+     by one request"""
+
+    def __init__(self):
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.hash_time = 0.0
+        self.template_depth = 0
+
+    def as_dict(self):
+        return {
+            'sql_count': self.sql_count,
+            'sql_time': self.sql_time,
+            'template_time': self.template_time,
+            'hash_time': self.hash_time,
+        }
+
+
+@contextmanager
+def collect():
+    """Collect RequestStats of the code inside"""
+    stats = RequestStats()
+    token = _current.set(stats)
+    try:
+        yield stats
+    finally:
+        _current.reset(token)
+
+
+@contextmanager
+def timer(name):
+    """Add time of the code inside to `name` field of current request
+     stats. Does nothing outside of a profiled request"""
+    stats = _current.get()
+    if stats is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        setattr(stats, name,
+                getattr(stats, name) + time.perf_counter() - start)
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    stats = _current.get()
+    if stats is None:
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        stats.sql_count += 1
+        stats.sql_time += time.perf_counter() - start
+
+
+def _instrument_template_render(render):
+    def instrumented_render(self, context):
+        stats = _current.get()
+        # Included templates are rendered inside the outer one
+        if stats is None or stats.template_depth:
+            return render(self, context)
+        stats.template_depth += 1
+        start = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            stats.template_depth -= 1
+            stats.template_time += time.perf_counter() - start
+    return instrumented_render
+
+
+def install():
+    """Instrument database connections and template rendering.
+     Safe to call many times"""
+    global _installed
+    with _install_lock:
+        if _installed:
+            return
+        instrumentation.register(_sql_wrapper)
+        template_base.Template.render = _instrument_template_render(
+            template_base.Template.render)
+        _installed = True
+
+
+class StackSampler:
+    """Wall clock sampler. Records stack of a thread, or of all other
+     threads when thread_id is None, every `interval` seconds, so time
+     spent waiting on I/O is visible too"""
+
+    def __init__(self, thread_id, interval=0.005):
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def start(self):
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frames = sys._current_frames()
+            if self.thread_id is None:
+                frames.pop(threading.get_ident(), None)
+                frames = frames.values()
+            else:
+                frames = [frames.get(self.thread_id)]
+            for frame in frames:
+                if frame is not None:
+                    self.stacks[folded_stack(frame)] += 1
+
+    def folded(self):
+        """Return stacks in collapsed format, one 'a;b;c count' per line"""
+        return ''.join(f'{stack} {samples}\n'
+                       for stack, samples in self.stacks.most_common())
+
+
+def folded_stack(frame):
+    """Return frame stack as 'module:function;...' from the root"""
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        module = frame.f_globals.get('__name__', code.co_filename)
+        names.append(f'{module}:{code.co_name}')
+        frame = frame.f_back
+    return ';'.join(reversed(names))
+
+
+def output_name(request):
+    """Return unique file name stem for profile of request"""
+    path = request.path.strip('/').replace('/', '_').replace('.', '_')
+    path = path or 'root'
+    return (f'{time.strftime("%Y%m%d-%H%M%S")}-{os.getpid()}-'
+            f'{next(_file_counter)}-{request.method}-{path}')
+
+
+def write_summary(directory, name, request, response, duration, stats):
+    summary = {
+        'path': request.path,
+        'method': request.method,
+        'view': getattr(request.resolver_match, 'view_name', None),
+        'status': response.status_code,
+        'duration': duration,
+        **stats.as_dict(),
+    }
+    (directory / f'{name}.json').write_text(json.dumps(summary))
+
+
+def profile_request(get_response, request, mode, directory, interval=0.005):
+    """Run get_response(request) under profiler of given mode and write
+     profile with request summary to directory. Returns response"""
+    name = output_name(request)
+    directory = Path(directory)
+    instrumentation.instrument_connections()
+    with collect() as stats:
+        start = time.perf_counter()
+        if mode == 'sampler':
+            sampler = StackSampler(threading.get_ident(), interval)
+            sampler.start()
+            try:
+                response = get_response(request)
+            finally:
+                sampler.stop()
+            (directory / f'{name}.folded').write_text(sampler.folded())
+        else:
+            profiler = cProfile.Profile()
+            profiler.enable()
+            try:
+                response = get_response(request)
+            finally:
+                profiler.disable()
+            profiler.dump_stats(directory / f'{name}.prof')
+        duration = time.perf_counter() - start
+    write_summary(directory, name, request, response, duration, stats)
+    return response
+
+
+async def aprofile_request(get_response, request, directory, interval=0.005):
+    """Async version of profile_request(). cProfile would trace every
+     coroutine the event loop runs meanwhile, so the sampler is used.
+     It samples all threads, as parts of the request run in
+     sync_to_async threads, so concurrent requests show up too"""
+    name = output_name(request)
+    directory = Path(directory)
+    with collect() as stats:
+        start = time.perf_counter()
+        sampler = StackSampler(None, interval)
+        sampler.start()
+        try:
+            response = await get_response(request)
+        finally:
+            sampler.stop()
+        (directory / f'{name}.folded').write_text(sampler.folded())
+        duration = time.perf_counter() - start
+    write_summary(directory, name, request, response, duration, stats)
+    return response
@@ -0,0 +1,58 @@
+"""
+Sliding window rate limiter.
+
+Counters of the current and the previous window are kept in cache
+RATELIMIT_CACHE_ALIAS. It is local memory by default, point it at a
+shared cache to limit requests across all processes.
+"""
+import hashlib
+import threading
+import time
+from collections import Counter
+
+from django.conf import settings
+from django.core.cache import caches
+
+_blocked = Counter()
+_blocked_lock = threading.Lock()
+
+
+def hit(key, limit, period):
+    """Count request for key. Returns None when request is allowed
+     or seconds to wait when limit of `limit` requests per `period`
+     seconds is exceeded"""
+    cache = caches[settings.RATELIMIT_CACHE_ALIAS]
+    now = time.time()
+    window, offset = divmod(now, period)
+    # key holds client input, memcached rejects long keys and spaces
+    digest = hashlib.sha1(key.encode()).hexdigest()
+    current_key = f'rl:{digest}:{int(window)}'
+    previous_key = f'rl:{digest}:{int(window) - 1}'
+    counts = cache.get_many([current_key, previous_key])
+    previous_weight = 1 - offset / period
+    estimated = (counts.get(previous_key, 0) * previous_weight
+                 + counts.get(current_key, 0))
+    if estimated >= limit:
+        return int(period - offset) + 1
+    if not cache.add(current_key, 1, period * 2):
+        try:
+            cache.incr(current_key)
+        except ValueError:
+            cache.set(current_key, 1, period * 2)
+    return None
+
+
+def record_blocked(rule):
+    with _blocked_lock:
+        _blocked[rule] += 1
+
+
+def blocked_stats():
+    """Return number of blocked requests per rule"""
+    with _blocked_lock:
+        return dict(_blocked)
+
+
+def reset_blocked_stats():
+    with _blocked_lock:
+        _blocked.clear()
@@ -0,0 +1,139 @@
+"""
+Article search.
+
+On PostgreSQL articles are searched in the GIN indexed search_vector
+column with websearch syntax, ranked with ts_rank and get snippets
+from ts_headline. Other databases fall back to icontains over title,
+summary and body, which reads the whole table and exists for tests
+and development only.
+
+Results of a query are cached for SEARCH_CACHE_TIMEOUT seconds, so
+hot queries do not reach the database.
+"""
+import hashlib
+import re
+
+from django.conf import settings
+from django.contrib.postgres.search import (SearchHeadline, SearchQuery,
+                                            SearchRank)
+from django.core.cache import caches
+from django.db import connection
+from django.db.models import Case, F, IntegerField, Q, Value, When
+from django.utils.html import escape
+from django.utils.safestring import mark_safe
+
+from .models import Article
+
+# Text search configuration of the search_vector trigger
+SEARCH_CONFIG = 'english'
+
+# Highlight markers, replaced with <mark> after escaping
+START_SEL = '\x02'
+STOP_SEL = '\x03'
+
+RESULT_FIELDS = ['id', 'title', 'slug', 'published_at',
+                 'author__id', 'author__name', 'author__email']
+
+
+def normalize_query(query):
+    return ' '.join(query.lower().split())
+
+
+def highlight(snippet):
+    """Return HTML of snippet with matches in <mark> tags"""
+    return mark_safe(escape(snippet)
+                     .replace(START_SEL, '<mark>')
+                     .replace(STOP_SEL, '</mark>'))
+
+
+def postgres_search(query, limit):
+    """Return ranked articles with `snippet` attribute"""
+    search_query = SearchQuery(query, search_type='websearch',
+                               config=SEARCH_CONFIG)
+    return list(
+        Article.objects.published()
+        .filter(search_vector=search_query)
+        .select_related('author')
+        .only(*RESULT_FIELDS)
+        .annotate(
+            rank=SearchRank(F('search_vector'), search_query),
+            snippet=SearchHeadline(
+                'body', search_query, config=SEARCH_CONFIG,
+                start_sel=START_SEL, stop_sel=STOP_SEL,
+                min_words=15, max_words=35))
+        .order_by('-rank', '-published_at')[:limit])
+
+
+def fallback_snippet(text, terms, width=120):
+    """Return part of text around the first term with terms marked"""
+    lower = text.lower()
+    positions = [lower.find(term) for term in terms if term in lower]
+    start = max(min(positions, default=0) - width // 2, 0)
+    snippet = text[start:start + width]
+    if terms:
+        pattern = re.compile('|'.join(map(re.escape, terms)), re.IGNORECASE)
+        snippet = pattern.sub(
+            lambda match: f'{START_SEL}{match.group()}{STOP_SEL}', snippet)
+    return snippet
+
+
+def fallback_search(query, limit):
+    """Return articles containing all words of query. Rank is number
+     of words found in title"""
+    terms = normalize_query(query).split()
+    articles = Article.objects.published()
+    for term in terms:
+        articles = articles.filter(Q(title__icontains=term)
+                                   | Q(summary__icontains=term)
+                                   | Q(body__icontains=term))
+    articles = list(
+        articles
+        .select_related('author')
+        .only(*RESULT_FIELDS, 'body')
+        .annotate(rank=sum(
+            Case(When(title__icontains=term, then=Value(1)),
+                 default=Value(0), output_field=IntegerField())
+            for term in terms))
+        .order_by('-rank', '-published_at')[:limit])
+    for article in articles:
+        article.snippet = fallback_snippet(article.body, terms)
+    return articles
+
+
+def search_articles(query, limit=None, use_postgres=None):
+    """Return list of found articles with `rank` and `snippet`
+     attributes. Full-text search is used on PostgreSQL"""
+    limit = limit or settings.SEARCH_RESULTS_LIMIT
+    if not normalize_query(query):
+        return []
+    if use_postgres is None:
+        use_postgres = connection.vendor == 'postgresql'
+    if use_postgres:
+        return postgres_search(query, limit)
+    return fallback_search(query, limit)
+
+
+def search_cache_key(query):
+    digest = hashlib.sha1(normalize_query(query).encode()).hexdigest()
+    return f'search:{digest}'
+
+
+def cached_search(query):
+    """Return search results as list of dicts, cached per query"""
+    cache = caches[settings.SEARCH_CACHE_ALIAS]
+    key = search_cache_key(query)
+    results = cache.get(key)
+    if results is None:
+        results = [
+            {
+                'id': article.pk,
+                'title': article.title,
+                'slug': article.slug,
+                'author': article.author.name or article.author.email,
+                'published_at': article.published_at,
+                'snippet': highlight(article.snippet),
+            }
+            for article in search_articles(query)
+        ]
+        cache.set(key, results, settings.SEARCH_CACHE_TIMEOUT)
+    return results
@@ -0,0 +1,147 @@
+"""
+Slow query log.
+
+Queries slower than SLOW_QUERY_LOG['THRESHOLD_MS'] are logged as JSON
+to the 'core.slow_queries' logger and appended to SLOW_QUERY_LOG['PATH']
+(JSON lines) with URL name of the current request and normalized SQL.
+On PostgreSQL a sample of slow queries gets its EXPLAIN plan stored
+too. Use slow_query_report command to see the worst fingerprints.
+"""
+import hashlib
+import json
+import logging
+import random
+import re
+import threading
+import time
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DatabaseError, transaction
+
+from core.db import instrumentation
+
+logger = logging.getLogger(__name__)
+
+_current_request = ContextVar('slow_queries_request', default=None)
+_explaining = threading.local()
+_write_lock = threading.Lock()
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'\b\d+(?:\.\d+)?\b')
+_IN_LIST = re.compile(r'\bIN \((?:\s*(?:%s|\?)\s*,?)+\)', re.IGNORECASE)
+_VALUES_LIST = re.compile(r'VALUES (\([^()]*\))(?:, \([^()]*\))+',
+                          re.IGNORECASE)
+_SPACES = re.compile(r'\s+')
+
+EXPLAINABLE = ('SELECT', 'WITH')
+
+
+def normalize_sql(sql):
+    """Return SQL with literals and parameter lists collapsed, so
+     queries differing only in values look the same"""
+    sql = _STRING.sub('%s', sql)
+    sql = _NUMBER.sub('%s', sql)
+    sql = _IN_LIST.sub('IN (...)', sql)
+    sql = _VALUES_LIST.sub(r'VALUES \1, ...', sql)
+    return _SPACES.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:16]
+
+
+def explain(connection, sql, params):
+    """Return EXPLAIN plan of SELECT query or None when it can't be
+     explained. The query itself is not executed. EXPLAIN runs in a
+     savepoint, so its failure does not break the current transaction"""
+    if (connection.vendor != 'postgresql' or connection.needs_rollback
+            or not sql.lstrip().upper().startswith(EXPLAINABLE)):
+        return None
+    _explaining.active = True
+    try:
+        with transaction.atomic(using=connection.alias), \
+                connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+            return cursor.fetchone()[0]
+    except DatabaseError:
+        return None
+    finally:
+        _explaining.active = False
+
+
+def _current_view():
+    request = _current_request.get()
+    if request is None:
+        return None, None
+    match = getattr(request, 'resolver_match', None)
+    return getattr(match, 'view_name', None), request.path
+
+
+def record(entry):
+    """Log slow query entry and append it to the log file"""
+    line = json.dumps(entry, default=str)
+    logger.warning(line)
+    path = settings.SLOW_QUERY_LOG.get('PATH')
+    if path:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with _write_lock, open(path, 'a', encoding='utf-8') as file:
+            file.write(line + '\n')
+
+
+def _sql_wrapper(execute, sql, params, many, context):
+    config = settings.SLOW_QUERY_LOG
+    if not config.get('ENABLED') or getattr(_explaining, 'active', False):
+        return execute(sql, params, many, context)
+    start = time.perf_counter()
+    result = execute(sql, params, many, context)
+    duration = time.perf_counter() - start
+
+    if duration * 1000 < config['THRESHOLD_MS']:
+        return result
+
+    connection = context['connection']
+    normalized = normalize_sql(sql)
+    view, path = _current_view()
+    entry = {
+        'time': datetime.now(timezone.utc).isoformat(),
+        'duration_ms': round(duration * 1000, 3),
+        'alias': connection.alias,
+        'view': view,
+        'path': path,
+        'fingerprint': fingerprint(normalized),
+        'sql': normalized,
+        'many': many,
+    }
+    if not many and random.random() < config.get('EXPLAIN_SAMPLE_RATE', 0):
+        entry['plan'] = explain(connection, sql, params)
+    record(entry)
+    return result
+
+
+def install():
+    """Start logging slow queries of all connections"""
+    instrumentation.register(_sql_wrapper)
+
+
+def track_request(get_response, request):
+    """Run get_response(request), so slow queries know their view"""
+    instrumentation.instrument_connections()
+    token = _current_request.set(request)
+    try:
+        return get_response(request)
+    finally:
+        _current_request.reset(token)
+
+
+async def atrack_request(get_response, request):
+    """Async version of track_request(). Queries run by sync_to_async
+     see the request, as the context is copied to their thread"""
+    token = _current_request.set(request)
+    try:
+        return await get_response(request)
+    finally:
+        _current_request.reset(token)
@@ -0,0 +1,228 @@
+"""
+RSS, Atom and sitemaps.
+
+Feeds and sitemaps are streamed, rows are read with .iterator() and
+written out every SYNDICATION['CHUNK_SIZE'] articles, so large article
+sets do not get loaded into memory at once.
+
+Sitemap shard N lists published articles with ids in
+((N - 1) * SHARD_SIZE, N * SHARD_SIZE], so a shard never exceeds the
+50,000 URL limit of sitemaps and its articles do not move to other
+shards. Generated shards and the index are stored in
+SYNDICATION['SITEMAP_DIR'] and served from there until an article of
+the shard changes or SITEMAP_MAX_AGE passes.
+"""
+import io
+import os
+import tempfile
+import time
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+from django.conf import settings
+from django.db.models import F, Max
+from django.urls import reverse
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
+from django.utils.xmlutils import SimplerXMLGenerator
+
+from .models import Article
+
+SITEMAP_NS = 'http://www.sitemaps.org/schemas/sitemap/0.9'
+FEED_CLASSES = {'rss': Rss201rev2Feed, 'atom': Atom1Feed}
+
+
+def absolute_url(path):
+    return settings.SITE_URL + path
+
+
+def article_url_format():
+    """Return format string of article URLs. reverse() per article
+     would take most of the time of a sitemap shard"""
+    url = absolute_url(reverse('core:article', args=[918273645, 'slug']))
+    return (url.replace('{', '{{').replace('}', '}}')
+            .replace('918273645', '{pk}').replace('/slug/', '/{slug}/'))
+
+
+def _chunks(lines, size):
+    """Yield lines joined in chunks of size lines"""
+    chunk = []
+    for line in lines:
+        chunk.append(line)
+        if len(chunk) >= size:
+            yield ''.join(chunk)
+            chunk.clear()
+    if chunk:
+        yield ''.join(chunk)
+
+
+def feed_changed_at():
+    """Return last change of the feed or None for empty feed. Articles
+     published since the oldest one in the feed are checked whatever
+     their status, so edited and unpublished ones count as changes"""
+    published = list(Article.objects.feed()
+                     .values_list('published_at', flat=True)
+                     [:settings.SYNDICATION['FEED_ITEMS']])
+    if not published:
+        return None
+    updated = (Article.objects.filter(published_at__gte=published[-1])
+               .aggregate(updated_at=Max('updated_at'))['updated_at'])
+    return max(published[0], updated)
+
+
+def feed_items():
+    """Return iterator of newest articles for feeds"""
+    config = settings.SYNDICATION
+    return (Article.objects.feed()
+            .only(*Article.FEED_FIELDS, 'updated_at')
+            [:config['FEED_ITEMS']]
+            .iterator(chunk_size=config['CHUNK_SIZE']))
+
+
+def stream_feed(kind, last_modified):
+    """Yield RSS or Atom document of newest articles. Items are written
+     with feedgenerator one by one instead of being collected first"""
+    feed = FEED_CLASSES[kind](
+        title='News',
+        link=absolute_url(reverse('core:feed')),
+        description='Latest news',
+        feed_url=absolute_url(reverse(f'core:{kind}')),
+        language=settings.LANGUAGE_CODE)
+    # Normally computed from the collected items
+    feed.latest_post_date = lambda: last_modified
+    out = io.StringIO()
+    handler = SimplerXMLGenerator(out, 'utf-8', short_empty_elements=True)
+    atom = kind == 'atom'
+
+    def take():
+        text = out.getvalue()
+        out.seek(0)
+        out.truncate()
+        return text
+
+    def lines():
+        handler.startDocument()
+        if atom:
+            handler.startElement('feed', feed.root_attributes())
+        else:
+            handler.startElement('rss', feed.rss_attributes())
+            handler.startElement('channel', feed.root_attributes())
+        feed.add_root_elements(handler)
+        yield take()
+        for article in feed_items():
+            link = absolute_url(article.get_absolute_url())
+            feed.add_item(
+                title=article.title,
+                link=link,
+                description=article.summary,
+                author_name=article.author.name or article.author.email,
+                pubdate=article.published_at,
+                updateddate=article.updated_at,
+                unique_id=link)
+            item = feed.items.pop()
+            handler.startElement('entry' if atom else 'item',
+                                 feed.item_attributes(item))
+            feed.add_item_elements(handler, item)
+            handler.endElement('entry' if atom else 'item')
+            yield take()
+        if atom:
+            handler.endElement('feed')
+        else:
+            feed.endChannelElement(handler)
+            handler.endElement('rss')
+        yield take()
+
+    return _chunks(lines(), settings.SYNDICATION['CHUNK_SIZE'])
+
+
+def shard_bounds(shard):
+    size = settings.SYNDICATION['SITEMAP_SHARD_SIZE']
+    return (shard - 1) * size, shard * size
+
+
+def shard_changed_at(shard):
+    """Return last update of articles in shard, None for no articles.
+     Reads at most SHARD_SIZE rows of the primary key range"""
+    start, end = shard_bounds(shard)
+    return (Article.objects.filter(pk__gt=start, pk__lte=end)
+            .aggregate(changed_at=Max('updated_at'))['changed_at'])
+
+
+def stream_sitemap(shard):
+    """Yield sitemap of published articles of shard"""
+    start, end = shard_bounds(shard)
+    articles = (Article.objects.published()
+                .filter(pk__gt=start, pk__lte=end)
+                .order_by('pk')
+                .values_list('pk', 'slug', 'updated_at')
+                .iterator(chunk_size=settings.SYNDICATION['CHUNK_SIZE']))
+
+    url_format = article_url_format()
+
+    def lines():
+        yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+               f'<urlset xmlns="{SITEMAP_NS}">\n')
+        for pk, slug, updated_at in articles:
+            url = url_format.format(pk=pk, slug=slug)
+            yield (f'<url><loc>{escape(url)}</loc>'
+                   f'<lastmod>{updated_at.isoformat(timespec="seconds")}'
+                   f'</lastmod></url>\n')
+        yield '</urlset>\n'
+
+    return _chunks(lines(), settings.SYNDICATION['CHUNK_SIZE'])
+
+
+def stream_sitemap_index():
+    """Yield sitemap index of shards having published articles"""
+    size = settings.SYNDICATION['SITEMAP_SHARD_SIZE']
+    shards = (Article.objects.published()
+              .annotate(shard=(F('pk') - 1) / size + 1)
+              .values('shard')
+              .annotate(lastmod=Max('updated_at'))
+              .order_by('shard')
+              .values_list('shard', 'lastmod'))
+
+    yield ('<?xml version="1.0" encoding="UTF-8"?>\n'
+           f'<sitemapindex xmlns="{SITEMAP_NS}">\n')
+    for shard, lastmod in shards:
+        url = absolute_url(reverse('core:sitemap_shard', args=[shard]))
+        yield (f'<sitemap><loc>{escape(url)}</loc>'
+               f'<lastmod>{lastmod.isoformat(timespec="seconds")}'
+               f'</lastmod></sitemap>\n')
+    yield '</sitemapindex>\n'
+
+
+def cache_path(name):
+    return Path(settings.SYNDICATION['SITEMAP_DIR']) / name
+
+
+def cached_mtime(path, changed_at=None):
+    """Return modification time of cached file if it is still fresh"""
+    try:
+        mtime = path.stat().st_mtime
+    except FileNotFoundError:
+        return None
+    if time.time() - mtime >= settings.SYNDICATION['SITEMAP_MAX_AGE']:
+        return None
+    if changed_at is not None and changed_at.timestamp() > mtime:
+        return None
+    return mtime
+
+
+def write_through(path, chunks, mtime):
+    """Yield chunks while writing them to path. The file replaces the
+     cached one only when complete and gets `mtime`, the time
+     generation started, so changes made meanwhile make it stale"""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = tempfile.NamedTemporaryFile(
+        'w', encoding='utf-8', dir=path.parent, prefix=f'.{path.name}.',
+        delete=False)
+    try:
+        with tmp:
+            for chunk in chunks:
+                tmp.write(chunk)
+                yield chunk
+        os.utime(tmp.name, (mtime, mtime))
+        os.replace(tmp.name, path)
+    except BaseException:
+        os.unlink(tmp.name)
+        raise
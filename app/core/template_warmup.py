@@ -0,0 +1,99 @@
+"""
+Templates pre-warming.
+
+Every template of the project is loaded once, so with the cached
+loader the first request does not pay for reading and parsing them.
+"""
+import logging
+from pathlib import Path
+
+from django.apps import apps
+from django.conf import settings
+from django.core.exceptions import ImproperlyConfigured
+from django.template import TemplateSyntaxError, engines
+from django.template.base import TextNode
+from django.template.loader_tags import ExtendsNode
+
+logger = logging.getLogger(__name__)
+
+
+def _loader_dirs(loaders):
+    """Yield directories of template loaders, cached loaders included"""
+    for loader in loaders:
+        if hasattr(loader, 'loaders'):
+            yield from _loader_dirs(loader.loaders)
+        elif hasattr(loader, 'get_dirs'):
+            yield from loader.get_dirs()
+
+
+def template_dirs(engine):
+    """Return template directories of engine. Directories of Django
+     engines come from their loaders, so app directories are found
+     also with explicitly configured loaders and APP_DIRS off"""
+    if hasattr(engine, 'engine'):
+        return list(_loader_dirs(engine.engine.template_loaders))
+    dirs = list(engine.dirs)
+    if engine.app_dirs:
+        dirs += [Path(app.path) / 'templates'
+                 for app in apps.get_app_configs()]
+    return dirs
+
+
+def template_names(engine):
+    """Yield names of all templates in engine directories"""
+    seen = set()
+    for directory in template_dirs(engine):
+        directory = Path(directory)
+        if not directory.is_dir():
+            continue
+        for path in sorted(directory.rglob('*')):
+            name = path.relative_to(directory).as_posix()
+            if path.is_file() and name not in seen:
+                seen.add(name)
+                yield name
+
+
+def check_template(template):
+    """Return list of problems Django silently ignores in template.
+     Text outside of blocks in extending templates is never rendered"""
+    nodelist = getattr(getattr(template, 'template', None), 'nodelist', None)
+    if not nodelist or not isinstance(nodelist[0], ExtendsNode):
+        return []
+    return [
+        f'text outside of blocks is ignored: {node.s.strip()!r}'
+        for node in nodelist[0].nodelist
+        if isinstance(node, TextNode) and node.s.strip()
+    ]
+
+
+def warm_templates():
+    """Load all templates. Returns (loaded count, errors) where errors
+     is a list of (template name, message) tuples"""
+    loaded = 0
+    errors = []
+    for engine in engines.all():
+        for name in template_names(engine):
+            try:
+                template = engine.get_template(name)
+            except TemplateSyntaxError as exc:
+                errors.append((name, str(exc)))
+                continue
+            except UnicodeDecodeError:
+                continue
+            loaded += 1
+            errors += [(name, problem) for problem in check_template(template)]
+    return loaded, errors
+
+
+def warm_templates_on_startup():
+    """Pre-warm templates if PREWARM_TEMPLATES setting is on. Template
+     errors are logged, and stop the startup when DEBUG is off"""
+    if not settings.PREWARM_TEMPLATES:
+        return
+    _, errors = warm_templates()
+    for name, message in errors:
+        logger.error('Template %s: %s', name, message)
+    if errors and not settings.DEBUG:
+        raise ImproperlyConfigured(
+            f'{len(errors)} template errors, first in {errors[0][0]}: '
+            f'{errors[0][1]}')
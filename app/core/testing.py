@@ -0,0 +1,124 @@
+"""
+Performance assertions for tests.
+
+PerformanceBudget works both as context manager and as decorator of
+test methods and fails the test when the code inside runs more
+database queries, takes more wall time or calls password hashers
+more times than allowed:
+
+    @PerformanceBudget(queries=3, hashes=1, seconds=0.5)
+    def test_login(self):
+        ...
+
+Hashing done by the process pool of user.hashing is counted when tasks
+are submitted, as hashers run in the worker processes.
+
+Wall time depends on the machine, so time budgets are checked only when
+TEST_TIME_BUDGETS environment variable is set, and are multiplied by
+TEST_TIME_FACTOR, so slow machines can relax them without code changes.
+"""
+import os
+import threading
+import time
+from contextlib import ContextDecorator, ExitStack
+from unittest.mock import patch
+
+from django.contrib.auth.hashers import get_hashers
+from django.db import connections
+from django.test.utils import CaptureQueriesContext
+
+from user.hashing import HashingPool
+
+
+def time_budgets_enabled():
+    return os.environ.get('TEST_TIME_BUDGETS', '') not in ('', '0')
+
+
+def time_factor():
+    return float(os.environ.get('TEST_TIME_FACTOR', 1))
+
+
+class PerformanceBudget(ContextDecorator):
+    """Assert maximal number of queries, hasher calls and wall time.
+     Limits which are None are not checked"""
+
+    def __init__(self, queries=None, seconds=None, hashes=None,
+                 using='default'):
+        self.queries = queries
+        self.seconds = seconds
+        self.hashes = hashes
+        self.using = using
+
+    def __enter__(self):
+        self._stack = ExitStack()
+        self.hash_calls = 0
+        self._local = threading.local()
+        if self.queries is not None:
+            self.captured = self._stack.enter_context(
+                CaptureQueriesContext(connections[self.using]))
+        if self.hashes is not None:
+            for hasher in get_hashers():
+                for method in ('encode', 'verify'):
+                    self._stack.enter_context(patch.object(
+                        type(hasher), method,
+                        self._counting(getattr(type(hasher), method))))
+            for method in ('run', 'arun'):
+                self._stack.enter_context(patch.object(
+                    HashingPool, method,
+                    self._counting(getattr(HashingPool, method))))
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.elapsed = time.perf_counter() - self._start
+        self._stack.close()
+        if exc_type is not None:
+            return False
+
+        if self.queries is not None and \
+                len(self.captured) > self.queries:
+            executed = '\n'.join(
+                f'{i}. {query["sql"]}'
+                for i, query in enumerate(self.captured.captured_queries, 1))
+            raise AssertionError(
+                f'{len(self.captured)} queries executed, '
+                f'{self.queries} allowed\n{executed}')
+        if self.hashes is not None and self.hash_calls > self.hashes:
+            raise AssertionError(
+                f'Password hashers called {self.hash_calls} times, '
+                f'{self.hashes} allowed')
+        if self.seconds is not None and time_budgets_enabled():
+            allowed = self.seconds * time_factor()
+            if self.elapsed > allowed:
+                raise AssertionError(
+                    f'Took {self.elapsed:.3f}s, {allowed:.3f}s allowed')
+        return False
+
+    def _counting(self, method):
+        """Wrap hasher or pool method to count its calls. Hashers call
+         encode() from verify(), so only the outermost call is counted"""
+        def wrapper(*args, **kwargs):
+            depth = getattr(self._local, 'depth', 0)
+            if not depth:
+                self.hash_calls += 1
+            self._local.depth = depth + 1
+            try:
+                return method(*args, **kwargs)
+            finally:
+                self._local.depth = depth
+        return wrapper
+
+
+def max_queries(number, using='default'):
+    """Assert at most `number` database queries"""
+    return PerformanceBudget(queries=number, using=using)
+
+
+def max_duration(seconds):
+    """Assert wall time is at most `seconds` if TEST_TIME_BUDGETS is set"""
+    return PerformanceBudget(seconds=seconds)
+
+
+def max_hashes(number):
+    """Assert password hashers are called at most `number` times"""
+    return PerformanceBudget(hashes=number)
@@ -0,0 +1,53 @@
+"""
+Test performance settings checks
+"""
+from io import StringIO
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import SimpleTestCase, override_settings
+
+from core.checks import check_performance_settings
+
+PERFORMANCE_ON = {
+    'DEBUG': False,
+    'SESSION_ENGINE': 'django.contrib.sessions.backends.cached_db',
+    'PAGE_CACHE_TIMEOUT': 300,
+    'PREWARM_TEMPLATES': True,
+}
+
+
+class PerformanceChecksTest(SimpleTestCase):
+    """Test performance settings checks"""
+
+    def _databases(self, conn_max_age):
+        return {'default': {
+            'ENGINE': 'django.db.backends.sqlite3',
+            'CONN_MAX_AGE': conn_max_age,
+        }}
+
+    def test_all_settings_on(self):
+        """Test no warnings when all performance settings are on"""
+        with self.settings(DATABASES=self._databases(60), **PERFORMANCE_ON):
+            warnings = check_performance_settings(None)
+
+        self.assertEqual(warnings, [])
+
+    def test_disabled_settings_reported(self):
+        """Test warnings for disabled settings"""
+        settings = dict(PERFORMANCE_ON, SESSION_ENGINE=(
+            'django.contrib.sessions.backends.db'))
+        with self.settings(DATABASES=self._databases(0), **settings):
+            ids = [w.id for w in check_performance_settings(None)]
+
+        self.assertEqual(ids, ['core.W002', 'core.W005'])
+
+    @override_settings(DEBUG=True, PAGE_CACHE_TIMEOUT=0)
+    def test_command_reports_off_settings(self):
+        """Test command prints disabled settings and fails with --fail"""
+        out = StringIO()
+        call_command('check_performance', stdout=out)
+        self.assertIn('[off] DEBUG is off', out.getvalue())
+
+        with self.assertRaises(CommandError):
+            call_command('check_performance', fail=True, stdout=StringIO())
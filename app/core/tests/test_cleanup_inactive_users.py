@@ -0,0 +1,134 @@
+"""
+Test cleanup_inactive_users command
+"""
+import json
+import tempfile
+from datetime import timedelta
+from io import StringIO
+from importlib import import_module
+from pathlib import Path
+from unittest.mock import patch
+
+from django.apps import apps
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from core.models import Article
+from user.models import ActivationToken
+
+
+@patch('core.management.commands.cleanup_inactive_users.time.sleep')
+class CleanupInactiveUsersCommandTest(TestCase):
+    """Test cleanup_inactive_users command"""
+
+    def setUp(self):
+        self.old = timezone.now() - timedelta(days=40)
+
+    def create_user(self, email, **fields):
+        user = get_user_model().objects.create_user(
+            email=email, password='goodpassword123')
+        get_user_model().objects.filter(id=user.id).update(
+            date_joined=self.old, **fields)
+        return user
+
+    def test_deletes_old_inactive_users_in_batches(self, patched_sleep):
+        """Test only old never activated users are deleted"""
+        stale = [self.create_user(f'stale{i}@example.com') for i in range(5)]
+        active = self.create_user('active@example.com', is_active=True)
+        disabled = self.create_user('disabled@example.com',
+                                    last_login=timezone.now())
+        fresh = get_user_model().objects.create_user(
+            email='fresh@example.com', password='goodpassword123')
+        out = StringIO()
+
+        call_command('cleanup_inactive_users', '--days=30',
+                     '--batch-size=2', stdout=out)
+
+        self.assertQuerysetEqual(
+            get_user_model().objects.order_by('id'),
+            [active, disabled, fresh])
+        self.assertFalse(
+            ActivationToken.objects.filter(user__in=stale).exists())
+        self.assertEqual(patched_sleep.call_count, 3)
+        self.assertIn('Deleted 5 never activated users', out.getvalue())
+
+    def test_archive(self, patched_sleep):
+        """Test deleted users are written to archive file"""
+        user = self.create_user('stale@example.com')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / 'archive.jsonl'
+            call_command('cleanup_inactive_users', f'--archive={path}',
+                         stdout=StringIO())
+            rows = [json.loads(line) for line in path.read_text().splitlines()]
+
+        self.assertEqual(len(rows), 1)
+        self.assertEqual(rows[0]['id'], user.id)
+        self.assertEqual(rows[0]['email'], 'stale@example.com')
+
+    def test_dry_run(self, patched_sleep):
+        """Test dry run deletes nothing"""
+        self.create_user('stale@example.com')
+        out = StringIO()
+
+        call_command('cleanup_inactive_users', '--dry-run', stdout=out)
+
+        self.assertEqual(get_user_model().objects.count(), 1)
+        self.assertIn('1 users would be deleted', out.getvalue())
+
+    def test_keeps_users_with_articles(self, patched_sleep):
+        """Test users who wrote articles are not deleted"""
+        author = self.create_user('author@example.com')
+        Article.objects.create(title='Title', slug='title', body='Body',
+                               author=author)
+        self.create_user('stale@example.com')
+        out = StringIO()
+
+        call_command('cleanup_inactive_users', stdout=out)
+
+        self.assertQuerysetEqual(get_user_model().objects.all(), [author])
+        self.assertIn('Deleted 1 never activated users', out.getvalue())
+        self.assertIn('kept 1 users with articles', out.getvalue())
+
+    @patch('core.management.commands.cleanup_inactive_users.replication_lag')
+    def test_waits_for_replicas(self, patched_lag, patched_sleep):
+        """Test command waits while replication lag is too high"""
+        self.create_user('stale@example.com')
+        patched_lag.side_effect = [10, 10, 0]
+
+        call_command('cleanup_inactive_users', '--max-lag=5',
+                     stdout=StringIO())
+
+        self.assertEqual(patched_lag.call_count, 3)
+        self.assertEqual(patched_sleep.call_count, 3)
+
+
+class BackfillDateJoinedMigrationTest(TestCase):
+    """Test date_joined backfill of users created before the field"""
+
+    def test_backfill(self):
+        """Test date_joined is moved back to token issue or login time"""
+        migration = import_module('user.migrations.0009_backfill_date_joined')
+        issued = timezone.now() - timedelta(days=40)
+        users = get_user_model().objects
+        pending = users.create_user(email='pending@example.com',
+                                    password='goodpassword123')
+        ActivationToken.objects.filter(user=pending).update(
+            expires_at=issued + timedelta(days=3))
+        logged_in = users.create_user(email='login@example.com',
+                                      password='goodpassword123')
+        users.filter(pk=logged_in.pk).update(last_login=issued)
+        unknown = users.create_user(email='unknown@example.com',
+                                    password='goodpassword123')
+        ActivationToken.objects.filter(user=unknown).delete()
+
+        # Tokens were issued with the lifetime of the migration time
+        with self.settings(ACTIVATION_TOKEN_LIFETIME=timedelta(days=7)):
+            migration.backfill_date_joined(apps, None)
+
+        self.assertEqual(users.get(pk=pending.pk).date_joined, issued)
+        self.assertEqual(users.get(pk=logged_in.pk).date_joined, issued)
+        self.assertEqual(users.get(pk=unknown.pk).date_joined,
+                         unknown.date_joined)
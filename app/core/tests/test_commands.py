@@ -6,30 +6,57 @@ from unittest.mock import patch
 from psycopg2 import OperationalError as Psycopg2Error
 
 from django.core.management import call_command
+from django.core.management.base import CommandError
 from django.db.utils import OperationalError
 from django.test import SimpleTestCase
 
 
-@patch('core.management.commands.wait_for_db.Command.check')
+@patch('core.management.commands.wait_for_db.Command.probe')
 class CommandTest(SimpleTestCase):
     """Test comands"""
 
-    def test_wait_for_db_ready(self, patched_check):
+    def test_wait_for_db_ready(self, patched_probe):
         """Test waiting for database if database is ready"""
-        patched_check.return_value = True
+        patched_probe.return_value = None
 
         call_command('wait_for_db')
 
-        patched_check.assert_called_once_with(databases=['default'])
+        patched_probe.assert_called_once_with('default')
 
     @patch('time.sleep')
-    def test_wait_for_db_delay(self, patched_sleep, patched_check):
+    def test_wait_for_db_delay(self, patched_sleep, patched_probe):
         """Test waiting database when getting OperationError."""
 
-        patched_check.side_effect = [Psycopg2Error] * 2 + \
-            [OperationalError] * 3 + [True]
+        patched_probe.side_effect = [Psycopg2Error] * 2 + \
+            [OperationalError] * 3 + [None]
 
         call_command('wait_for_db')
 
-        self.assertEqual(patched_check.call_count, 6)
-        patched_check.assert_called_with(databases=['default'])
+        self.assertEqual(patched_probe.call_count, 6)
+        patched_probe.assert_called_with('default')
+
+    @patch('time.sleep')
+    def test_wait_for_db_exponential_backoff(self, patched_sleep,
+                                             patched_probe):
+        """Test delays grow exponentially up to --max-wait"""
+        patched_probe.side_effect = [OperationalError] * 6 + [None]
+
+        call_command('wait_for_db', initial_wait=1, max_wait=8)
+
+        delays = [c.args[0] for c in patched_sleep.call_args_list]
+        for delay, limit in zip(delays, [1, 2, 4, 8, 8, 8]):
+            self.assertGreaterEqual(delay, limit / 2)
+            self.assertLessEqual(delay, limit)
+
+    @patch('time.monotonic')
+    @patch('time.sleep')
+    def test_wait_for_db_timeout(self, patched_sleep, patched_monotonic,
+                                 patched_probe):
+        """Test command fails when database is unavailable too long"""
+        patched_probe.side_effect = OperationalError
+        patched_monotonic.side_effect = [0, 1, 2, 3, 11]
+
+        with self.assertRaises(CommandError):
+            call_command('wait_for_db', timeout=10)
+
+        self.assertEqual(patched_probe.call_count, 4)
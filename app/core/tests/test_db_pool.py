@@ -0,0 +1,181 @@
+"""
+Test database connection pool
+"""
+import threading
+import time
+from unittest.mock import patch
+
+from django.db.utils import OperationalError
+from django.test import SimpleTestCase
+
+from core.db.backends.postgresql_pool import base as pool_backend
+from core.db.pool import ConnectionPool, PoolTimeout
+
+
+class FakeConnection:
+    """Stand-in for database connection"""
+
+    def __init__(self):
+        self.closed = 0
+        self.broken = False
+        self.isolation_level = 1
+
+    def close(self):
+        self.closed = 1
+
+
+def fail_if_broken(conn):
+    if conn.broken:
+        raise OperationalError('connection is broken')
+
+
+class ConnectionPoolTests(SimpleTestCase):
+    """Tests for ConnectionPool"""
+
+    def _pool(self, **kwargs):
+        options = {'min_size': 1, 'max_size': 2, 'timeout': 0.1,
+                   'check': fail_if_broken, 'reset': fail_if_broken}
+        options.update(kwargs)
+        return ConnectionPool(**options)
+
+    def test_connection_reused(self):
+        """Test returned connection is given out again"""
+        pool = self._pool()
+        conn = pool.getconn(FakeConnection)
+        pool.putconn(conn)
+
+        self.assertIs(pool.getconn(FakeConnection), conn)
+        self.assertEqual(pool.stats()['created'], 1)
+        self.assertEqual(pool.stats()['checked_out'], 1)
+
+    def test_prefill_min_size(self):
+        """Test pool opens min_size connections on first use"""
+        pool = self._pool(min_size=2)
+        pool.getconn(FakeConnection)
+
+        self.assertEqual(pool.stats()['created'], 2)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_prefill_replaces_discarded(self):
+        """Test pool opens min_size connections again after discards"""
+        pool = self._pool(min_size=2)
+        pool.putconn(pool.getconn(FakeConnection), discard=True)
+        pool.closeall()
+
+        pool.getconn(FakeConnection)
+
+        self.assertEqual(pool.stats()['created'], 4)
+        self.assertEqual(pool.stats()['idle'], 1)
+
+    def test_timeout_when_exhausted(self):
+        """Test getconn raises PoolTimeout when pool is exhausted"""
+        pool = self._pool(max_size=1)
+        pool.getconn(FakeConnection)
+
+        with self.assertRaises(PoolTimeout):
+            pool.getconn(FakeConnection)
+        self.assertEqual(pool.stats()['timeouts'], 1)
+
+    def test_waiting_for_returned_connection(self):
+        """Test blocked getconn gets connection returned by other thread"""
+        pool = self._pool(max_size=1, timeout=5)
+        conn = pool.getconn(FakeConnection)
+        result = []
+        thread = threading.Thread(
+            target=lambda: result.append(pool.getconn(FakeConnection)))
+        thread.start()
+        while pool.stats()['waiting'] == 0:
+            time.sleep(0.01)
+
+        pool.putconn(conn)
+        thread.join()
+
+        self.assertEqual(result, [conn])
+        self.assertEqual(pool.stats()['waiting'], 0)
+
+    def test_closed_connection_discarded(self):
+        """Test closed idle connection is replaced with new one"""
+        pool = self._pool()
+        conn = pool.getconn(FakeConnection)
+        pool.putconn(conn)
+        conn.closed = 1
+
+        new_conn = pool.getconn(FakeConnection)
+
+        self.assertIsNot(new_conn, conn)
+        self.assertEqual(pool.stats()['discarded'], 1)
+
+    def test_health_check_after_interval(self):
+        """Test broken connection is found by health check"""
+        pool = self._pool(health_check_interval=0)
+        conn = pool.getconn(FakeConnection)
+        pool.putconn(conn)
+        conn.broken = True
+
+        self.assertIsNot(pool.getconn(FakeConnection), conn)
+        self.assertTrue(conn.closed)
+
+    def test_connection_failing_reset_discarded(self):
+        """Test connection which can not be reset is not reused"""
+        pool = self._pool()
+        conn = pool.getconn(FakeConnection)
+        conn.broken = True
+        pool.putconn(conn)
+
+        self.assertEqual(pool.stats()['idle'], 0)
+        self.assertEqual(pool.stats()['discarded'], 1)
+
+    def test_factory_error_releases_slot(self):
+        """Test failed connection attempt does not leak pool slot"""
+        pool = self._pool(max_size=1)
+
+        def factory():
+            raise OperationalError('database is down')
+
+        with self.assertRaises(OperationalError):
+            pool.getconn(factory)
+        pool.getconn(FakeConnection)
+
+
+@patch.object(pool_backend, 'reset_connection', fail_if_broken)
+@patch('django.db.backends.postgresql.base.DatabaseWrapper'
+       '.get_new_connection', side_effect=lambda params: FakeConnection())
+class PoolBackendTests(SimpleTestCase):
+    """Tests for postgresql_pool database backend"""
+
+    def setUp(self):
+        self.settings_dict = {
+            'ENGINE': 'core.db.backends.postgresql_pool',
+            'NAME': 'pool_test', 'USER': '', 'PASSWORD': '', 'HOST': '',
+            'PORT': '', 'OPTIONS': {}, 'TIME_ZONE': None,
+            'AUTOCOMMIT': True, 'ATOMIC_REQUESTS': False,
+            'CONN_MAX_AGE': 0, 'TEST': {},
+            'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 1, 'TIMEOUT': 0.1},
+        }
+        pool_backend._pools.clear()
+
+    def tearDown(self):
+        pool_backend._pools.clear()
+
+    def test_closed_connection_returns_to_pool(self, patched_connect):
+        """Test backend reuses connection after close()"""
+        wrapper = pool_backend.DatabaseWrapper(self.settings_dict)
+        params = wrapper.get_connection_params()
+
+        conn = wrapper.get_new_connection(params)
+        wrapper.connection = conn
+        wrapper._close()
+        again = wrapper.get_new_connection(params)
+
+        self.assertIs(again, conn)
+        self.assertEqual(patched_connect.call_count, 1)
+        self.assertEqual(pool_backend.pool_stats()[0]['checked_out'], 1)
+
+    def test_pool_timeout_raises_operational_error(self, patched_connect):
+        """Test exhausted pool raises OperationalError"""
+        wrapper = pool_backend.DatabaseWrapper(self.settings_dict)
+        params = wrapper.get_connection_params()
+        wrapper.get_new_connection(params)
+
+        with self.assertRaises(OperationalError):
+            wrapper.get_new_connection(params)
@@ -0,0 +1,115 @@
+"""
+Test news feed
+"""
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core.models import Article
+from core.testing import PerformanceBudget
+from core.views import decode_cursor, encode_cursor, feed_page
+
+FEED_URL = reverse('core:feed')
+
+
+def create_article(author, **kwargs):
+    """Create and return published article"""
+    default = {
+        'title': 'Title',
+        'slug': 'title',
+        'body': 'Body',
+        'status': Article.PUBLISHED,
+        'published_at': timezone.now() - timedelta(hours=1),
+    }
+    default.update(kwargs)
+    return Article.objects.create(author=author, **default)
+
+
+class FeedTests(TestCase):
+    """Tests for feed view and keyset pagination"""
+
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(
+            email='author@example.com', password='testpassword123',
+            name='Author')
+
+    def test_only_published_articles(self):
+        """Test drafts and scheduled articles are not in feed"""
+        published = create_article(self.author)
+        create_article(self.author, status=Article.DRAFT)
+        create_article(self.author,
+                       published_at=timezone.now() + timedelta(hours=1))
+
+        articles, next_cursor = feed_page()
+
+        self.assertEqual(articles, [published])
+        self.assertIsNone(next_cursor)
+
+    def test_pages_cover_all_articles(self):
+        """Test pages have no gaps and duplicates, articles with the same
+         publication time are ordered by id"""
+        now = timezone.now() - timedelta(hours=1)
+        created = [
+            create_article(self.author, title=f'Article {i}',
+                           published_at=now - timedelta(minutes=i // 2))
+            for i in range(7)
+        ]
+        expected = sorted(created, key=lambda a: (a.published_at, a.pk),
+                          reverse=True)
+
+        seen = []
+        cursor = None
+        while True:
+            articles, cursor = feed_page(cursor, size=3)
+            seen += articles
+            if cursor is None:
+                break
+
+        self.assertEqual(seen, expected)
+
+    def test_cursor_round_trip(self):
+        """Test cursor keeps microseconds of publication time"""
+        article = create_article(self.author)
+
+        self.assertEqual(decode_cursor(encode_cursor(article)),
+                         (article.published_at, article.pk))
+
+    @override_settings(FEED_PAGE_SIZE=2)
+    def test_feed_page_is_one_query(self):
+        """Test feed page with authors is loaded with one query"""
+        for i in range(3):
+            create_article(self.author, title=f'Article {i}')
+
+        # Feed page and trending articles
+        with PerformanceBudget(queries=2):
+            res = self.client.get(FEED_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, 'Author')
+        self.assertContains(res, '?after=')
+
+        with PerformanceBudget(queries=2):
+            res = self.client.get(FEED_URL, {
+                'after': res.context['next_cursor']})
+        self.assertContains(res, 'Article 0')
+        self.assertNotContains(res, '?after=')
+
+    def test_future_cursor_hides_scheduled_articles(self):
+        """Test cursor pointing to the future starts from now"""
+        scheduled = create_article(
+            self.author, published_at=timezone.now() + timedelta(days=1))
+        published = create_article(self.author)
+        scheduled.published_at += timedelta(days=1)
+
+        articles, _ = feed_page(encode_cursor(scheduled))
+
+        self.assertEqual(articles, [published])
+
+    def test_invalid_cursor(self):
+        """Test 404 for malformed cursor"""
+        res = self.client.get(FEED_URL, {'after': 'nonsense'})
+
+        self.assertEqual(res.status_code, 404)
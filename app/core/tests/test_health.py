@@ -0,0 +1,93 @@
+"""
+Test health check endpoints
+"""
+import asyncio
+from unittest.mock import Mock, patch
+
+from django.db.utils import OperationalError
+from django.http import HttpResponse
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.health import ReadinessState
+from core.middleware import HealthCheckMiddleware
+
+
+class ReadinessStateTests(SimpleTestCase):
+    """Tests for ReadinessState"""
+
+    def test_probe_result_cached(self):
+        """Test database is probed once per interval"""
+        probe = Mock()
+        state = ReadinessState(interval=60, probe=probe)
+
+        self.assertTrue(state.is_ready())
+        self.assertTrue(state.is_ready())
+        self.assertEqual(probe.call_count, 1)
+
+    def test_failed_probe(self):
+        """Test state is not ready when probe fails"""
+        state = ReadinessState(
+            interval=0, probe=Mock(side_effect=OperationalError))
+
+        self.assertFalse(state.is_ready())
+
+    def test_probe_repeated_after_interval(self):
+        """Test outdated state is refreshed"""
+        probe = Mock(side_effect=[OperationalError, None])
+        state = ReadinessState(interval=0, probe=probe)
+
+        self.assertFalse(state.is_ready())
+        self.assertTrue(state.is_ready())
+
+
+@override_settings(ALLOWED_HOSTS=['example.com'])
+class HealthEndpointsTests(SimpleTestCase):
+    """Tests for /healthz and /readyz"""
+
+    def test_healthz(self):
+        """Test liveness endpoint answers without database"""
+        res = self.client.get('/healthz', SERVER_NAME='10.0.0.1')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.content, b'ok')
+
+    @patch('core.health.probe_database')
+    def test_readyz(self, patched_probe):
+        """Test readiness endpoint reports database state"""
+        res = self.client.get('/readyz')
+
+        self.assertEqual(res.status_code, 200)
+
+    @patch('core.middleware.ReadinessState.is_ready', return_value=False)
+    def test_readyz_not_ready(self, patched_is_ready):
+        """Test readiness endpoint returns 503 without database"""
+        res = self.client.get('/readyz')
+
+        self.assertEqual(res.status_code, 503)
+
+
+class HealthCheckMiddlewareTests(SimpleTestCase):
+    """Tests for HealthCheckMiddleware in async chain"""
+
+    def setUp(self):
+        async def get_response(request):
+            return HttpResponse('view')
+        self.middleware = HealthCheckMiddleware(get_response)
+        self.factory = RequestFactory()
+
+    def test_async_capable(self):
+        """Test middleware is a coroutine function in async chain"""
+        self.assertTrue(asyncio.iscoroutinefunction(self.middleware))
+
+    async def test_async_probes(self):
+        """Test probes are answered and other requests passed on"""
+        res = await self.middleware(self.factory.get('/healthz'))
+        self.assertEqual(res.content, b'ok')
+
+        with patch.object(self.middleware.readiness, 'is_ready',
+                          return_value=False):
+            res = await self.middleware(self.factory.get('/readyz'))
+        self.assertEqual(res.status_code, 503)
+
+        res = await self.middleware(self.factory.get('/'))
+        self.assertEqual(res.content, b'view')
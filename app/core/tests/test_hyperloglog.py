@@ -0,0 +1,82 @@
+"""
+Test HyperLogLog sketch
+"""
+from django.test import SimpleTestCase
+
+from core.hyperloglog import HyperLogLog
+
+
+class HyperLogLogTests(SimpleTestCase):
+    """Tests for HyperLogLog accuracy and storage"""
+
+    def test_accuracy(self):
+        """Test estimates are within three standard errors"""
+        sketch = HyperLogLog(11)
+        # 1.04 / sqrt(2048)
+        error = 0.023
+        added = 0
+        for count in (100, 1000, 10000, 100000):
+            for i in range(added, count):
+                sketch.add(f'visitor-{i}')
+            added = count
+
+            self.assertAlmostEqual(sketch.count() / count, 1,
+                                   delta=3 * error)
+
+    def test_duplicates_not_counted(self):
+        """Test adding the same value again does not change estimate"""
+        sketch = HyperLogLog()
+        for _ in range(1000):
+            sketch.add('visitor')
+
+        self.assertEqual(sketch.count(), 1)
+
+    def test_merge_is_union(self):
+        """Test merged sketches count overlapping values once"""
+        first, second = HyperLogLog(), HyperLogLog()
+        for i in range(6000):
+            first.add(str(i))
+        for i in range(4000, 10000):
+            second.add(str(i))
+
+        first.merge(second)
+
+        self.assertAlmostEqual(first.count() / 10000, 1, delta=0.07)
+
+    def test_downsample(self):
+        """Test downsampled sketch equals sketch of lower precision"""
+        sketch, expected = HyperLogLog(14), HyperLogLog(11)
+        for i in range(20000):
+            sketch.add(str(i))
+            expected.add(str(i))
+
+        self.assertEqual(sketch.downsample(11).registers, expected.registers)
+        with self.assertRaises(ValueError):
+            expected.downsample(12)
+
+    def test_merge_different_precision(self):
+        """Test sketches of different precision merge at the lower one"""
+        low, high = HyperLogLog(10), HyperLogLog(12)
+        for i in range(3000):
+            low.add(str(i))
+        for i in range(2000, 5000):
+            high.add(str(i))
+
+        high.merge(low)
+
+        self.assertEqual(high.precision, 10)
+        self.assertAlmostEqual(high.count() / 5000, 1, delta=0.1)
+
+    def test_bytes_round_trip(self):
+        """Test stored sketch is compact and restores the same count"""
+        sketch = HyperLogLog(11)
+        for i in range(50):
+            sketch.add(str(i))
+
+        data = sketch.to_bytes()
+        restored = HyperLogLog.from_bytes(data)
+
+        self.assertLess(len(data), 300)
+        self.assertEqual(restored.precision, 11)
+        self.assertEqual(restored.count(), sketch.count())
+        self.assertEqual(HyperLogLog.from_bytes(b'').count(), 0)
@@ -0,0 +1,144 @@
+"""
+Test import_users command
+"""
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+
+class ImportUsersCommandTest(TestCase):
+    """Test import_users command"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _call(self, *args, **kwargs):
+        kwargs.setdefault('workers', 0)
+        out = StringIO()
+        call_command('import_users', *args, stdout=out, **kwargs)
+        return out.getvalue()
+
+    def _write_csv(self, count):
+        path = self.dir / 'users.csv'
+        lines = ['email,name,password']
+        lines += [f'user{i}@EXAMPLE.com,User {i},password{i}'
+                  for i in range(count)]
+        path.write_text('\n'.join(lines))
+        return str(path)
+
+    def test_import_csv(self):
+        """Test users are created from CSV file with hashed passwords"""
+        out = self._call(self._write_csv(5), batch_size=2)
+
+        users = get_user_model().objects.order_by('email')
+        self.assertEqual(users.count(), 5)
+        self.assertEqual(users[0].email, 'user0@example.com')
+        self.assertTrue(users[0].check_password('password0'))
+        self.assertFalse(users[0].is_active)
+        self.assertEqual(users[0].activation_tokens.count(), 1)
+        self.assertIn('rows/sec', out)
+
+    def test_import_jsonl_active(self):
+        """Test users are created from JSONL file as activated"""
+        path = self.dir / 'users.jsonl'
+        path.write_text('\n'.join(
+            json.dumps({'email': f'user{i}@example.com',
+                        'password': 'password123'})
+            for i in range(3)))
+
+        self._call(str(path), active=True)
+
+        users = get_user_model().objects.all()
+        self.assertEqual(users.count(), 3)
+        self.assertTrue(all(user.is_active for user in users))
+        self.assertFalse(users[0].activation_tokens.exists())
+
+    def test_existing_users_are_skipped(self):
+        """Test import does not fail on already existing emails"""
+        get_user_model().objects.create_user(
+            email='user1@example.com', password='oldpassword123')
+
+        self._call(self._write_csv(3))
+
+        self.assertEqual(get_user_model().objects.count(), 3)
+        user = get_user_model().objects.get(email='user1@example.com')
+        self.assertTrue(user.check_password('oldpassword123'))
+
+    def test_resume_from_checkpoint(self):
+        """Test import writes checkpoint and resumes from it"""
+        path = self._write_csv(4)
+        checkpoint = str(self.dir / 'checkpoint')
+        Path(checkpoint).write_text('2')
+
+        self._call(path, checkpoint=checkpoint)
+
+        emails = set(get_user_model().objects.values_list('email', flat=True))
+        self.assertEqual(emails, {'user2@example.com', 'user3@example.com'})
+        self.assertEqual(Path(checkpoint).read_text(), '4')
+
+    def test_offset_overrides_checkpoint(self):
+        """Test --offset option is used instead of checkpoint"""
+        path = self._write_csv(4)
+        checkpoint = str(self.dir / 'checkpoint')
+        Path(checkpoint).write_text('2')
+
+        self._call(path, checkpoint=checkpoint, offset=3)
+
+        self.assertEqual(get_user_model().objects.count(), 1)
+
+    @patch('core.management.commands.import_users.copy_users')
+    def test_postgresql_uses_copy(self, patched_copy):
+        """Test COPY writer is used for PostgreSQL"""
+        with patch('core.management.commands.import_users.connection') as c:
+            c.vendor = 'postgresql'
+            self._call(self._write_csv(2), active=True)
+
+        patched_copy.assert_called_once()
+        self.assertEqual(len(patched_copy.call_args.args[0]), 2)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+    def test_copy_users(self):
+        """Test COPY import with empty names and existing emails"""
+        get_user_model().objects.create_user(
+            email='user0@example.com', password='oldpassword123',
+            name='Existing')
+        path = self.dir / 'users.csv'
+        path.write_text('email,name,password\n'
+                        'user0@example.com,,password0\n'
+                        'user1@example.com,,password1\n')
+
+        self._call(str(path))
+
+        user = get_user_model().objects.get(email='user1@example.com')
+        self.assertEqual(user.name, '')
+        self.assertIsNotNone(user.date_joined)
+        self.assertTrue(user.check_password('password1'))
+        self.assertEqual(user.activation_tokens.count(), 1)
+        self.assertEqual(
+            get_user_model().objects.get(email='user0@example.com').name,
+            'Existing')
+
+    def test_process_pool_hashing(self):
+        """Test passwords hashed in worker processes are valid"""
+        self._call(self._write_csv(2), workers=2)
+
+        user = get_user_model().objects.get(email='user1@example.com')
+        self.assertTrue(user.check_password('password1'))
+
+    def test_missing_file_raises_error(self):
+        """Test error for not existing file"""
+        with self.assertRaises(CommandError):
+            self._call(str(self.dir / 'missing.csv'))
@@ -0,0 +1,179 @@
+"""
+Test metrics
+"""
+import asyncio
+import tempfile
+
+from django.contrib.auth import get_user_model
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.middleware import MetricsMiddleware
+
+LOGIN_URL = reverse('user:login')
+
+
+class RegistryTests(SimpleTestCase):
+    """Tests for metrics Registry"""
+
+    def setUp(self):
+        self.registry = metrics.Registry()
+        self.counter = self.registry.counter(
+            'logins_total', 'Logins', ['result'])
+        self.histogram = self.registry.histogram(
+            'duration_seconds', 'Duration', buckets=(0.1, 1))
+
+    def test_render(self):
+        """Test text exposition format"""
+        self.counter.inc(result='success')
+        self.counter.inc(2, result='failure')
+        self.histogram.observe(0.05)
+        self.histogram.observe(0.5)
+        self.histogram.observe(5)
+
+        text = self.registry.render()
+
+        self.assertIn('# TYPE logins_total counter', text)
+        self.assertIn('logins_total{result="success"} 1', text)
+        self.assertIn('logins_total{result="failure"} 2', text)
+        self.assertIn('# TYPE duration_seconds histogram', text)
+        self.assertIn('duration_seconds_bucket{le="0.1"} 1', text)
+        self.assertIn('duration_seconds_bucket{le="1.0"} 2', text)
+        self.assertIn('duration_seconds_bucket{le="+Inf"} 3', text)
+        self.assertIn('duration_seconds_sum 5.55', text)
+        self.assertIn('duration_seconds_count 3', text)
+
+    def test_wrong_labels(self):
+        """Test error for labels not declared by metric"""
+        with self.assertRaises(ValueError):
+            self.counter.inc(view='user:login')
+
+    def test_multiprocess_aggregation(self):
+        """Test values of all processes are summed"""
+        other = metrics.Registry()
+        other_counter = other.counter('logins_total', 'Logins', ['result'])
+        other.histogram('duration_seconds', 'Duration', buckets=(0.1, 1))
+        self.counter.inc(result='success')
+        other_counter.inc(3, result='success')
+
+        with tempfile.TemporaryDirectory() as tmp:
+            other.flush(tmp)
+            with override_settings(METRICS={'MULTIPROCESS_DIR': tmp}):
+                text = self.registry.render()
+
+        self.assertIn('logins_total{result="success"} 4', text)
+
+    def test_reset(self):
+        """Test reset drops inherited values and changes process id"""
+        self.counter.inc(result='success')
+        process_id = self.registry.process_id
+
+        self.registry.reset()
+
+        self.assertEqual(self.registry.snapshot()['logins_total'], [])
+        self.assertNotEqual(self.registry.process_id, process_id)
+
+
+@override_settings(METRICS={'ENABLED': True})
+class MetricsMiddlewareTests(TestCase):
+    """Tests for MetricsMiddleware"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpassword123')
+
+    def _login(self, password):
+        return self.client.post(LOGIN_URL, {
+            'username': 'test@example.com', 'password': password})
+
+    def test_metrics_endpoint(self):
+        """Test /metrics returns text exposition"""
+        self.client.get(LOGIN_URL)
+
+        res = self.client.get('/metrics')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res['Content-Type'].startswith('text/plain'))
+        self.assertIn('http_request_duration_seconds_count'
+                      '{view="user:login",method="GET"}',
+                      res.content.decode())
+
+    async def test_async_chain(self):
+        """Test requests of async chain are tracked"""
+        async def get_response(request):
+            return HttpResponse()
+        self.assertTrue(asyncio.iscoroutinefunction(
+            MetricsMiddleware(get_response)))
+        view = ('user:login', 'GET')
+        before = metrics.REQUEST_DURATION.values.get(view, [0])[-1]
+
+        await self.async_client.get(LOGIN_URL)
+        res = await self.async_client.get('/metrics')
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(metrics.REQUEST_DURATION.values[view][-1],
+                         before + 1)
+
+    @override_settings(METRICS={'ENABLED': True,
+                                'ALLOWED_IPS': ['10.0.0.0/8'],
+                                'TOKEN': 'secret'})
+    def test_endpoint_restricted(self):
+        """Test /metrics is served only to allowed IPs and token"""
+        res = self.client.get('/metrics')
+        self.assertEqual(res.status_code, 403)
+
+        res = self.client.get('/metrics', REMOTE_ADDR='10.1.2.3')
+        self.assertEqual(res.status_code, 200)
+
+        res = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer secret')
+        self.assertEqual(res.status_code, 200)
+
+        res = self.client.get('/metrics', HTTP_AUTHORIZATION='Bearer wrong')
+        self.assertEqual(res.status_code, 403)
+
+    @override_settings(ALLOWED_HOSTS=['example.com'])
+    def test_endpoint_checks_host(self):
+        """Test /metrics is not served for unknown hosts"""
+        res = self.client.get('/metrics', SERVER_NAME='evil.example.org')
+
+        self.assertEqual(res.status_code, 400)
+
+    @override_settings(METRICS={'ENABLED': False})
+    def test_disabled(self):
+        """Test /metrics is not served when metrics are off"""
+        res = self.client.get('/metrics')
+
+        self.assertEqual(res.status_code, 404)
+
+    def test_login_and_activation_counters(self):
+        """Test logins, activations and hashing are counted"""
+        successes = metrics.LOGINS.values.get(('success',), 0)
+        failures = metrics.LOGINS.values.get(('failure',), 0)
+        activations = metrics.ACTIVATIONS.values.get((), 0)
+        checks = metrics.PASSWORD_HASH_DURATION.values.get(
+            ('check',), [0])[-1]
+
+        self.client.get(reverse('user:activation_link', args=[
+            self.user.activation_tokens.get().token]))
+        self._login('wrongpass123')
+        self._login('testpassword123')
+
+        self.assertEqual(metrics.LOGINS.values[('success',)], successes + 1)
+        self.assertEqual(metrics.LOGINS.values[('failure',)], failures + 1)
+        self.assertEqual(metrics.ACTIVATIONS.values[()], activations + 1)
+        self.assertEqual(
+            metrics.PASSWORD_HASH_DURATION.values[('check',)][-1],
+            checks + 2)
+
+    def test_request_queries_counted(self):
+        """Test database queries are counted per URL name"""
+        view = ('user:activation_link',)
+        before = metrics.REQUEST_QUERIES.values.get(view, 0)
+
+        self.client.get(reverse('user:activation_link', args=[
+            self.user.activation_tokens.get().token]))
+
+        self.assertGreater(metrics.REQUEST_QUERIES.values[view], before)
+        self.assertIn(('default',), metrics.DB_QUERY_DURATION.values)
@@ -0,0 +1,79 @@
+"""
+Test rendered pages cache
+"""
+import re
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+LOGIN_URL = reverse('user:login')
+REGISTRATION_URL = reverse('user:registration')
+CSRF_INPUT = re.compile(r'name="csrfmiddlewaretoken" value="([^"]+)"')
+
+
+@override_settings(PAGE_CACHE_TIMEOUT=60, PAGE_CACHE_VERSION='1')
+class PageCacheTests(TestCase):
+    """Tests for render_cached"""
+
+    def setUp(self):
+        cache.clear()
+
+    def test_page_rendered_once(self):
+        """Test second request is served from cache"""
+        res1 = self.client.get(LOGIN_URL)
+        res2 = self.client.get(LOGIN_URL)
+
+        self.assertTemplateUsed(res1, 'user/login.html')
+        self.assertTemplateNotUsed(res2, 'user/login.html')
+        self.assertEqual(res2.status_code, 200)
+        self.assertContains(res2, 'name="username"')
+
+    def test_cached_page_has_valid_csrf_token(self):
+        """Test CSRF token of cached page is accepted on POST"""
+        get_user_model().objects.create_user(
+            email='test@example.com', password='testpassword123',
+            is_active=True)
+        self.client.get(LOGIN_URL)
+        client = Client(enforce_csrf_checks=True)
+
+        res = client.get(LOGIN_URL)
+        token = CSRF_INPUT.search(res.content.decode()).group(1)
+        res = client.post(LOGIN_URL, {
+            'username': 'test@example.com',
+            'password': 'testpassword123',
+            'csrfmiddlewaretoken': token,
+        })
+
+        self.assertEqual(res.status_code, 302)
+
+    def test_version_change_invalidates_cache(self):
+        """Test pages are rendered again after version change"""
+        self.client.get(LOGIN_URL)
+
+        with self.settings(PAGE_CACHE_VERSION='2'):
+            res = self.client.get(LOGIN_URL)
+
+        self.assertTemplateUsed(res, 'user/login.html')
+
+    def test_authenticated_user_not_cached(self):
+        """Test pages for authenticated users are always rendered"""
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpassword123',
+            is_active=True)
+        self.client.get(REGISTRATION_URL)
+        self.client.force_login(user)
+
+        res = self.client.get(REGISTRATION_URL)
+
+        self.assertTemplateUsed(res, 'user/registration.html')
+        self.assertContains(res, 'test@example.com')
+
+    @override_settings(PAGE_CACHE_TIMEOUT=0)
+    def test_disabled_cache(self):
+        """Test pages are rendered every time when cache is disabled"""
+        self.client.get(LOGIN_URL)
+        res = self.client.get(LOGIN_URL)
+
+        self.assertTemplateUsed(res, 'user/login.html')
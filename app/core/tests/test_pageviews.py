@@ -0,0 +1,177 @@
+"""
+Test buffered article view counters
+"""
+from django.contrib.auth import get_user_model
+from django.db import DatabaseError, connection
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core import pageviews
+from core.hyperloglog import HyperLogLog
+from core.models import Article, VisitorSketch
+from core.testing import PerformanceBudget
+from core.tests.test_feed import create_article
+
+PAGEVIEWS = {'FLUSH_INTERVAL': 3600, 'MAX_PENDING': 100000,
+             'BATCH_SIZE': 2, 'HLL_PRECISION': 11}
+
+
+@override_settings(PAGEVIEWS=PAGEVIEWS)
+class PageViewsTests(TestCase):
+    """Tests for view buffer, flushing and unique visitors"""
+
+    def setUp(self):
+        pageviews.BUFFER.reset()
+        self.addCleanup(pageviews.BUFFER.reset)
+        self.user = get_user_model().objects.create_user(
+            email='reader@example.com', password='testpassword123')
+        self.article = create_article(self.user, slug='news')
+        self.today = timezone.localdate()
+
+    def _add(self, article, kind, count, prefix='visitor'):
+        for i in range(count):
+            pageviews.BUFFER.add(article.pk, kind, f'{prefix}-{i}',
+                                 self.today)
+
+    def test_views_buffered_until_flush(self):
+        """Test views reach the database only on flush"""
+        with PerformanceBudget(queries=0):
+            self._add(self.article, VisitorSketch.ANONYMOUS, 3)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_anonymous, 0)
+
+        pageviews.BUFFER.flush()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_anonymous, 3)
+        self.assertEqual(self.article.engagement, 3)
+        self.assertEqual(pageviews.BUFFER.pending, 0)
+
+    def test_flush_queries_do_not_grow_with_views(self):
+        """Test throughput: many views of few articles are recorded
+         without queries and flushed with a handful of them"""
+        articles = [self.article] + [
+            create_article(self.user, title=f'Article {i}',
+                           slug=f'article-{i}') for i in range(3)]
+
+        with PerformanceBudget(queries=0, seconds=2):
+            for article in articles:
+                self._add(article, VisitorSketch.ANONYMOUS, 2500)
+                self._add(article, VisitorSketch.AUTHENTICATED, 500)
+        # Two UPDATE batches, article check, sketch insert, select,
+        # update, and savepoints of the counts and sketch transactions
+        with PerformanceBudget(queries=10):
+            pageviews.BUFFER.flush()
+
+        self.assertEqual(
+            list(Article.objects.values_list(
+                'views_anonymous', 'views_authenticated')),
+            [(2500, 500)] * 4)
+
+    def test_logged_in_and_anonymous_counted_apart(self):
+        """Test article view counts readers by kind"""
+        url = self.article.get_absolute_url()
+        self.client.get(url)
+        self.client.get(url)
+        self.user.is_active = True
+        self.user.save()
+        self.client.force_login(self.user)
+        self.client.get(url)
+
+        pageviews.BUFFER.flush()
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_anonymous, 2)
+        self.assertEqual(self.article.views_authenticated, 1)
+        self.assertEqual(pageviews.unique_visitors(
+            self.article.pk, self.today,
+            kind=VisitorSketch.AUTHENTICATED), 1)
+
+    def test_unique_visitors_merged_across_flushes(self):
+        """Test sketches of several flushes merge without double
+         counting returning visitors"""
+        self._add(self.article, VisitorSketch.ANONYMOUS, 3000)
+        pageviews.BUFFER.flush()
+        self._add(self.article, VisitorSketch.ANONYMOUS, 5000)
+        self._add(self.article, VisitorSketch.AUTHENTICATED, 1000, 'user')
+        pageviews.BUFFER.flush()
+
+        self.assertEqual(VisitorSketch.objects.count(), 2)
+        self.assertAlmostEqual(
+            pageviews.unique_visitors(self.article.pk, self.today) / 6000,
+            1, delta=0.07)
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_anonymous, 8000)
+
+    def test_precision_lowered(self):
+        """Test stored sketches are downsampled to a lower precision"""
+        with self.settings(PAGEVIEWS={**PAGEVIEWS, 'HLL_PRECISION': 12}):
+            self._add(self.article, VisitorSketch.ANONYMOUS, 3000)
+            pageviews.BUFFER.flush()
+
+        self._add(self.article, VisitorSketch.ANONYMOUS, 5000)
+        pageviews.BUFFER.flush()
+
+        sketch = VisitorSketch.objects.get().sketch
+        self.assertEqual(HyperLogLog.from_bytes(sketch).precision, 11)
+        self.assertAlmostEqual(
+            pageviews.unique_visitors(self.article.pk, self.today) / 5000,
+            1, delta=0.07)
+
+    def test_max_pending_flushes(self):
+        """Test buffer flushes itself after MAX_PENDING views"""
+        url = self.article.get_absolute_url()
+        with self.settings(PAGEVIEWS={**PAGEVIEWS, 'MAX_PENDING': 2}):
+            self.client.get(url)
+            self.client.get(url)
+
+        self.article.refresh_from_db()
+        self.assertEqual(self.article.views_anonymous, 2)
+
+    def test_failed_flush_not_counted_twice(self):
+        """Test flush failing after the first batch writes nothing, and
+         the retry writes every view once"""
+        other = create_article(self.user, slug='other')
+        self._add(self.article, VisitorSketch.ANONYMOUS, 1)
+        self._add(other, VisitorSketch.ANONYMOUS, 1)
+        updates = []
+
+        def fail_second_update(execute, sql, params, many, context):
+            if sql.startswith('UPDATE "core_article"'):
+                updates.append(sql)
+                if len(updates) == 2:
+                    raise DatabaseError('connection lost')
+            return execute(sql, params, many, context)
+
+        with self.settings(PAGEVIEWS={**PAGEVIEWS, 'BATCH_SIZE': 1}), \
+                connection.execute_wrapper(fail_second_update), \
+                self.assertRaises(DatabaseError):
+            pageviews.BUFFER.flush()
+        self.assertEqual(
+            list(Article.objects.values_list('views_anonymous', flat=True)),
+            [0, 0])
+
+        pageviews.BUFFER.flush()
+
+        self.assertEqual(
+            list(Article.objects.values_list('views_anonymous', flat=True)),
+            [1, 1])
+
+    def test_deleted_article_ignored(self):
+        """Test views of deleted articles are dropped on flush"""
+        other = create_article(self.user, slug='other')
+        self._add(other, VisitorSketch.ANONYMOUS, 1)
+        other.delete()
+
+        pageviews.BUFFER.flush()
+
+        self.assertFalse(VisitorSketch.objects.exists())
+
+    def test_article_redirects_to_canonical_slug(self):
+        """Test article URL with outdated slug redirects"""
+        res = self.client.get(f'/articles/{self.article.pk}/old/')
+
+        self.assertRedirects(res, self.article.get_absolute_url(),
+                             status_code=301,
+                             fetch_redirect_response=False)
+        self.assertEqual(pageviews.BUFFER.pending, 0)
@@ -0,0 +1,115 @@
+"""
+Test request profiling
+"""
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.contrib.auth import get_user_model
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core.middleware import ProfilingMiddleware
+
+LOGIN_URL = reverse('user:login')
+
+
+def profiling_settings(directory, **kwargs):
+    return override_settings(PROFILING={
+        'ENABLED': True,
+        'SAMPLE_RATE': 1,
+        'MODE': 'cprofile',
+        'SAMPLER_INTERVAL': 0.001,
+        'DIR': directory,
+        **kwargs,
+    })
+
+
+class ProfilingMiddlewareTests(TestCase):
+    """Tests for ProfilingMiddleware and profile_report command"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.dir = Path(tmp.name)
+        get_user_model().objects.create_user(
+            email='test@example.com', password='testpassword123',
+            is_active=True)
+
+    def _login(self):
+        return self.client.post(LOGIN_URL, {
+            'username': 'test@example.com',
+            'password': 'testpassword123'})
+
+    def test_disabled_by_default(self):
+        """Test middleware is not used when profiling is off"""
+        with self.assertRaises(MiddlewareNotUsed):
+            ProfilingMiddleware(lambda request: None)
+
+    def test_cprofile_dump_and_summary(self):
+        """Test request is profiled with request summary"""
+        with profiling_settings(self.dir):
+            res = self._login()
+
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(len(list(self.dir.glob('*.prof'))), 1)
+        summary = json.loads(next(self.dir.glob('*.json')).read_text())
+        self.assertEqual(summary['view'], 'user:login')
+        self.assertEqual(summary['status'], 302)
+        self.assertGreater(summary['sql_count'], 0)
+        self.assertGreater(summary['hash_time'], 0)
+
+    def test_template_time(self):
+        """Test template rendering time is recorded"""
+        with profiling_settings(self.dir):
+            self.client.get(LOGIN_URL)
+
+        summary = json.loads(next(self.dir.glob('*.json')).read_text())
+        self.assertGreater(summary['template_time'], 0)
+        self.assertEqual(summary['hash_time'], 0)
+
+    def test_sampler_writes_folded_stacks(self):
+        """Test sampler mode writes collapsed stacks"""
+        with profiling_settings(self.dir, MODE='sampler'):
+            self._login()
+
+        folded = list(self.dir.glob('*.folded'))
+        self.assertEqual(len(folded), 1)
+        self.assertFalse(list(self.dir.glob('*.prof')))
+
+    async def test_async_chain_uses_sampler(self):
+        """Test requests of async chain are profiled with sampler"""
+        with profiling_settings(self.dir):
+            res = await self.async_client.get(LOGIN_URL)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(len(list(self.dir.glob('*.folded'))), 1)
+        self.assertFalse(list(self.dir.glob('*.prof')))
+        summary = json.loads(next(self.dir.glob('*.json')).read_text())
+        self.assertEqual(summary['view'], 'user:login')
+        self.assertGreater(summary['template_time'], 0)
+
+    def test_sample_rate(self):
+        """Test requests outside of sample are not profiled"""
+        with profiling_settings(self.dir, SAMPLE_RATE=0):
+            self.client.get(LOGIN_URL)
+
+        self.assertFalse(list(self.dir.iterdir()))
+
+    def test_report(self):
+        """Test report aggregates profiles per view"""
+        with profiling_settings(self.dir):
+            self._login()
+            self.client.get(LOGIN_URL)
+        out = StringIO()
+
+        call_command('profile_report', f'--dir={self.dir}',
+                     '--view=user:login', '--limit=5', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('user:login', output)
+        self.assertIn('Top functions of 2 cProfile dumps', output)
+        self.assertIn('Aggregated 2 profiled requests', output)
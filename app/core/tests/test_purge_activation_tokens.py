@@ -0,0 +1,30 @@
+"""
+Test purge_activation_tokens command
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from user.models import ActivationToken
+
+
+class PurgeActivationTokensCommandTest(TestCase):
+    """Test purge_activation_tokens command"""
+
+    def test_purge_expired_tokens(self):
+        """Test command deletes expired tokens only"""
+        user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='goodpassword123'
+        )
+        user.activation_tokens.update(
+            expires_at=timezone.now() - timedelta(days=1))
+        fresh = ActivationToken.objects.issue(user)
+
+        call_command('purge_activation_tokens', stdout=StringIO())
+
+        self.assertEqual(list(ActivationToken.objects.all()), [fresh])
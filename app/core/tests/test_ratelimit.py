@@ -0,0 +1,122 @@
+"""
+Test rate limiting
+"""
+import warnings
+from unittest.mock import patch
+
+from django.contrib.auth import hashers
+from django.core.cache import CacheKeyWarning, caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from core import ratelimit
+
+LOGIN_URL = reverse('user:login')
+REGISTRATION_URL = reverse('user:registration')
+
+RULES = {
+    'user:login': {'ip': (3, 60), 'email': (2, 60)},
+    'user:registration': {'ip': (1, 60)},
+}
+
+
+@override_settings(RATELIMIT_RULES=RULES)
+class RateLimitMiddlewareTests(TestCase):
+    """Tests for RateLimitMiddleware"""
+
+    def setUp(self):
+        caches['ratelimit'].clear()
+        ratelimit.reset_blocked_stats()
+
+    def _login(self, email, ip='10.0.0.1'):
+        return self.client.post(
+            LOGIN_URL, {'username': email, 'password': 'wrongpass123'},
+            REMOTE_ADDR=ip)
+
+    def test_email_limit(self):
+        """Test login attempts for one email are limited"""
+        self._login('test@example.com', ip='10.0.0.1')
+        self._login('Test@example.com', ip='10.0.0.2')
+
+        res = self._login('test@example.com', ip='10.0.0.3')
+
+        self.assertEqual(res.status_code, 429)
+        self.assertIn('Retry-After', res)
+        self.assertEqual(ratelimit.blocked_stats(),
+                         {'user:login:email': 1})
+
+    def test_crafted_email_key(self):
+        """Test emails unusable in memcached keys are limited too"""
+        email = 'a b\x01' + 'x' * 300
+        with warnings.catch_warnings():
+            warnings.simplefilter('error', CacheKeyWarning)
+            self._login(email, ip='10.0.0.1')
+            self._login(email, ip='10.0.0.2')
+
+            res = self._login(email, ip='10.0.0.3')
+
+        self.assertEqual(res.status_code, 429)
+
+    def test_ip_limit(self):
+        """Test login attempts from one IP are limited"""
+        for i in range(3):
+            self.assertEqual(self._login(f'user{i}@example.com').status_code,
+                             200)
+
+        res = self._login('user4@example.com')
+
+        self.assertEqual(res.status_code, 429)
+        self.assertEqual(ratelimit.blocked_stats(), {'user:login:ip': 1})
+
+    def test_blocked_request_does_not_hash_password(self):
+        """Test requests over limit are rejected before hashing"""
+        self._login('test@example.com')
+        self._login('test@example.com')
+
+        with patch('django.contrib.auth.hashers.make_password',
+                   wraps=hashers.make_password) as patched_make, \
+                patch('django.contrib.auth.hashers.check_password',
+                      wraps=hashers.check_password) as patched_check:
+            res = self._login('test@example.com')
+
+        self.assertEqual(res.status_code, 429)
+        patched_make.assert_not_called()
+        patched_check.assert_not_called()
+
+    def test_registration_limit(self):
+        """Test registrations from one IP are limited"""
+        self.client.post(REGISTRATION_URL, REMOTE_ADDR='10.0.0.1')
+
+        res1 = self.client.post(REGISTRATION_URL, REMOTE_ADDR='10.0.0.1')
+        res2 = self.client.post(REGISTRATION_URL, REMOTE_ADDR='10.0.0.2')
+
+        self.assertEqual(res1.status_code, 429)
+        self.assertEqual(res2.status_code, 200)
+
+    def test_get_requests_not_limited(self):
+        """Test GET requests are not counted"""
+        for _ in range(5):
+            res = self.client.get(LOGIN_URL)
+
+        self.assertEqual(res.status_code, 200)
+
+
+class SlidingWindowTests(TestCase):
+    """Tests for hit()"""
+
+    def setUp(self):
+        caches['ratelimit'].clear()
+
+    @patch('core.ratelimit.time.time')
+    def test_previous_window_weighted(self, patched_time):
+        """Test requests of previous window count proportionally"""
+        patched_time.return_value = 1000.0
+        for _ in range(4):
+            self.assertIsNone(ratelimit.hit('key', 4, 100))
+        self.assertIsNotNone(ratelimit.hit('key', 4, 100))
+
+        # Half of the next window: previous window counts as 2
+        patched_time.return_value = 1150.0
+        self.assertIsNone(ratelimit.hit('key', 4, 100))
+        self.assertIsNone(ratelimit.hit('key', 4, 100))
+        self.assertEqual(ratelimit.hit('key', 4, 100), 51)
@@ -0,0 +1,101 @@
+"""
+Test article search
+"""
+from unittest import skipUnless
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.urls import reverse
+
+from core.models import Article
+from core.search import cached_search, highlight, search_articles
+from core.testing import PerformanceBudget
+from core.tests.test_feed import create_article
+
+SEARCH_URL = reverse('core:search')
+
+
+class SearchTests(TestCase):
+    """Tests for article search"""
+
+    def setUp(self):
+        cache.clear()
+        self.author = get_user_model().objects.create_user(
+            email='author@example.com', password='testpassword123',
+            name='Author')
+
+    def test_all_words_must_match(self):
+        """Test only articles containing every word are found"""
+        both = create_article(self.author, title='Budget vote',
+                              body='Parliament passed the budget')
+        create_article(self.author, title='Budget', slug='budget',
+                       body='Nothing else')
+
+        articles = search_articles('budget parliament', use_postgres=False)
+
+        self.assertEqual(articles, [both])
+
+    def test_title_matches_ranked_first(self):
+        """Test articles with words in title are ranked higher"""
+        in_body = create_article(self.author, title='News', slug='news',
+                                 body='Election results')
+        in_title = create_article(self.author, title='Election results',
+                                  slug='election', body='Details')
+
+        articles = search_articles('election', use_postgres=False)
+
+        self.assertEqual(articles, [in_title, in_body])
+
+    def test_drafts_not_found(self):
+        """Test drafts are not searched"""
+        create_article(self.author, title='Secret', status=Article.DRAFT)
+
+        self.assertEqual(search_articles('secret', use_postgres=False), [])
+
+    def test_empty_query(self):
+        """Test empty query returns nothing without queries"""
+        create_article(self.author)
+
+        with PerformanceBudget(queries=0):
+            self.assertEqual(search_articles('   '), [])
+
+    def test_snippet_escaped_and_highlighted(self):
+        """Test snippet HTML is escaped and matches are marked"""
+        create_article(self.author, body='<script>alert(1)</script> storm')
+
+        results = cached_search('storm')
+
+        self.assertEqual(len(results), 1)
+        self.assertNotIn('<script>', results[0]['snippet'])
+        self.assertIn('<mark>storm</mark>', results[0]['snippet'])
+        self.assertEqual(highlight('a < b'), 'a &lt; b')
+
+    def test_results_cached(self):
+        """Test repeated query is served from cache"""
+        create_article(self.author, title='Flood warning')
+        first = cached_search('Flood')
+
+        with PerformanceBudget(queries=0):
+            second = cached_search('  flood ')
+
+        self.assertEqual(first, second)
+
+    def test_search_view(self):
+        """Test search page lists found articles"""
+        create_article(self.author, title='Heatwave', body='Hot summer')
+
+        res = self.client.get(SEARCH_URL, {'q': 'summer'})
+
+        self.assertEqual(res.status_code, 200)
+        self.assertContains(res, 'Heatwave')
+        self.assertContains(res, '<mark>summer</mark>', html=False)
+
+    @skipUnless(connection.vendor == 'postgresql', 'PostgreSQL only')
+    def test_full_text_search(self):
+        """Test search_vector is maintained and stemmed words match"""
+        article = create_article(self.author, title='Running marathons')
+
+        self.assertEqual(search_articles('marathon run'), [article])
+        self.assertEqual(search_articles('marathon -running'), [])
@@ -0,0 +1,87 @@
+"""
+Test send_outbox command
+"""
+import smtplib
+from datetime import timedelta
+from io import StringIO
+from unittest.mock import patch
+
+from django.core import mail
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+from core.models import OutboxEmail
+
+
+@override_settings(OUTBOX_MAX_ATTEMPTS=2, OUTBOX_RETRY_DELAY=60)
+class SendOutboxCommandTest(TestCase):
+    """Test send_outbox command"""
+
+    def _create_emails(self, count):
+        return OutboxEmail.objects.bulk_create([
+            OutboxEmail(to_email=f'user{i}@example.com',
+                        subject='Subject', body='Body')
+            for i in range(count)
+        ])
+
+    def _call(self, **kwargs):
+        out = StringIO()
+        call_command('send_outbox', once=True, stdout=out, **kwargs)
+        return out.getvalue()
+
+    def test_sends_pending_emails_in_batches(self):
+        """Test all due emails are sent and marked as sent"""
+        self._create_emails(5)
+
+        out = self._call(batch_size=2)
+
+        self.assertEqual(len(mail.outbox), 5)
+        self.assertEqual(
+            OutboxEmail.objects.filter(status=OutboxEmail.SENT).count(), 5)
+        self.assertIn('Sent 5, failed 0', out)
+
+    def test_skips_not_due_emails(self):
+        """Test emails scheduled for later are not sent"""
+        self._create_emails(1)
+        OutboxEmail.objects.update(
+            next_attempt_at=timezone.now() + timedelta(minutes=1))
+
+        self._call()
+
+        self.assertEqual(len(mail.outbox), 0)
+
+    @patch('django.core.mail.EmailMessage.send',
+           side_effect=smtplib.SMTPServerDisconnected)
+    def test_failed_email_retried_with_backoff(self, patched_send):
+        """Test failed email is rescheduled and finally marked failed"""
+        self._create_emails(1)
+
+        self._call()
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.status, OutboxEmail.PENDING)
+        self.assertEqual(email.attempts, 1)
+        self.assertGreater(email.next_attempt_at,
+                           timezone.now() + timedelta(seconds=50))
+
+        OutboxEmail.objects.update(next_attempt_at=timezone.now())
+        self._call()
+        email.refresh_from_db()
+        self.assertEqual(email.status, OutboxEmail.FAILED)
+        self.assertIn('SMTPServerDisconnected', email.last_error)
+
+    @patch('django.core.mail.backends.locmem.EmailBackend.open',
+           side_effect=ConnectionRefusedError)
+    def test_connection_error_fails_batch(self, patched_open):
+        """Test batch is rescheduled when connection can not be opened"""
+        self._create_emails(3)
+
+        out = self._call(batch_size=2)
+
+        self.assertEqual(len(mail.outbox), 0)
+        self.assertIn('Sent 0, failed 3', out)
+        for email in OutboxEmail.objects.all():
+            self.assertEqual(email.status, OutboxEmail.PENDING)
+            self.assertEqual(email.attempts, 1)
+            self.assertIn('ConnectionRefusedError', email.last_error)
+            self.assertGreater(email.next_attempt_at, timezone.now())
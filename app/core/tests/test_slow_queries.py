@@ -0,0 +1,128 @@
+"""
+Test slow query log
+"""
+import asyncio
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from core import slow_queries
+from core.middleware import SlowQueryLogMiddleware
+
+
+class NormalizeSqlTests(SimpleTestCase):
+    """Tests for normalize_sql()"""
+
+    def test_literals_and_lists_collapsed(self):
+        """Test queries differing in values get one fingerprint"""
+        first = slow_queries.normalize_sql(
+            "SELECT * FROM t WHERE a = 'x' AND b IN (%s, %s, %s)\n LIMIT 21")
+        second = slow_queries.normalize_sql(
+            "SELECT * FROM t WHERE a = 'it''s'  AND b IN (%s) LIMIT 1")
+
+        self.assertEqual(
+            first, 'SELECT * FROM t WHERE a = %s AND b IN (...) LIMIT %s')
+        self.assertEqual(first, second)
+        self.assertEqual(slow_queries.fingerprint(first),
+                         slow_queries.fingerprint(second))
+
+    def test_explain_only_select_on_postgresql(self):
+        """Test EXPLAIN is not attempted for other statements"""
+        connection = MagicMock(vendor='postgresql', needs_rollback=False)
+
+        plan = slow_queries.explain(connection, 'DELETE FROM t', [])
+
+        self.assertIsNone(plan)
+        connection.cursor.assert_not_called()
+
+    @patch('core.slow_queries.transaction.atomic')
+    def test_explain(self, patched_atomic):
+        """Test EXPLAIN plan is returned for SELECT"""
+        connection = MagicMock(vendor='postgresql', needs_rollback=False)
+        cursor = connection.cursor.return_value.__enter__.return_value
+        cursor.fetchone.return_value = [[{'Plan': {}}]]
+
+        plan = slow_queries.explain(connection, 'SELECT 1', [])
+
+        self.assertEqual(plan, [{'Plan': {}}])
+        cursor.execute.assert_called_once_with(
+            'EXPLAIN (FORMAT JSON) SELECT 1', [])
+
+
+class SlowQueryLogTests(TestCase):
+    """Tests for SlowQueryLogMiddleware and slow_query_report"""
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.path = Path(tmp.name) / 'slow.jsonl'
+        user = get_user_model().objects.create_user(
+            email='test@example.com', password='testpassword123')
+        self.url = reverse('user:activation_link', args=[
+            user.activation_tokens.get().token])
+
+    def settings(self, **kwargs):
+        return override_settings(SLOW_QUERY_LOG={
+            'ENABLED': True, 'THRESHOLD_MS': 0,
+            'EXPLAIN_SAMPLE_RATE': 1, 'PATH': self.path, **kwargs})
+
+    def entries(self):
+        return [json.loads(line)
+                for line in self.path.read_text().splitlines()]
+
+    def test_queries_logged_with_view(self):
+        """Test queries over threshold are logged with URL name"""
+        with self.settings(), self.assertLogs('core.slow_queries'):
+            self.client.get(self.url)
+
+        entries = self.entries()
+        self.assertTrue(entries)
+        self.assertEqual({entry['view'] for entry in entries},
+                         {'user:activation_link'})
+        self.assertEqual(entries[0]['path'], self.url)
+        self.assertNotIn('test@example.com', self.path.read_text())
+
+    async def test_async_chain(self):
+        """Test queries of async chain requests are logged with URL name"""
+        with self.settings():
+            async def get_response(request):
+                return HttpResponse()
+            self.assertTrue(asyncio.iscoroutinefunction(
+                SlowQueryLogMiddleware(get_response)))
+            # Test connection was opened before the middleware existed
+            await sync_to_async(slow_queries.install)()
+            with self.assertLogs('core.slow_queries'):
+                await self.async_client.get(self.url)
+
+        self.assertEqual({entry['view'] for entry in self.entries()},
+                         {'user:activation_link'})
+
+    def test_fast_queries_not_logged(self):
+        """Test queries under threshold are not logged"""
+        with self.settings(THRESHOLD_MS=10000):
+            self.client.get(self.url)
+
+        self.assertFalse(self.path.exists())
+
+    def test_report(self):
+        """Test report groups queries by fingerprint"""
+        with self.settings(), self.assertLogs('core.slow_queries'):
+            self.client.get(self.url)
+            self.client.get(self.url)
+        out = StringIO()
+
+        call_command('slow_query_report', f'--path={self.path}',
+                     '--limit=3', '--hours=1', stdout=out)
+
+        output = out.getvalue()
+        self.assertIn('views: user:activation_link', output)
+        self.assertIn(f'{len(self.entries())} slow queries', output)
@@ -0,0 +1,176 @@
+"""
+Test feeds and sitemaps
+"""
+import os
+import tempfile
+import time
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.http import http_date
+
+from core.models import Article
+from core.testing import PerformanceBudget
+from core.tests.test_feed import create_article
+
+
+def content(response):
+    return b''.join(response.streaming_content).decode()
+
+
+class SyndicationTestCase(TestCase):
+
+    def setUp(self):
+        tmp = tempfile.TemporaryDirectory()
+        self.addCleanup(tmp.cleanup)
+        self.settings_override = override_settings(
+            SITE_URL='https://news.example.com',
+            SYNDICATION={'FEED_ITEMS': 3, 'CHUNK_SIZE': 2,
+                         'SITEMAP_SHARD_SIZE': 2, 'SITEMAP_DIR': tmp.name,
+                         'SITEMAP_MAX_AGE': 3600})
+        self.settings_override.enable()
+        self.addCleanup(self.settings_override.disable)
+        self.sitemap_dir = tmp.name
+        self.author = get_user_model().objects.create_user(
+            email='author@example.com', password='testpassword123',
+            name='Author')
+        now = timezone.now() - timedelta(hours=1)
+        self.articles = [
+            create_article(self.author, title=f'Article {i}',
+                           slug=f'article-{i}',
+                           published_at=now - timedelta(minutes=i))
+            for i in range(5)
+        ]
+
+
+class FeedTests(SyndicationTestCase):
+    """Tests for RSS and Atom feeds"""
+
+    def test_rss(self):
+        """Test RSS lists newest FEED_ITEMS articles"""
+        res = self.client.get(reverse('core:rss'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTrue(res.streaming)
+        self.assertTrue(res['Content-Type'].startswith('application/rss+xml'))
+        text = content(res)
+        self.assertIn('<rss', text)
+        self.assertEqual(text.count('<item>'), 3)
+        self.assertIn('https://news.example.com'
+                      + self.articles[0].get_absolute_url(), text)
+        self.assertNotIn('Article 3', text)
+        self.assertTrue(text.rstrip().endswith('</rss>'))
+
+    def test_atom(self):
+        """Test Atom feed has entries"""
+        res = self.client.get(reverse('core:atom'))
+
+        text = content(res)
+        self.assertIn('xmlns="http://www.w3.org/2005/Atom"', text)
+        self.assertEqual(text.count('<entry>'), 3)
+        self.assertIn('<name>Author</name>', text)
+
+    def test_not_modified(self):
+        """Test feed is not sent again without new articles"""
+        res = self.client.get(reverse('core:rss'))
+
+        res = self.client.get(reverse('core:rss'),
+                              HTTP_IF_MODIFIED_SINCE=res['Last-Modified'])
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_changed_feed_sent_again(self):
+        """Test edited or unpublished article makes feed modified"""
+        Article.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        last_modified = self.client.get(reverse('core:rss'))['Last-Modified']
+        edited, unpublished = self.articles[:2]
+
+        edited.title = 'Edited'
+        edited.save()
+        res = self.client.get(reverse('core:rss'),
+                              HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, 200)
+        self.assertIn('Edited', content(res))
+
+        Article.objects.update(updated_at=timezone.now() - timedelta(hours=1))
+        last_modified = self.client.get(reverse('core:rss'))['Last-Modified']
+        unpublished.status = Article.ARCHIVED
+        unpublished.save()
+        res = self.client.get(reverse('core:rss'),
+                              HTTP_IF_MODIFIED_SINCE=last_modified)
+        self.assertEqual(res.status_code, 200)
+        self.assertNotIn(unpublished.title, content(res))
+
+
+class SitemapTests(SyndicationTestCase):
+    """Tests for sharded and cached sitemaps"""
+
+    def test_index_lists_shards(self):
+        """Test index lists shards of SHARD_SIZE ids"""
+        res = self.client.get(reverse('core:sitemap'))
+
+        text = content(res)
+        for shard in (1, 2, 3):
+            self.assertIn(f'https://news.example.com/sitemap-{shard}.xml',
+                          text)
+        self.assertNotIn('sitemap-4.xml', text)
+
+    def test_shard_lists_published_articles(self):
+        """Test shard lists only its published articles"""
+        first, second = self.articles[:2]
+        second.status = Article.DRAFT
+        second.save()
+
+        res = self.client.get(reverse('core:sitemap_shard', args=[1]))
+
+        text = content(res)
+        self.assertEqual(text.count('<url>'), 1)
+        self.assertIn(first.get_absolute_url(), text)
+
+    def test_shard_cached_on_disk(self):
+        """Test generated shard is written to disk and served from it"""
+        url = reverse('core:sitemap_shard', args=[1])
+        generated = content(self.client.get(url))
+        self.assertTrue(os.path.exists(
+            os.path.join(self.sitemap_dir, 'sitemap-1.xml')))
+
+        # Only the change check
+        with PerformanceBudget(queries=1):
+            res = self.client.get(url)
+
+        self.assertEqual(content(res), generated)
+
+    def test_changed_article_regenerates_shard(self):
+        """Test cached shard is replaced after its article changes"""
+        url = reverse('core:sitemap_shard', args=[1])
+        content(self.client.get(url))
+        path = os.path.join(self.sitemap_dir, 'sitemap-1.xml')
+        past = time.time() - 60
+        os.utime(path, (past, past))
+        article = self.articles[0]
+        article.title = 'Changed'
+        article.save()
+
+        content(self.client.get(url))
+
+        self.assertGreater(os.path.getmtime(path), past)
+
+    def test_shard_not_modified(self):
+        """Test conditional GET of cached shard"""
+        url = reverse('core:sitemap_shard', args=[1])
+        res = self.client.get(url)
+        content(res)
+
+        res = self.client.get(url, HTTP_IF_MODIFIED_SINCE=http_date(
+            time.time() + 1))
+
+        self.assertEqual(res.status_code, 304)
+
+    def test_unknown_shard(self):
+        """Test shards without articles are not found"""
+        res = self.client.get(reverse('core:sitemap_shard', args=[10]))
+
+        self.assertEqual(res.status_code, 404)
@@ -0,0 +1,99 @@
+"""
+Test performance assertions
+"""
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import check_password, make_password
+from django.test import TestCase, override_settings
+
+from core.testing import (PerformanceBudget, max_duration, max_hashes,
+                          max_queries)
+from user import hashing
+
+
+class PerformanceBudgetTests(TestCase):
+    """Tests for PerformanceBudget"""
+
+    def test_queries_within_budget(self):
+        """Test no error when query count is within budget"""
+        with max_queries(1) as budget:
+            get_user_model().objects.count()
+
+        self.assertEqual(len(budget.captured), 1)
+
+    def test_too_many_queries(self):
+        """Test error lists executed queries"""
+        with self.assertRaisesRegex(AssertionError,
+                                    '2 queries executed, 1 allowed'):
+            with max_queries(1):
+                get_user_model().objects.count()
+                get_user_model().objects.exists()
+
+    def test_hasher_calls_counted_once(self):
+        """Test check_password is one hasher call even if hasher
+         encodes password to verify it"""
+        encoded = make_password('testpassword123')
+
+        with max_hashes(1) as budget:
+            check_password('testpassword123', encoded)
+
+        self.assertEqual(budget.hash_calls, 1)
+
+    def test_too_many_hasher_calls(self):
+        """Test error when hashers are called too often"""
+        with self.assertRaisesRegex(AssertionError,
+                                    'called 2 times, 1 allowed'):
+            with max_hashes(1):
+                make_password('testpassword123')
+                make_password('testpassword123')
+
+    @patch.dict('os.environ', {'TEST_TIME_BUDGETS': '1'})
+    @patch('core.testing.time.perf_counter')
+    def test_too_slow(self, patched_counter):
+        """Test error when wall time exceeds budget"""
+        patched_counter.side_effect = [0, 2]
+
+        with self.assertRaisesRegex(AssertionError, 'Took 2.000s'):
+            with max_duration(1):
+                pass
+
+    @patch.dict('os.environ', {'TEST_TIME_BUDGETS': '1',
+                               'TEST_TIME_FACTOR': '3'})
+    @patch('core.testing.time.perf_counter')
+    def test_time_factor(self, patched_counter):
+        """Test TEST_TIME_FACTOR relaxes wall time budget"""
+        patched_counter.side_effect = [0, 2]
+
+        with max_duration(1):
+            pass
+
+    @patch.dict('os.environ', {'TEST_TIME_BUDGETS': ''})
+    @patch('core.testing.time.perf_counter')
+    def test_time_not_checked_by_default(self, patched_counter):
+        """Test wall time budget is checked only when enabled"""
+        patched_counter.side_effect = [0, 2]
+
+        with max_duration(1):
+            pass
+
+    @override_settings(PASSWORD_HASHING_POOL={'ENABLED': True,
+                                              'WORKERS': 1})
+    def test_hashing_pool_calls_counted(self):
+        """Test hashing done in pool processes is counted"""
+        encoded = make_password('testpassword123')
+        self.addCleanup(hashing.reset_pool)
+
+        with max_hashes(1) as budget:
+            hashing.check_password('testpassword123', encoded)
+
+        self.assertEqual(budget.hash_calls, 1)
+
+    def test_decorator(self):
+        """Test budget can decorate functions"""
+        @PerformanceBudget(queries=0)
+        def func():
+            get_user_model().objects.count()
+
+        with self.assertRaises(AssertionError):
+            func()
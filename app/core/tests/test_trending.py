@@ -0,0 +1,119 @@
+"""
+Test trending articles
+"""
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from core import trending
+from core.models import Article
+from core.testing import PerformanceBudget
+from core.tests.test_feed import create_article
+
+
+@override_settings(TRENDING={'DECAY_HOURS': 12, 'TOP_N': 2,
+                             'BATCH_SIZE': 2})
+class TrendingTests(TestCase):
+    """Tests for hot scores and update_trending command"""
+
+    def setUp(self):
+        self.author = get_user_model().objects.create_user(
+            email='author@example.com', password='testpassword123',
+            name='Author')
+        self.now = timezone.now() - timedelta(minutes=1)
+
+    def test_hot_score_decay(self):
+        """Test ten times more engagement offsets DECAY_HOURS of age"""
+        new = trending.hot_score(10, self.now, 12)
+        old = trending.hot_score(100, self.now - timedelta(hours=12), 12)
+
+        self.assertAlmostEqual(new, old)
+        self.assertIsNone(trending.hot_score(10, None, 12))
+
+    def test_only_changed_articles_rescored(self):
+        """Test second run rescores only articles with new engagement"""
+        articles = [create_article(self.author, title=f'Article {i}',
+                                   published_at=self.now)
+                    for i in range(5)]
+        self.assertEqual(trending.rescore(), 5)
+        self.assertEqual(trending.rescore(), 0)
+
+        trending.add_engagement(articles[3].pk, 100)
+
+        self.assertEqual(trending.rescore(), 1)
+        self.assertFalse(Article.objects.needs_rescore().exists())
+
+    def test_saved_article_rescored(self):
+        """Test editing article marks it for rescoring"""
+        article = create_article(self.author)
+        trending.rescore()
+
+        article.title = 'New title'
+        article.save()
+
+        self.assertEqual(list(Article.objects.needs_rescore()), [article])
+
+    def test_command_stores_top(self):
+        """Test command stores top articles ordered by score"""
+        old = create_article(self.author, title='Old',
+                             published_at=self.now - timedelta(hours=24))
+        new = create_article(self.author, title='New', published_at=self.now)
+        popular = create_article(self.author, title='Popular',
+                                 published_at=self.now - timedelta(hours=1))
+        create_article(self.author, title='Draft', status=Article.DRAFT)
+        trending.add_engagement(old.pk, 50)
+        trending.add_engagement(popular.pk, 50)
+        out = StringIO()
+
+        call_command('update_trending', stdout=out)
+
+        self.assertIn('4 articles rescored', out.getvalue())
+        with PerformanceBudget(queries=1):
+            top = trending.trending_articles()
+        self.assertEqual([article['id'] for article in top],
+                         [popular.pk, new.pk])
+
+    def test_full_rescore(self):
+        """Test --full rescores every article with the given decay"""
+        article = create_article(self.author)
+        call_command('update_trending', stdout=StringIO())
+
+        call_command('update_trending', '--full', '--decay-hours', '24',
+                     stdout=StringIO())
+
+        article.refresh_from_db()
+        self.assertAlmostEqual(
+            article.hot_score,
+            trending.hot_score(0, article.published_at, 24))
+
+    def test_unpublished_and_deleted_articles_dropped(self):
+        """Test stored top hides articles changed after the last run"""
+        kept = create_article(self.author, title='Kept')
+        unpublished = create_article(self.author, title='Unpublished')
+        deleted = create_article(self.author, title='Deleted')
+        with self.settings(TRENDING={'DECAY_HOURS': 12, 'TOP_N': 3,
+                                     'BATCH_SIZE': 2}):
+            call_command('update_trending', stdout=StringIO())
+
+        unpublished.status = Article.ARCHIVED
+        unpublished.save()
+        deleted.delete()
+
+        top = trending.trending_articles()
+        self.assertEqual([article['id'] for article in top], [kept.pk])
+        self.assertEqual(top[0]['author'], 'Author')
+
+    def test_feed_shows_trending(self):
+        """Test homepage lists trending articles"""
+        create_article(self.author, title='Hot news')
+        call_command('update_trending', stdout=StringIO())
+
+        res = self.client.get(reverse('core:feed'))
+
+        self.assertContains(res, 'Trending')
+        self.assertEqual(res.context['trending'][0]['title'], 'Hot news')
@@ -0,0 +1,106 @@
+"""
+Test warm_templates command
+"""
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.exceptions import ImproperlyConfigured
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from core.template_warmup import template_names, warm_templates_on_startup
+
+
+class WarmTemplatesCommandTest(SimpleTestCase):
+    """Test warm_templates command"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.dir = Path(self.tmp.name)
+        (self.dir / 'base.html').write_text(
+            '{% block content %}{% endblock %}')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def _templates(self):
+        return [{
+            'BACKEND': 'django.template.backends.django.DjangoTemplates',
+            'DIRS': [self.dir],
+        }]
+
+    def _call(self):
+        out = StringIO()
+        with override_settings(TEMPLATES=self._templates()):
+            call_command('warm_templates', stdout=out)
+        return out.getvalue()
+
+    def test_project_templates_are_valid(self):
+        """Test all project templates load without errors"""
+        out = StringIO()
+        call_command('warm_templates', stdout=out)
+
+        self.assertIn('Loaded', out.getvalue())
+
+    def test_valid_templates_loaded(self):
+        """Test command loads every template"""
+        (self.dir / 'page.html').write_text(
+            '{% extends "base.html" %}{% block content %}Hi{% endblock %}')
+
+        self.assertIn('Loaded 2 templates', self._call())
+
+    def test_app_templates_with_cached_loader(self):
+        """Test app templates are found when loaders are configured"""
+        templates = self._templates()
+        templates[0]['OPTIONS'] = {'loaders': [
+            ('django.template.loaders.cached.Loader', [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ]),
+        ]}
+
+        with override_settings(TEMPLATES=templates):
+            names = set(template_names(engines['django']))
+
+        self.assertIn('base.html', names)
+        self.assertIn('admin/base.html', names)
+
+    def test_syntax_error_fails(self):
+        """Test command fails on template syntax error"""
+        (self.dir / 'broken.html').write_text('{% if %}')
+
+        with self.assertRaisesMessage(CommandError, 'broken.html'):
+            self._call()
+
+    def test_text_outside_blocks_fails(self):
+        """Test command fails on text ignored by extending template"""
+        (self.dir / 'page.html').write_text(
+            '{% extends "base.html" %}{% block content %}{% endblock %}}')
+
+        with self.assertRaisesMessage(CommandError, 'outside of blocks'):
+            self._call()
+
+    def test_startup_logs_errors(self):
+        """Test startup warming logs template errors in DEBUG"""
+        (self.dir / 'broken.html').write_text('{% if %}')
+
+        with override_settings(TEMPLATES=self._templates(),
+                               PREWARM_TEMPLATES=True, DEBUG=True), \
+                self.assertLogs('core.template_warmup', 'ERROR') as logs:
+            warm_templates_on_startup()
+
+        self.assertIn('broken.html', logs.output[0])
+
+    def test_startup_fails_without_debug(self):
+        """Test startup warming fails on template errors in production"""
+        (self.dir / 'broken.html').write_text('{% if %}')
+
+        with override_settings(TEMPLATES=self._templates(),
+                               PREWARM_TEMPLATES=True, DEBUG=False), \
+                self.assertLogs('core.template_warmup', 'ERROR'), \
+                self.assertRaisesMessage(ImproperlyConfigured,
+                                         'broken.html'):
+            warm_templates_on_startup()
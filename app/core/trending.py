@@ -0,0 +1,122 @@
+"""
+Trending articles.
+
+Hot score of an article is log10(engagement) plus its publication time
+in units of TRENDING['DECAY_HOURS'], so a newer article needs ten times
+less engagement than one published DECAY_HOURS earlier to rank the
+same. The score does not change as time passes, only when engagement
+or the article changes, so update_trending command rescores just the
+articles changed since they were last scored and stores the top
+articles in the small TrendingArticle table, which the homepage reads
+with one query shared by all processes.
+"""
+import math
+
+from django.conf import settings
+from django.db import models, transaction
+from django.utils import timezone
+
+from .models import Article, TrendingArticle
+
+
+def hot_score(engagement, published_at, decay_hours):
+    """Return hot score or None for never published article"""
+    if published_at is None:
+        return None
+    return (math.log10(max(engagement, 1))
+            + published_at.timestamp() / (decay_hours * 3600))
+
+
+def rescore(batch_size=None, decay_hours=None, full=False):
+    """Recompute hot scores of changed articles, or all of them with
+     `full`, in batches. Return number of rescored articles.
+     Articles are marked with score_changed_at read with the score, so
+     a change made meanwhile leaves the article to the next run"""
+    config = settings.TRENDING
+    batch_size = batch_size or config['BATCH_SIZE']
+    decay_hours = decay_hours or config['DECAY_HOURS']
+    articles = Article.objects.all()
+    if not full:
+        articles = articles.needs_rescore()
+    last_id = 0
+    done = 0
+    while True:
+        batch = [
+            Article(pk=pk, scored_at=changed_at,
+                    hot_score=hot_score(engagement, published_at,
+                                        decay_hours))
+            for pk, engagement, published_at, changed_at in (
+                articles.filter(pk__gt=last_id).order_by('pk')
+                .values_list('pk', 'engagement', 'published_at',
+                             'score_changed_at')[:batch_size])
+        ]
+        if not batch:
+            return done
+        Article.objects.bulk_update(batch, ['hot_score', 'scored_at'])
+        last_id = batch[-1].pk
+        done += len(batch)
+
+
+def top_articles(limit):
+    """Return list of dicts of published articles with highest score"""
+    articles = (Article.objects.published()
+                .filter(hot_score__isnull=False)
+                .order_by('-hot_score')
+                .values('id', 'title', 'slug', 'published_at', 'hot_score',
+                        'author__name', 'author__email')[:limit])
+    return [
+        {
+            'id': article['id'],
+            'title': article['title'],
+            'slug': article['slug'],
+            'published_at': article['published_at'],
+            'score': article['hot_score'],
+            'author': article['author__name'] or article['author__email'],
+        }
+        for article in articles
+    ]
+
+
+def update_top():
+    """Replace stored top articles with the current ones, return them"""
+    top = top_articles(settings.TRENDING['TOP_N'])
+    with transaction.atomic():
+        TrendingArticle.objects.all().delete()
+        TrendingArticle.objects.bulk_create([
+            TrendingArticle(position=position, article_id=article['id'],
+                            score=article['score'])
+            for position, article in enumerate(top, 1)
+        ])
+    return top
+
+
+def trending_articles():
+    """Return stored top articles as dicts. Articles unpublished since
+     the last update_trending run are left out, deleted ones are
+     deleted from the table with the article"""
+    rows = (TrendingArticle.objects
+            .filter(article__status=Article.PUBLISHED,
+                    article__published_at__lte=timezone.now())
+            .order_by('position')
+            .values('article_id', 'article__title', 'article__slug',
+                    'article__published_at', 'score',
+                    'article__author__name', 'article__author__email'))
+    return [
+        {
+            'id': row['article_id'],
+            'title': row['article__title'],
+            'slug': row['article__slug'],
+            'published_at': row['article__published_at'],
+            'score': row['score'],
+            'author': (row['article__author__name']
+                       or row['article__author__email']),
+        }
+        for row in rows
+    ]
+
+
+def add_engagement(article_id, amount=1):
+    """Add engagement to article and mark it for rescoring"""
+    return Article.objects.filter(pk=article_id).update(
+        engagement=models.F('engagement') + amount,
+        score_changed_at=timezone.now())
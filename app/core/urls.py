@@ -0,0 +1,20 @@
+"""
+URLs for news
+"""
+from django.urls import path
+from . import views
+app_name = 'core'
+
+urlpatterns = [
+    path('', views.feed_view, name='feed'),
+    path('articles/<int:pk>/<slug:slug>/', views.article_view,
+         name='article'),
+    path('search/', views.search_view, name='search'),
+    path('feed/rss/', views.syndication_feed_view, {'kind': 'rss'},
+         name='rss'),
+    path('feed/atom/', views.syndication_feed_view, {'kind': 'atom'},
+         name='atom'),
+    path('sitemap.xml', views.sitemap_view, name='sitemap'),
+    path('sitemap-<int:shard>.xml', views.sitemap_view,
+         name='sitemap_shard'),
+]
@@ -0,0 +1,123 @@
+"""
+Core views
+"""
+import time
+from datetime import datetime, timedelta, timezone
+
+from django.conf import settings
+from django.http import FileResponse, Http404, StreamingHttpResponse
+from django.shortcuts import get_object_or_404, redirect, render
+from django.utils.cache import get_conditional_response
+from django.utils.http import http_date
+
+from . import pageviews, syndication
+from .models import Article
+from .search import cached_search
+from .trending import trending_articles
+
+EPOCH = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+
+def encode_cursor(article):
+    """Return feed position after article as 'microseconds-id'"""
+    microseconds = (article.published_at - EPOCH) // timedelta(microseconds=1)
+    return f'{microseconds}-{article.pk}'
+
+
+def decode_cursor(cursor):
+    """Return (published_at, id) of cursor. Raises ValueError"""
+    microseconds, pk = map(int, cursor.split('-'))
+    return EPOCH + timedelta(microseconds=microseconds), pk
+
+
+def feed_page(cursor=None, size=None):
+    """Return (articles, next cursor) of feed page after cursor.
+     Keyset pagination costs the same for every page, unlike OFFSET
+     which reads and drops all rows of previous pages"""
+    size = size or settings.FEED_PAGE_SIZE
+    after = decode_cursor(cursor) if cursor else None
+    # One extra row tells whether there is a next page
+    articles = list(Article.objects.feed(after)[:size + 1])
+    if len(articles) > size:
+        return articles[:size], encode_cursor(articles[size - 1])
+    return articles, None
+
+
+def feed_view(request):
+    """News feed"""
+    try:
+        articles, next_cursor = feed_page(request.GET.get('after'))
+    except (ValueError, OverflowError):
+        raise Http404
+    return render(request, 'core/feed.html', {
+        'articles': articles,
+        'next_cursor': next_cursor,
+        'trending': trending_articles(),
+    })
+
+
+def article_view(request, pk, slug):
+    """Article page, counts the view"""
+    article = get_object_or_404(
+        Article.objects.published().select_related('author'), pk=pk)
+    if slug != article.slug:
+        return redirect(article, permanent=True)
+    pageviews.record_view(request, article.pk)
+    return render(request, 'core/article.html', {'article': article})
+
+
+def search_view(request):
+    """Article search"""
+    query = request.GET.get('q', '').strip()
+    return render(request, 'core/search.html', {
+        'query': query,
+        'results': cached_search(query) if query else [],
+    })
+
+
+def syndication_feed_view(request, kind):
+    """RSS or Atom feed of newest articles, streamed"""
+    last_modified = (syndication.feed_changed_at()
+                     or datetime.now(timezone.utc))
+    not_modified = get_conditional_response(
+        request, last_modified=int(last_modified.timestamp()))
+    if not_modified is not None:
+        return not_modified
+    response = StreamingHttpResponse(
+        syndication.stream_feed(kind, last_modified),
+        content_type=f'application/{kind}+xml; charset=utf-8')
+    response['Last-Modified'] = http_date(last_modified.timestamp())
+    return response
+
+
+def sitemap_view(request, shard=None):
+    """Sitemap index or one sitemap shard. Served from the disk cache,
+     or streamed while written to it when the cached one is stale"""
+    if shard is None:
+        path = syndication.cache_path('sitemap.xml')
+        changed_at = None
+    else:
+        changed_at = syndication.shard_changed_at(shard)
+        if changed_at is None:
+            raise Http404
+        path = syndication.cache_path(f'sitemap-{shard}.xml')
+
+    mtime = syndication.cached_mtime(path, changed_at)
+    content = None
+    if mtime is None:
+        mtime = int(time.time())
+        chunks = (syndication.stream_sitemap_index() if shard is None
+                  else syndication.stream_sitemap(shard))
+        content = syndication.write_through(path, chunks, mtime)
+
+    not_modified = get_conditional_response(request, last_modified=int(mtime))
+    if not_modified is not None:
+        return not_modified
+    if content is None:
+        response = FileResponse(open(path, 'rb'),
+                                content_type='application/xml')
+    else:
+        response = StreamingHttpResponse(
+            content, content_type='application/xml; charset=utf-8')
+    response['Last-Modified'] = http_date(mtime)
+    return response
@@ -27,12 +27,12 @@ class UserAdmin(BaseUserAdmin):
         (
             _('Important dates'),
             {
-                'fields': ('last_login',)
+                'fields': ('last_login', 'date_joined')
             }
 
         ),
     )
-    readonly_fields = ['last_login']
+    readonly_fields = ['last_login', 'date_joined']
 
 
 admin.site.register(User, UserAdmin)
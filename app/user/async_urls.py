@@ -0,0 +1,17 @@
+"""
+URLs for Users served by async views
+"""
+from django.urls import path
+from . import async_views
+app_name = 'user'
+
+urlpatterns = [
+    path('login/', async_views.loginpage_view, name='login'),
+    path('logout/', async_views.logout_view, name='logout'),
+    path('registration/', async_views.registration_view,
+         name='registration'),
+    path('thanks/', async_views.thanks_view, name='after_registration_page'),
+    path('activation/<token>/',
+         async_views.activation_view,
+         name='activation_link'),
+]
@@ -0,0 +1,97 @@
+"""
+Async versions of user views for ASGI servers.
+Enabled with ASYNC_VIEWS setting.
+
+Django ORM has no async API yet, so database work runs with
+sync_to_async while password hashing runs in an executor and
+does not occupy the single thread used for the ORM.
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user, login, logout
+from django.contrib.auth.views import redirect_to_login
+from django.http import Http404
+from django.shortcuts import render, redirect
+
+from core.page_cache import render_cached
+from . import hashing
+from .forms import CustomAuthenticationForm, CustomUserCreationForm
+from .hashing import hashing_backpressure
+from .models import ActivationToken
+
+BACKEND_PATH = 'user.backends.HashingPoolBackend'
+
+
+async def aget_user(request):
+    """Load request user in a sync thread and store it on request,
+     so templates can use it without database queries"""
+    user = await sync_to_async(get_user)(request)
+    request.user = user
+    return user
+
+
+@hashing_backpressure
+async def registration_view(request):
+    """User registration view"""
+    await aget_user(request)
+    if request.method == 'GET':
+        return render_cached(request, 'user/registration.html',
+                             {'form': CustomUserCreationForm()})
+    form = CustomUserCreationForm(request.POST, auto_id='cre_f_%s')
+    if await sync_to_async(form.is_valid)():
+        encoded = await hashing.amake_password(
+            form.cleaned_data['password1'])
+        await sync_to_async(form.save)(encoded_password=encoded)
+        return redirect('user:after_registration_page')
+    return render(request, 'user/registration.html',
+                  {'form': CustomUserCreationForm(
+                      request.POST,
+                      auto_id='cre_f_%s'),
+                   'errors': 'sometrubles'})
+
+
+async def thanks_view(request):
+    """After registration page view"""
+    await aget_user(request)
+    return render_cached(request, 'user/thanks.html')
+
+
+async def activation_view(request, token):
+    """User activation view"""
+    if request.method == 'GET':
+        user = await sync_to_async(ActivationToken.objects.activate)(token)
+        if user is None:
+            raise Http404
+
+    await aget_user(request)
+    return render_cached(request, 'user/activation.html', {
+        'messege': 'Account has been activated'
+    })
+
+
+@hashing_backpressure
+async def loginpage_view(request):
+    """User log in view"""
+    user = await aget_user(request)
+    if user.is_authenticated:
+        return redirect('user:registration')
+    if request.method == 'GET':
+        return render_cached(request, 'user/login.html',
+                             {'form': CustomAuthenticationForm()})
+
+    form = CustomAuthenticationForm(request, request.POST)
+    if not await form.ais_valid():
+        return render(request, 'user/login.html', {'form': form})
+    await sync_to_async(login)(request, form.get_user(),
+                               backend=BACKEND_PATH)
+    return redirect('user:registration')
+
+
+async def logout_view(request):
+    """User log out view"""
+    user = await aget_user(request)
+    if not user.is_authenticated:
+        return redirect_to_login(request.get_full_path())
+    if request.method != 'POST':
+        raise Http404
+    await sync_to_async(logout)(request)
+    return redirect('user:login')
@@ -0,0 +1,71 @@
+"""
+Authentication backends
+"""
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.contrib.auth.backends import ModelBackend
+
+from . import hashing
+from .user_cache import cache_user, get_cached_user
+
+
+class HashingPoolBackend(ModelBackend):
+    """ModelBackend which checks passwords with hashing service
+     and caches users loaded for sessions"""
+
+    def get_user(self, user_id):
+        user = get_cached_user(user_id)
+        if user is None:
+            UserModel = get_user_model()
+            try:
+                user = UserModel._default_manager.get(pk=user_id)
+            except UserModel.DoesNotExist:
+                return None
+            cache_user(user)
+        return user if self.user_can_authenticate(user) else None
+
+    def authenticate(self, request, username=None, password=None, **kwargs):
+        UserModel = get_user_model()
+        if username is None:
+            username = kwargs.get(UserModel.USERNAME_FIELD)
+        if username is None or password is None:
+            return None
+        try:
+            user = UserModel._default_manager.get_by_natural_key(username)
+        except UserModel.DoesNotExist:
+            # Run the hasher once to reduce the timing difference between
+            # existing and nonexistent users.
+            hashing.make_password(password)
+            return None
+
+        def setter(raw_password):
+            hashing.set_password(user, raw_password)
+            user._password = None
+            user.save(update_fields=['password'])
+
+        if (hashing.check_password(password, user.password, setter)
+                and self.user_can_authenticate(user)):
+            return user
+        return None
+
+    async def aauthenticate(self, request, username=None, password=None):
+        """Async version of authenticate(). Only password hashing
+         runs in executor, event loop is not blocked by it"""
+        UserModel = get_user_model()
+        if username is None or password is None:
+            return None
+        try:
+            user = await sync_to_async(
+                UserModel._default_manager.get_by_natural_key)(username)
+        except UserModel.DoesNotExist:
+            await hashing.amake_password(password)
+            return None
+
+        is_correct, must_update = await hashing.acheck_password(
+            password, user.password)
+        if not is_correct or not self.user_can_authenticate(user):
+            return None
+        if must_update:
+            user.password = await hashing.amake_password(password)
+            await sync_to_async(user.save)(update_fields=['password'])
+        return user
@@ -0,0 +1,25 @@
+"""
+User emails
+"""
+from django.conf import settings
+from django.template.loader import render_to_string
+from django.urls import reverse
+
+from core.models import OutboxEmail
+
+ACTIVATION_SUBJECT = 'Activate your account'
+
+
+def queue_activation_emails(tokens):
+    """Put activation emails for tokens into outbox"""
+    return OutboxEmail.objects.bulk_create([
+        OutboxEmail(
+            to_email=token.user.email,
+            subject=ACTIVATION_SUBJECT,
+            body=render_to_string('user/activation_email.txt', {
+                'activation_url': settings.SITE_URL + reverse(
+                    'user:activation_link', args=[token.token]),
+            }),
+        )
+        for token in tokens
+    ])
@@ -1,9 +1,16 @@
 """
 User Forms
 """
+from asgiref.sync import sync_to_async
 from django.contrib.auth.forms import (AuthenticationForm,
                                        UserCreationForm)
 from django.contrib.auth import get_user_model
+from django.contrib.auth.signals import user_login_failed
+
+from . import hashing
+from .backends import HashingPoolBackend
+from .emails import queue_activation_emails
+from .models import ActivationToken
 
 
 class CustomAuthenticationForm(AuthenticationForm):
@@ -12,6 +19,37 @@ class CustomAuthenticationForm(AuthenticationForm):
     error_css_class = 'error'
     required_css_class = 'required-field'
 
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._authenticated = False
+
+    async def ais_valid(self):
+        """Async is_valid() for async views. Password is checked with
+         HashingPoolBackend.aauthenticate() first, so hashing does not
+         block the event loop, then the form is validated as usual"""
+        username = self.fields['username'].to_python(
+            self.data.get('username'))
+        password = self.data.get('password')
+        if username and password:
+            self.user_cache = await HashingPoolBackend().aauthenticate(
+                self.request, username=username, password=password)
+            self._authenticated = True
+        return await sync_to_async(self.is_valid)()
+
+    def clean(self):
+        username = self.cleaned_data.get('username')
+        password = self.cleaned_data.get('password')
+        if not self._authenticated or username is None or not password:
+            return super().clean()
+        if self.user_cache is None:
+            user_login_failed.send(
+                sender=__name__,
+                credentials={'username': username},
+                request=self.request)
+            raise self.get_invalid_login_error()
+        self.confirm_login_allowed(self.user_cache)
+        return self.cleaned_data
+
 
 class CustomUserCreationForm(UserCreationForm):
     """Custom user creation form. Extends UserCreationForm.
@@ -22,3 +60,19 @@ class CustomUserCreationForm(UserCreationForm):
     class Meta:
         model = get_user_model()
         fields = ['email', 'name']
+
+    def save(self, commit=True, encoded_password=None):
+        """Save user with password hashed by hashing service
+         and issue activation token for him.
+         Already hashed password can be passed as encoded_password"""
+        user = super(UserCreationForm, self).save(commit=False)
+        password = self.cleaned_data['password1']
+        if encoded_password is None:
+            hashing.set_password(user, password)
+        else:
+            user.password = encoded_password
+            user._password = password
+        if commit:
+            user.save()
+            queue_activation_emails([ActivationToken.objects.issue(user)])
+        return user
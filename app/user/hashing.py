@@ -0,0 +1,203 @@
+"""
+Password hashing service.
+
+When PASSWORD_HASHING_POOL['ENABLED'] is set, password hashing and
+checking run in a bounded process pool instead of the request worker.
+Requests are rejected with HashingPoolBusy when the pool queue is full.
+"""
+import asyncio
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+from django.contrib.auth import hashers
+from django.http import HttpResponse
+
+from core import metrics, profiling
+
+
+class HashingPoolBusy(Exception):
+    """Raised when hashing pool queue is full"""
+
+
+def _check_password(password, encoded):
+    """Check password in worker process.
+     Returns (is_correct, must_update) tuple"""
+    updated = []
+    is_correct = hashers.check_password(
+        password, encoded, setter=lambda raw_password: updated.append(True))
+    return is_correct, bool(updated)
+
+
+class HashingPool:
+    """Process pool with limited number of pending tasks"""
+
+    def __init__(self, workers=None, max_queue=64):
+        self.max_queue = max_queue
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._lock = threading.Lock()
+        self.pending = 0
+        self.submitted = 0
+        self.completed = 0
+        self.rejected = 0
+
+    def _acquire(self):
+        with self._lock:
+            if self.pending >= self.max_queue:
+                self.rejected += 1
+                raise HashingPoolBusy
+            self.pending += 1
+            self.submitted += 1
+
+    def _release(self):
+        with self._lock:
+            self.pending -= 1
+            self.completed += 1
+
+    def run(self, func, *args):
+        """Run func in pool and wait for result"""
+        self._acquire()
+        try:
+            return self._executor.submit(func, *args).result()
+        finally:
+            self._release()
+
+    async def arun(self, func, *args):
+        """Run func in pool and await result without blocking a thread"""
+        self._acquire()
+        try:
+            return await asyncio.wrap_future(
+                self._executor.submit(func, *args))
+        finally:
+            self._release()
+
+    def stats(self):
+        """Return queue depth and counters"""
+        with self._lock:
+            return {
+                'workers': self._executor._max_workers,
+                'max_queue': self.max_queue,
+                'pending': self.pending,
+                'submitted': self.submitted,
+                'completed': self.completed,
+                'rejected': self.rejected,
+            }
+
+    def shutdown(self):
+        self._executor.shutdown()
+
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def get_pool():
+    """Return hashing pool or None if pool is disabled"""
+    global _pool
+    config = settings.PASSWORD_HASHING_POOL
+    if not config.get('ENABLED'):
+        return None
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                _pool = HashingPool(
+                    workers=config.get('WORKERS'),
+                    max_queue=config.get('MAX_QUEUE', 64))
+    return _pool
+
+
+def reset_pool():
+    """Shut down hashing pool. New pool is created on next use"""
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.shutdown()
+        _pool = None
+
+
+@contextmanager
+def _measure(operation):
+    """Record hashing time in metrics and request profile"""
+    with profiling.timer('hash_time'), \
+            metrics.PASSWORD_HASH_DURATION.time(operation=operation):
+        yield
+
+
+def make_password(password):
+    """Return hashed password"""
+    pool = get_pool()
+    with _measure('make'):
+        if pool is None:
+            return hashers.make_password(password)
+        return pool.run(hashers.make_password, password)
+
+
+def check_password(password, encoded, setter=None):
+    """Return True if password matches encoded hash.
+     Calls setter with raw password when hash must be upgraded"""
+    pool = get_pool()
+    with _measure('check'):
+        if pool is None:
+            return hashers.check_password(password, encoded, setter)
+        is_correct, must_update = pool.run(
+            _check_password, password, encoded)
+    if is_correct and must_update and setter:
+        setter(password)
+    return is_correct
+
+
+async def amake_password(password):
+    """Return hashed password. Hashing runs outside the event loop"""
+    pool = get_pool()
+    with _measure('make'):
+        if pool is None:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, hashers.make_password, password)
+        return await pool.arun(hashers.make_password, password)
+
+
+async def acheck_password(password, encoded):
+    """Return (is_correct, must_update) tuple.
+     Checking runs outside the event loop"""
+    pool = get_pool()
+    with _measure('check'):
+        if pool is None:
+            return await asyncio.get_running_loop().run_in_executor(
+                None, _check_password, password, encoded)
+        return await pool.arun(_check_password, password, encoded)
+
+
+def set_password(user, password):
+    """Set hashed password for user without saving it"""
+    user.password = make_password(password)
+    user._password = password
+
+
+def _busy_response():
+    response = HttpResponse('Service is busy, try again later', status=503)
+    response['Retry-After'] = str(
+        settings.PASSWORD_HASHING_POOL.get('RETRY_AFTER', 1))
+    return response
+
+
+def hashing_backpressure(view):
+    """Return 503 response with Retry-After when hashing pool is full.
+     Works with sync and async views"""
+    if asyncio.iscoroutinefunction(view):
+        @wraps(view)
+        async def async_wrapper(request, *args, **kwargs):
+            try:
+                return await view(request, *args, **kwargs)
+            except HashingPoolBusy:
+                return _busy_response()
+        return async_wrapper
+
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except HashingPoolBusy:
+            return _busy_response()
+    return wrapper
@@ -0,0 +1,60 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:25
+
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Q
+from django.utils import timezone
+import django.db.models.deletion
+import user.models
+import user.tokens
+
+# ACTIVATION_TOKEN_LIFETIME when the migration was written
+TOKEN_LIFETIME = timedelta(days=3)
+
+
+def issue_tokens(apps, schema_editor):
+    """Issue activation tokens for inactive users which had activation
+     links, so they can still be activated once the links are dropped"""
+    User = apps.get_model('user', 'User')
+    ActivationToken = apps.get_model('user', 'ActivationToken')
+    user_ids = list(
+        User.objects.filter(is_active=False)
+        .filter(Q(activation_link1__isnull=False)
+                | Q(activation_link2__isnull=False))
+        .values_list('pk', flat=True))
+    expires_at = timezone.now() + TOKEN_LIFETIME
+    ActivationToken.objects.bulk_create(
+        [ActivationToken(token=token, user_id=user_id, expires_at=expires_at)
+         for token, user_id in zip(
+             user.tokens.generate_tokens(len(user_ids)), user_ids)],
+        batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0005_remove_user_activation_link_user_activation_link1_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ActivationToken',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('token', models.CharField(default=user.models.crete_activation_link, max_length=64, unique=True)),
+                ('expires_at', models.DateTimeField(db_index=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='activation_tokens', to=settings.AUTH_USER_MODEL)),
+            ],
+        ),
+        migrations.RunPython(issue_tokens, migrations.RunPython.noop),
+        migrations.RemoveField(
+            model_name='user',
+            name='activation_link1',
+        ),
+        migrations.RemoveField(
+            model_name='user',
+            name='activation_link2',
+        ),
+    ]
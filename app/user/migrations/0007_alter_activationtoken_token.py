@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:25
+
+from django.db import migrations, models
+import user.tokens
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0006_activationtoken_remove_user_activation_links'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='activationtoken',
+            name='token',
+            field=models.CharField(default=user.tokens.generate_token, max_length=64, unique=True),
+        ),
+    ]
@@ -0,0 +1,19 @@
+# Generated by Django 4.0.10 on 2026-10-18 13:42
+
+from django.db import migrations, models
+import django.utils.timezone
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0007_alter_activationtoken_token'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='user',
+            name='date_joined',
+            field=models.DateTimeField(default=django.utils.timezone.now),
+        ),
+    ]
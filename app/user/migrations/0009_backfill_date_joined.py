@@ -0,0 +1,37 @@
+from datetime import timedelta
+
+from django.db import migrations
+from django.db.models import F, Min
+
+# ACTIVATION_TOKEN_LIFETIME when the tokens were issued
+TOKEN_LIFETIME = timedelta(days=3)
+
+
+def backfill_date_joined(apps, schema_editor):
+    """0008 set date_joined of existing users to the migration time.
+     Move it back to the first login or to the issue time of the first
+     activation token, whichever is known and earlier"""
+    User = apps.get_model('user', 'User')
+    ActivationToken = apps.get_model('user', 'ActivationToken')
+    User.objects.filter(last_login__lt=F('date_joined')).update(
+        date_joined=F('last_login'))
+
+    issued = (ActivationToken.objects.values('user_id')
+              .annotate(first_expires_at=Min('expires_at'))
+              .order_by('user_id'))
+    for row in issued.iterator(chunk_size=1000):
+        User.objects.filter(
+            pk=row['user_id'],
+            date_joined__gt=row['first_expires_at'] - TOKEN_LIFETIME,
+        ).update(date_joined=row['first_expires_at'] - TOKEN_LIFETIME)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('user', '0008_user_date_joined'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_date_joined, migrations.RunPython.noop),
+    ]
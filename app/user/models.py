@@ -1,16 +1,22 @@
+from django.conf import settings
 from django.db import models
+from django.utils import timezone
 from django.contrib.auth.models import (AbstractBaseUser,
                                         BaseUserManager,
                                         PermissionsMixin)
 import hashlib
 import random
 
+from core import metrics
+from .tokens import generate_token, generate_tokens
+
 
 class UserManager(BaseUserManager):
     """Custom Manager for users"""
 
     def create_user(self, email, password=None, **extra_fields):
-        """Create and return new user"""
+        """Create and return new user. Inactive users get an
+         activation token"""
 
         if not email:
             raise ValueError('Users must have an email address')
@@ -24,21 +30,29 @@ class UserManager(BaseUserManager):
         )
         user.set_password(password)
         user.save(using=self._db)
+        if not user.is_active:
+            ActivationToken.objects.db_manager(self._db).issue(user)
         return user
 
     def create_superuser(self, email, password):
         """Create and return superuser"""
 
-        user = self.create_user(email, password)
-        user.is_staff = True
-        user.is_active = True
-        user.is_superuser = True
-        user.save(using=self._db)
-        return user
+        return self.create_user(email, password,
+                                is_staff=True,
+                                is_active=True,
+                                is_superuser=True)
+
+    def never_activated(self, joined_before):
+        """Return inactive users who joined before given time and
+         never logged in, so accounts disabled by admins are kept"""
+        return self.filter(is_active=False,
+                           last_login__isnull=True,
+                           date_joined__lt=joined_before)
 
 
 def crete_activation_link():
-    hashlib.sha1()
+    """Legacy activation link generator. Kept for old migrations,
+     use tokens.generate_token() instead"""
     n = ['1', '2', '3', '4', '5', '6', '7', '8', '9']
     a = ['q', 'w', 'e', 'r', 't', 'y', 'u', 'i', 'o', 'p',
          'l', 'k', 'j', 'h', 'g', 'f', 'd', 's', 'a', 'z',
@@ -65,16 +79,7 @@ class User(AbstractBaseUser, PermissionsMixin):
     name = models.CharField(max_length=255, blank=True)
     is_staff = models.BooleanField(default=False)
     is_active = models.BooleanField(default=False)
-    activation_link1 = models.CharField(
-        max_length=50,
-        default=crete_activation_link,
-        null=True,
-        blank=True)
-    activation_link2 = models.CharField(
-        max_length=50,
-        default=crete_activation_link,
-        null=True,
-        blank=True)
+    date_joined = models.DateTimeField(default=timezone.now)
 
     objects = UserManager()
 
@@ -82,3 +87,67 @@ class User(AbstractBaseUser, PermissionsMixin):
 
     def __str__(self):
         return self.email
+
+
+class ActivationTokenManager(models.Manager):
+    """Manager for activation tokens"""
+
+    def issue(self, user):
+        """Create and return new activation token for user"""
+        return self.create(
+            user=user,
+            expires_at=timezone.now() + settings.ACTIVATION_TOKEN_LIFETIME
+        )
+
+    def issue_many(self, users, batch_size=None):
+        """Create activation tokens for many users with bulk insert"""
+        expires_at = timezone.now() + settings.ACTIVATION_TOKEN_LIFETIME
+        tokens = generate_tokens(len(users))
+        return self.bulk_create(
+            [self.model(token=token, user=user, expires_at=expires_at)
+             for token, user in zip(tokens, users)],
+            batch_size=batch_size
+        )
+
+    def valid(self):
+        """Return tokens which are not expired yet"""
+        return self.filter(expires_at__gt=timezone.now())
+
+    def activate(self, token):
+        """Activate user by token and delete his tokens.
+         Returns activated user or None for unknown, expired tokens
+         and already active users"""
+        activation_token = (self.valid().select_related('user')
+                            .filter(token=token).first())
+        if activation_token is None or activation_token.user.is_active:
+            return None
+        user = activation_token.user
+        user.is_active = True
+        user.save(update_fields=['is_active'])
+        metrics.ACTIVATIONS.inc()
+        user.activation_tokens.all().delete()
+        return user
+
+    def purge(self):
+        """Delete expired tokens. Returns number of deleted tokens"""
+        deleted, _ = self.filter(expires_at__lte=timezone.now()).delete()
+        return deleted
+
+
+class ActivationToken(models.Model):
+    """One-time token for user account activation.
+     Consumed tokens are deleted, expired ones are removed by purge()"""
+    token = models.CharField(
+        max_length=64,
+        unique=True,
+        default=generate_token)
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='activation_tokens')
+    expires_at = models.DateTimeField(db_index=True)
+
+    objects = ActivationTokenManager()
+
+    def __str__(self):
+        return self.token
@@ -0,0 +1,132 @@
+"""Test for async User views"""
+from unittest.mock import patch
+from urllib.parse import urlencode
+
+from asgiref.sync import sync_to_async
+from django.contrib.auth import get_user_model
+from django.core.exceptions import ValidationError
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+from user.forms import CustomAuthenticationForm
+from user.models import ActivationToken
+
+
+def create_user(**kwargs):
+    """Create and return user"""
+    default = {
+        'email': 'test@example.com',
+        'name': 'test name',
+        'password': 'testpassword123',
+    }
+    default.update(kwargs)
+    return get_user_model().objects.create_user(**default)
+
+
+@override_settings(ROOT_URLCONF='user.tests.urls_async')
+class AsyncViewsTests(TestCase):
+    """Tests for async user views"""
+
+    def setUp(self):
+        self.credentials = {
+            'username': 'test@example.com',
+            'password': 'testpassword123',
+        }
+
+    async def _post(self, url, data=None):
+        """POST form-urlencoded data with async client"""
+        return await self.async_client.post(
+            url, urlencode(data or {}),
+            content_type='application/x-www-form-urlencoded')
+
+    async def test_registration_creates_user(self):
+        """Test POST request registers user and redirects"""
+        res = await self._post(reverse('user:registration'), {
+            'email': 'new@example.com',
+            'password1': 'testpassword123',
+            'password2': 'testpassword123',
+        })
+
+        self.assertEqual(res.status_code, 302)
+        user = await sync_to_async(get_user_model().objects.get)(
+            email='new@example.com')
+        self.assertTrue(user.check_password('testpassword123'))
+        self.assertFalse(user.is_active)
+
+    async def test_registration_invalid_form(self):
+        """Test invalid registration renders form again"""
+        res = await self._post(reverse('user:registration'))
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTemplateUsed(res, 'user/registration.html')
+
+    async def test_thanks_page(self):
+        """Test thanks page response 200"""
+        res = await self.async_client.get(
+            reverse('user:after_registration_page'))
+
+        self.assertEqual(res.status_code, 200)
+
+    async def test_activation_works_only_once(self):
+        """Test activation link activates user and works only once"""
+        user = await sync_to_async(create_user)()
+        token = await sync_to_async(
+            ActivationToken.objects.values_list('token', flat=True).get)()
+        url = reverse('user:activation_link', args=[token])
+
+        res1 = await self.async_client.get(url)
+        res2 = await self.async_client.get(url)
+
+        self.assertEqual(res1.status_code, 200)
+        self.assertEqual(res2.status_code, 404)
+        await sync_to_async(user.refresh_from_db)()
+        self.assertTrue(user.is_active)
+
+    async def test_login_and_logout(self):
+        """Test active user can log in and log out"""
+        await sync_to_async(create_user)(is_active=True)
+
+        res = await self._post(
+            reverse('user:login'), self.credentials)
+        self.assertEqual(res.status_code, 302)
+        res = await self.async_client.get(reverse('user:login'))
+        self.assertEqual(res.status_code, 302)
+
+        res = await self._post(reverse('user:logout'))
+        self.assertEqual(res.status_code, 302)
+        res = await self.async_client.get(reverse('user:login'))
+        self.assertEqual(res.status_code, 200)
+
+    async def test_login_not_active_user(self):
+        """Test not activated user can`t log in"""
+        await sync_to_async(create_user)()
+
+        res = await self._post(
+            reverse('user:login'), self.credentials)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertTemplateUsed(res, 'user/login.html')
+        self.assertTrue(res.context['form'].has_error(
+            '__all__', 'invalid_login'))
+
+    async def test_login_checks_login_allowed(self):
+        """Test login is validated with CustomAuthenticationForm"""
+        await sync_to_async(create_user)(is_active=True)
+
+        with patch.object(CustomAuthenticationForm, 'confirm_login_allowed',
+                          side_effect=ValidationError('Not allowed')):
+            res = await self._post(
+                reverse('user:login'), self.credentials)
+
+        self.assertEqual(res.status_code, 200)
+        self.assertEqual(res.context['form'].non_field_errors(),
+                         ['Not allowed'])
+        res = await self.async_client.get(reverse('user:login'))
+        self.assertEqual(res.status_code, 200)
+
+    async def test_logout_requires_login(self):
+        """Test logout redirects unauthenticated users to login page"""
+        res = await self._post(reverse('user:logout'))
+
+        self.assertEqual(res.status_code, 302)
+        self.assertTrue(res.url.startswith(reverse('user:login')))
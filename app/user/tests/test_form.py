@@ -3,6 +3,7 @@ Test for User Forms
 """
 from django.test import TestCase
 from django.contrib.auth import get_user_model
+from core.models import OutboxEmail
 from user.forms import CustomAuthenticationForm, CustomUserCreationForm
 
 
@@ -82,6 +83,22 @@ class CustomUserCreationFormTests(TestCase):
         ).exists()
         self.assertTrue(user_exists)
 
+    def test_user_creation_form_issues_activation_token(self):
+        """Test saving form issues activation token for new user"""
+        form = CustomUserCreationForm(data=self.USER_DATA)
+        user = form.save()
+
+        self.assertEqual(user.activation_tokens.count(), 1)
+
+    def test_user_creation_form_queues_activation_email(self):
+        """Test saving form puts activation email into outbox"""
+        form = CustomUserCreationForm(data=self.USER_DATA)
+        user = form.save()
+
+        email = OutboxEmail.objects.get()
+        self.assertEqual(email.to_email, user.email)
+        self.assertIn(user.activation_tokens.get().token, email.body)
+
     def test_user_creation_form_error_with_existing_user(self):
         """Test form not valid when user email already exists"""
         get_user_model().objects.create_user(
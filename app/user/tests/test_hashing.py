@@ -0,0 +1,122 @@
+"""Tests for password hashing service"""
+import time
+from concurrent.futures import ThreadPoolExecutor
+from unittest.mock import patch
+
+from django.contrib.auth import get_user_model
+from django.contrib.auth.hashers import make_password as django_make_password
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+
+from user import hashing
+
+POOL_ENABLED = {
+    'ENABLED': True,
+    'WORKERS': 1,
+    'MAX_QUEUE': 4,
+    'RETRY_AFTER': 7,
+}
+
+
+class HashingPoolTests(SimpleTestCase):
+    """Tests for HashingPool"""
+
+    def setUp(self):
+        self.pool = hashing.HashingPool(workers=1, max_queue=1)
+
+    def tearDown(self):
+        self.pool.shutdown()
+
+    def test_run_returns_result(self):
+        """Test pool returns result of function"""
+        self.assertEqual(self.pool.run(abs, -3), 3)
+        self.assertEqual(self.pool.stats()['completed'], 1)
+        self.assertEqual(self.pool.stats()['pending'], 0)
+
+    def test_run_rejects_when_queue_is_full(self):
+        """Test pool raises HashingPoolBusy when queue is full"""
+        with ThreadPoolExecutor(max_workers=1) as threads:
+            future = threads.submit(self.pool.run, time.sleep, 0.5)
+            while self.pool.stats()['pending'] == 0:
+                time.sleep(0.01)
+            with self.assertRaises(hashing.HashingPoolBusy):
+                self.pool.run(abs, -1)
+            future.result()
+
+        self.assertEqual(self.pool.stats()['rejected'], 1)
+
+
+@override_settings(PASSWORD_HASHING_POOL=POOL_ENABLED)
+class HashingServiceTests(SimpleTestCase):
+    """Tests for hashing service functions with enabled pool"""
+
+    def tearDown(self):
+        hashing.reset_pool()
+
+    def test_make_and_check_password(self):
+        """Test password hashed in pool can be checked"""
+        encoded = hashing.make_password('password123')
+
+        self.assertTrue(hashing.check_password('password123', encoded))
+        self.assertFalse(hashing.check_password('wrong123', encoded))
+        self.assertEqual(hashing.get_pool().stats()['completed'], 3)
+
+    def test_check_password_calls_setter_for_outdated_hash(self):
+        """Test setter is called when password hash must be upgraded"""
+        calls = []
+
+        with self.settings(PASSWORD_HASHERS=[
+            'django.contrib.auth.hashers.PBKDF2PasswordHasher',
+            'django.contrib.auth.hashers.MD5PasswordHasher',
+        ]):
+            encoded = django_make_password('password123', hasher='md5')
+            hashing.check_password('password123', encoded, calls.append)
+
+        self.assertEqual(calls, ['password123'])
+
+    def test_disabled_pool_is_not_created(self):
+        """Test pool is not used when it is disabled"""
+        with self.settings(PASSWORD_HASHING_POOL={'ENABLED': False}):
+            encoded = hashing.make_password('password123')
+            self.assertIsNone(hashing.get_pool())
+        self.assertTrue(hashing.check_password('password123', encoded))
+
+
+@override_settings(PASSWORD_HASHING_POOL=POOL_ENABLED)
+class HashingViewsTests(TestCase):
+    """Tests for user views with hashing service"""
+
+    def tearDown(self):
+        hashing.reset_pool()
+
+    def test_registration_and_login_with_pool(self):
+        """Test user registered with pool can log in"""
+        self.client.post(reverse('user:registration'), {
+            'email': 'test@example.com',
+            'password1': 'testpassword123',
+            'password2': 'testpassword123',
+        })
+        get_user_model().objects.update(is_active=True)
+
+        res = self.client.post(reverse('user:login'), {
+            'username': 'test@example.com',
+            'password': 'testpassword123',
+        }, follow=True)
+
+        self.assertTrue(res.context['user'].is_authenticated)
+
+    @patch('user.hashing.HashingPool.run',
+           side_effect=hashing.HashingPoolBusy)
+    def test_busy_pool_returns_503(self, patched_run):
+        """Test views return 503 with Retry-After when pool is full"""
+        for url, data in [
+            (reverse('user:login'),
+             {'username': 'test@example.com', 'password': 'pass12345'}),
+            (reverse('user:registration'),
+             {'email': 'test@example.com', 'password1': 'testpassword123',
+              'password2': 'testpassword123'}),
+        ]:
+            res = self.client.post(url, data)
+
+            self.assertEqual(res.status_code, 503)
+            self.assertEqual(res['Retry-After'], '7')
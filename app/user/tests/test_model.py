@@ -1,7 +1,14 @@
 """Tests for User model"""
+from datetime import timedelta
+
+from django.db import connection
+from django.db.migrations.executor import MigrationExecutor
 from django.db.utils import IntegrityError
-from django.test import TestCase
+from django.test import TestCase, TransactionTestCase
 from django.contrib.auth import get_user_model
+from django.utils import timezone
+
+from user.models import ActivationToken
 
 
 class UserModelTests(TestCase):
@@ -70,8 +77,8 @@ class UserModelTests(TestCase):
             )
             self.assertEqual(user.email, expected)
 
-    def test_creates_activated_link_with_create_user(self):
-        """Test creates activated link on user creation"""
+    def test_creates_activation_token_with_create_user(self):
+        """Test creates activation token on user creation"""
         email = 'test@example.com'
         password = 'goodpassword123'
         user = get_user_model().objects.create_user(
@@ -79,8 +86,10 @@ class UserModelTests(TestCase):
             password=password
         )
 
-        self.assertNotEqual(user.activation_link1, None)
-        self.assertNotEqual(user.activation_link2, None)
+        self.assertEqual(user.activation_tokens.count(), 1)
+        token = user.activation_tokens.get()
+        self.assertTrue(token.token)
+        self.assertGreater(token.expires_at, timezone.now())
 
     def test_create_super_user(self):
         """Test creating superuser is successful."""
@@ -93,3 +102,97 @@ class UserModelTests(TestCase):
 
         self.assertTrue(user.is_superuser)
         self.assertTrue(user.is_staff)
+        self.assertTrue(user.is_active)
+        self.assertFalse(user.activation_tokens.exists())
+
+    def test_create_active_user_without_token(self):
+        """Test active users do not get activation tokens"""
+        user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='goodpassword123',
+            is_active=True
+        )
+
+        self.assertFalse(user.activation_tokens.exists())
+
+
+class ActivationTokenModelTests(TestCase):
+    """Tests for ActivationToken model"""
+
+    def setUp(self):
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='goodpassword123'
+        )
+
+    def test_issued_tokens_are_unique(self):
+        """Test every issued token has its own value"""
+        tokens = {ActivationToken.objects.issue(self.user).token
+                  for _ in range(10)}
+
+        self.assertEqual(len(tokens), 10)
+
+    def test_valid_excludes_expired_tokens(self):
+        """Test valid() returns only not expired tokens"""
+        self.user.activation_tokens.update(
+            expires_at=timezone.now() - timedelta(seconds=1))
+        fresh = ActivationToken.objects.issue(self.user)
+
+        self.assertEqual(list(ActivationToken.objects.valid()), [fresh])
+
+    def test_purge_deletes_only_expired_tokens(self):
+        """Test purge() deletes expired tokens and keeps valid ones"""
+        self.user.activation_tokens.update(
+            expires_at=timezone.now() - timedelta(seconds=1))
+        fresh = ActivationToken.objects.issue(self.user)
+
+        deleted = ActivationToken.objects.purge()
+
+        self.assertEqual(deleted, 1)
+        self.assertEqual(list(ActivationToken.objects.all()), [fresh])
+
+    def test_issue_many_creates_token_per_user(self):
+        """Test issue_many() creates distinct token for every user"""
+        users = [
+            get_user_model().objects.create(email=f'bulk{i}@example.com')
+            for i in range(5)
+        ]
+
+        tokens = ActivationToken.objects.issue_many(users)
+
+        self.assertEqual(len({token.token for token in tokens}), 5)
+        for user in users:
+            self.assertEqual(user.activation_tokens.count(), 1)
+
+
+class IssueTokensMigrationTest(TransactionTestCase):
+    """Test tokens are issued for inactive users when links are dropped"""
+    before = (
+        'user',
+        '0005_remove_user_activation_link_user_activation_link1_and_more')
+    after = ('user', '0006_activationtoken_remove_user_activation_links')
+
+    def tearDown(self):
+        executor = MigrationExecutor(connection)
+        executor.loader.build_graph()
+        executor.migrate(executor.loader.graph.leaf_nodes())
+
+    def test_issue_tokens(self):
+        executor = MigrationExecutor(connection)
+        executor.migrate([self.before])
+        old_apps = executor.loader.project_state([self.before]).apps
+        OldUser = old_apps.get_model('user', 'User')
+        OldUser.objects.create(email='inactive@example.com')
+        OldUser.objects.create(email='active@example.com', is_active=True)
+        OldUser.objects.create(email='disabled@example.com',
+                               activation_link1=None, activation_link2=None)
+
+        executor.loader.build_graph()
+        executor.migrate([self.after])
+        new_apps = executor.loader.project_state([self.after]).apps
+        tokens = new_apps.get_model('user', 'ActivationToken').objects
+
+        self.assertEqual(
+            list(tokens.values_list('user__email', flat=True)),
+            ['inactive@example.com'])
+        self.assertGreater(tokens.get().expires_at, timezone.now())
@@ -0,0 +1,28 @@
+"""Tests for activation tokens generation"""
+from django.test import SimpleTestCase
+
+from user.tokens import generate_token, generate_tokens
+
+
+class TokensTests(SimpleTestCase):
+    """Tests for tokens module"""
+
+    def test_generate_token_is_url_safe(self):
+        """Test token contains only URL-safe characters"""
+        allowed = set('abcdefghijklmnopqrstuvwxyz'
+                      'ABCDEFGHIJKLMNOPQRSTUVWXYZ0123456789-_')
+        token = generate_token()
+
+        self.assertTrue(set(token) <= allowed)
+        self.assertLessEqual(len(token), 64)
+
+    def test_generate_tokens_returns_distinct_tokens(self):
+        """Test batch generation returns requested number of unique tokens"""
+        tokens = generate_tokens(1000)
+
+        self.assertEqual(len(tokens), 1000)
+        self.assertEqual(len(set(tokens)), 1000)
+
+    def test_generate_tokens_zero(self):
+        """Test batch generation of zero tokens returns empty list"""
+        self.assertEqual(generate_tokens(0), [])
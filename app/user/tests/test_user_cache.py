@@ -0,0 +1,60 @@
+"""Tests for cached sessions and users"""
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+REGISTRATION_URL = reverse('user:registration')
+
+
+@override_settings(SESSION_ENGINE='django.contrib.sessions.backends.cache',
+                   USER_CACHE_TIMEOUT=300)
+class UserCacheTests(TestCase):
+    """Tests for users cache used by AuthenticationMiddleware"""
+
+    def setUp(self):
+        caches['sessions'].clear()
+        self.user = get_user_model().objects.create_user(
+            email='test@example.com',
+            password='testpassword123',
+            is_active=True)
+        self.client.force_login(self.user)
+
+    def test_cache_hit_makes_no_queries(self):
+        """Test authenticated request makes no queries on cache hit"""
+        self.client.get(REGISTRATION_URL)
+
+        with self.assertNumQueries(0):
+            res = self.client.get(REGISTRATION_URL)
+
+        self.assertTrue(res.context['user'].is_authenticated)
+
+    def test_user_save_invalidates_cache(self):
+        """Test changed user is loaded from database again"""
+        self.client.get(REGISTRATION_URL)
+        self.user.name = 'New name'
+        self.user.save()
+
+        with self.assertNumQueries(1):
+            res = self.client.get(REGISTRATION_URL)
+
+        self.assertEqual(res.context['user'].name, 'New name')
+
+    def test_deactivated_user_logged_out(self):
+        """Test deactivated user is not authenticated"""
+        self.client.get(REGISTRATION_URL)
+        self.user.is_active = False
+        self.user.save()
+
+        res = self.client.get(REGISTRATION_URL)
+
+        self.assertFalse(res.context['user'].is_authenticated)
+
+    def test_deleted_user_logged_out(self):
+        """Test deleted user is not authenticated"""
+        self.client.get(REGISTRATION_URL)
+        self.user.delete()
+
+        res = self.client.get(REGISTRATION_URL)
+
+        self.assertFalse(res.context['user'].is_authenticated)
@@ -1,8 +1,17 @@
 """Test for User views"""
+from datetime import timedelta
+from unittest.mock import patch
+
+from django.contrib.auth import hashers
+from django.db import connection
 from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
 from django.contrib.auth import get_user_model
 from django.urls import reverse
-from user.models import crete_activation_link
+from django.utils import timezone
+
+from core.testing import PerformanceBudget
+from user.tokens import generate_token
 
 
 REGISTRATION_URL = reverse('user:registration')
@@ -44,17 +53,20 @@ class RegistrationViewTests(TestCase):
         res = self.client.post(REGISTRATION_URL, data=default)
         return res
 
+    @PerformanceBudget(queries=0, hashes=0, seconds=0.5)
     def test_get_request_response_ok(self):
         """Test page exist and return 200 status code"""
         res = self.client.get(REGISTRATION_URL)
 
         self.assertEqual(res.status_code, 200)
 
+    @PerformanceBudget(queries=0, hashes=0, seconds=0.5)
     def test_post_request_response_ok(self):
         res = self.client.post(REGISTRATION_URL)
 
         self.assertEqual(res.status_code, 200)
 
+    @PerformanceBudget(queries=6, hashes=1, seconds=1)
     def test_redirect_after_successful_post_request(self):
         res = self.__user_registration()
 
@@ -120,19 +132,19 @@ class ActivationViewTests(TestCase):
 
     def setUp(self):
         self.user = create_user()
+        self.token = self.user.activation_tokens.get()
         self.activation_url = reverse('user:activation_link', args=[
-            self.user.activation_link1,
-            self.user.activation_link2
+            self.token.token
         ])
 
     def test_not_exist_link_raise_error(self):
         """Test raise 404 error on GET request for not existing activation url
         """
         link = reverse('user:activation_link', args=[
-            crete_activation_link(),
-            crete_activation_link()
+            generate_token()
         ])
-        res = self.client.get(link)
+        with PerformanceBudget(queries=1, hashes=0):
+            res = self.client.get(link)
 
         self.assertEqual(res.status_code, 404)
 
@@ -142,20 +154,21 @@ class ActivationViewTests(TestCase):
 
         self.assertEqual(res.status_code, 200)
 
-    def test_raise_error_only_one_hash_equals(self):
-        """Test raise 404 error only one hash int url corresponds user data"""
-        link = reverse('user:activation_link', args=[
-            self.user.activation_link1,
-            crete_activation_link()
-        ])
+    def test_expired_link_raise_error(self):
+        """Test raise 404 error for expired activation token"""
+        self.user.activation_tokens.update(
+            expires_at=timezone.now() - timedelta(seconds=1))
 
-        res = self.client.get(link)
+        res = self.client.get(self.activation_url)
 
         self.assertEqual(res.status_code, 404)
+        self.user.refresh_from_db()
+        self.assertFalse(self.user.is_active)
 
     def test_get_request_exiting_link_activate_user(self):
         """Test change user is_active parameter to True"""
-        self.client.get(self.activation_url)
+        with PerformanceBudget(queries=5, hashes=0, seconds=0.5):
+            self.client.get(self.activation_url)
         self.user.refresh_from_db()
 
         self.assertTrue(self.user.is_active)
@@ -168,6 +181,12 @@ class ActivationViewTests(TestCase):
 
         self.assertEqual(res.status_code, 404)
 
+    def test_activation_deletes_consumed_token(self):
+        """Test activation token is deleted after activation"""
+        self.client.get(self.activation_url)
+
+        self.assertFalse(self.user.activation_tokens.exists())
+
 
 class LoginViewTest(TestCase):
     """Test for log in view"""
@@ -190,7 +209,8 @@ class LoginViewTest(TestCase):
 
     def test_login_page_exists(self):
         """Test log in page response 200"""
-        res1 = self.client.get(LOGIN_URL)
+        with PerformanceBudget(queries=0, hashes=0, seconds=0.5):
+            res1 = self.client.get(LOGIN_URL)
         res2 = self.client.post(LOGIN_URL)
 
         self.assertEqual(res1.status_code, 200)
@@ -212,6 +232,21 @@ class LoginViewTest(TestCase):
             follow=True)
         self.assertTrue(res.context['user'].is_authenticated)
 
+    def test_login_checks_password_once(self):
+        """Test successful log in runs one password check
+         and one user query"""
+        table = get_user_model()._meta.db_table
+        with patch('django.contrib.auth.hashers.check_password',
+                   wraps=hashers.check_password) as patched_check:
+            with CaptureQueriesContext(connection) as queries:
+                res = self.client.post(LOGIN_URL, self.good_credentials)
+
+        user_selects = [q for q in queries.captured_queries
+                        if q['sql'].startswith('SELECT') and table in q['sql']]
+        self.assertEqual(res.status_code, 302)
+        self.assertEqual(len(user_selects), 1)
+        self.assertEqual(patched_check.call_count, 1)
+
     def test_raise_error_not_activated_user(self):
         """Test raise error when not activated user try to login"""
         self.user.is_active = False
@@ -224,6 +259,7 @@ class LoginViewTest(TestCase):
             follow=True)
         self.assertFalse(res.context['user'].is_authenticated)
 
+    @PerformanceBudget(queries=10, hashes=1, seconds=1)
     def test_redirect_after_login(self):
         """Test redirect after successful POST request"""
 
@@ -241,6 +277,23 @@ class LoginViewTest(TestCase):
             follow=True)
         self.assertFalse(res.context['user'].is_authenticated)
 
+    @PerformanceBudget(queries=1, hashes=1, seconds=1)
+    def test_wrong_password_checked_once(self):
+        """Test failed log in runs one password check"""
+        res = self.client.post(LOGIN_URL, self.bad_credentials)
+
+        self.assertEqual(res.status_code, 200)
+
+    @PerformanceBudget(queries=1, hashes=1, seconds=1)
+    def test_unknown_email_checked_once(self):
+        """Test log in with unknown email still runs one password
+         hashing, so response time does not reveal registered emails"""
+        res = self.client.post(LOGIN_URL, {
+            'username': 'unknown@example.com',
+            'password': 'testpassword123'})
+
+        self.assertEqual(res.status_code, 200)
+
     def test_authenticated_user_cant_login_twice(self):
         """Test authenticated users get a redirect
          on trying to get a login URL"""
@@ -248,11 +301,12 @@ class LoginViewTest(TestCase):
             LOGIN_URL,
             self.good_credentials)
 
-        res1 = self.client.get(LOGIN_URL)
-        res2 = self.client.post(LOGIN_URL)
-        res3 = self.client.post(
-            LOGIN_URL,
-            self.good_credentials)
+        with PerformanceBudget(hashes=0):
+            res1 = self.client.get(LOGIN_URL)
+            res2 = self.client.post(LOGIN_URL)
+            res3 = self.client.post(
+                LOGIN_URL,
+                self.good_credentials)
 
         for x in [res1, res2, res3]:
             self.assertEqual(x.status_code, 302)
@@ -293,5 +347,6 @@ class LogoutViewTest(TestCase):
         """Test redirect after success log out"""
         self.client.force_login(user=self.user)
 
-        res = self.client.post(LOGOUT_URL)
+        with PerformanceBudget(queries=4, hashes=0, seconds=0.5):
+            res = self.client.post(LOGOUT_URL)
         self.assertEqual(res.status_code, 302)
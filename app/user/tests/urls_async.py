@@ -0,0 +1,7 @@
+"""Root URLconf for async user views tests"""
+from django.urls import include, path
+
+urlpatterns = [
+    path('user/', include('user.async_urls')),
+    path('', include('core.urls')),
+]
@@ -0,0 +1,23 @@
+"""
+Activation tokens generation
+"""
+import secrets
+
+TOKEN_BYTES = 32
+
+
+def generate_token():
+    """Return new URL-safe random token"""
+    return secrets.token_urlsafe(TOKEN_BYTES)
+
+
+def generate_tokens(count):
+    """Return list of `count` distinct URL-safe random tokens.
+     Used to pre-generate tokens for bulk user creation"""
+    tokens = set()
+    while len(tokens) < count:
+        tokens.update(
+            secrets.token_urlsafe(TOKEN_BYTES)
+            for _ in range(count - len(tokens))
+        )
+    return list(tokens)
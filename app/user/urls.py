@@ -10,7 +10,7 @@ urlpatterns = [
     path('logout/', views.logout_view, name='logout'),
     path('registration/', views.registration_view, name='registration'),
     path('thanks/', views.thanks_view, name='after_registration_page'),
-    path('activation/<hash1>/<hash2>',
+    path('activation/<token>/',
          views.activation_view,
          name='activation_link'),
 ]
@@ -0,0 +1,35 @@
+"""
+Cache of users loaded for sessions.
+
+AuthenticationMiddleware loads request user on every authenticated
+request. Users are cached by id and dropped from the cache by
+post_save/post_delete signals (see signals.py), which only reach the
+cache of the current process. Production settings turn the cache off
+unless SESSION_CACHE_BACKEND is a cache shared by all processes.
+"""
+from django.conf import settings
+from django.core.cache import caches
+
+
+def _key(user_id):
+    return f'user:{user_id}'
+
+
+def _cache():
+    return caches[settings.USER_CACHE_ALIAS]
+
+
+def get_cached_user(user_id):
+    """Return cached user or None"""
+    if not settings.USER_CACHE_TIMEOUT:
+        return None
+    return _cache().get(_key(user_id))
+
+
+def cache_user(user):
+    if settings.USER_CACHE_TIMEOUT:
+        _cache().set(_key(user.pk), user, settings.USER_CACHE_TIMEOUT)
+
+
+def invalidate_user(user_id):
+    _cache().delete(_key(user_id))
@@ -1,17 +1,19 @@
 from django.http import Http404, HttpResponse # noqa
 from django.shortcuts import render, redirect
+from core.page_cache import render_cached
 from .forms import CustomAuthenticationForm, CustomUserCreationForm
-from django.contrib.auth import get_user_model
-from django.shortcuts import get_object_or_404
+from .hashing import hashing_backpressure
+from .models import ActivationToken
 from django.contrib.auth.decorators import login_required
-from django.contrib.auth import login, logout, authenticate
+from django.contrib.auth import login, logout
 
 
+@hashing_backpressure
 def registration_view(request):
     """User registration view"""
     if request.method == 'GET':
-        return render(request, 'user/registration.html',
-                      {'form': CustomUserCreationForm()})
+        return render_cached(request, 'user/registration.html',
+                             {'form': CustomUserCreationForm()})
     else:
         form = CustomUserCreationForm(request.POST, auto_id='cre_f_%s')
         if form.is_valid():
@@ -27,33 +29,27 @@ def registration_view(request):
 
 def thanks_view(request):
     """After registration page view"""
-    return render(request, 'user/thanks.html')
+    return render_cached(request, 'user/thanks.html')
 
 
-def activation_view(request, hash1, hash2):
+def activation_view(request, token):
     """User activation view"""
     if request.method == 'GET':
-        user = get_object_or_404(
-            get_user_model(),
-            activation_link1=hash1,
-            activation_link2=hash2)
-        if user.is_active:
+        if ActivationToken.objects.activate(token) is None:
             raise Http404
-        else:
-            user.is_active = True
-            user.save()
 
-    return render(request, 'user/activation.html', {
+    return render_cached(request, 'user/activation.html', {
         'messege': 'Account has been activated'
     })
 
 
+@hashing_backpressure
 def loginpage_view(request):
     """User log in view"""
     if request.user.is_authenticated:
         return redirect('user:registration')
     if request.method == 'GET':
-        return render(
+        return render_cached(
             request,
             'user/login.html',
             {'form': CustomAuthenticationForm()}
@@ -61,12 +57,7 @@ def loginpage_view(request):
     else:
         form = CustomAuthenticationForm(request, request.POST)
         if form.is_valid():
-            user = authenticate(
-                request,
-                username=request.POST['username'],
-                password=request.POST['password']
-            )
-            login(request, user)
+            login(request, form.get_user())
             return redirect('user:registration')
         else:
             return render(request, 'user/login.html',